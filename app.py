@@ -1,8 +1,20 @@
 import streamlit as st
-import pandas as pd
-from src.data_loader import load_raw_data, preprocess_data
-from src.eda_analysis import EDAAnalysis
-from src.visualization import create_visualizations
+import os
+from src.data_loader import DATA_SOURCE
+from src.cache import cache_key
+from src.cube import CubeAggregates, filter_cube
+from src.precompute import PrecomputeWorker, filter_key, sample_key, source_signature, timeseries_key
+from src.result_cache import ResultCache
+from src.sampling import APPROXIMATE_MIN_ROWS, SAMPLE_COLUMNS, SAMPLE_SIZE, STRATA, StratifiedSample
+from src.sections import SectionCache
+from src.sql_backend import open_backend
+from src.timeseries import RESOLUTIONS, TimeSeries
+from utils.instrumentation import METRICS, available_profilers, profile_run, timed
+from src.visualization import (
+    create_visualizations, render_dataset_status,
+    render_univariate, render_bivariate, render_multivariate, render_correlation_heatmap,
+    render_debug_panel, time_series_charts, render_time_series
+)
 
 # Page configuration
 st.set_page_config(
@@ -13,30 +25,74 @@ st.set_page_config(
 )
 
 def main():
+    # A profile requested from the debug panel covers this whole rerun
+    engine = st.session_state.pop('profile_engine', None)
+    with profile_run(engine) as capture, timed('rerun'):
+        run_dashboard()
+    if capture['report']:
+        st.session_state['profile_report'] = capture['report']
+    
+    if st.sidebar.toggle("🐞 Debug panel", value=False):
+        with st.sidebar.expander("⏱️ Stage timings", expanded=True):
+            engine = st.selectbox("Profiler", available_profilers())
+            if st.button("🔬 Profile next rerun"):
+                st.session_state['profile_engine'] = engine
+                st.rerun()
+            render_debug_panel(METRICS, st.session_state.get('profile_report'))
+
+def run_dashboard():
+    """One rerun of the dashboard: load, filter, aggregate and render"""
     st.title("🏪 Supermarket Sales Analytics Dashboard")
     st.markdown("Interactive analysis of supermarket sales data")
     
+    use_sql = st.sidebar.toggle(
+        "🦆 SQL backend (DuckDB)",
+        value=False,
+        help="Filter and aggregate inside an embedded DuckDB database instead of in memory"
+    )
+    
     # Load data
     with st.spinner('Loading data...'):
-        raw_df = load_raw_data()
-        if raw_df is not None:
-            df = preprocess_data(raw_df)
+        if not os.path.exists(DATA_SOURCE):
+            st.error(f"❌ File not found: {DATA_SOURCE}")
+            st.info("💡 Please make sure your CSV file is in the 'data/raw/' folder")
+            st.stop()
+        if use_sql:
+            version = dataset_version(DATA_SOURCE, source_signature(DATA_SOURCE))
+            backend = load_sql_backend(DATA_SOURCE, version)
+            if backend is None:
+                st.stop()
+            cities = backend.dimension_values('City')
+            product_lines = backend.dimension_values('Product line')
+            min_date, max_date = backend.date_bounds()
+            st.success(f"✅ Loaded {backend.meta()['rows']} records (DuckDB)")
+        else:
+            # Prepared off the request path; only the very first load waits for it
+            worker = get_precompute_worker()
+            dataset = worker.active() or worker.wait()
+            if dataset is None:
+                st.error(f"❌ Error loading data: {worker.error}")
+                st.stop()
+            if worker.error:
+                st.warning(f"⚠️ Latest data refresh failed, showing the previous version: {worker.error}")
+            version, index, cube = dataset.version, dataset.index, dataset.cube
+            df = index.df
+            cities = index.dimension_values('City')
+            product_lines = index.dimension_values('Product line')
+            min_date = df['Date'].min()
+            max_date = df['Date'].max()
             st.success(f'✅ Loaded {len(df)} records')
     
     # Sidebar filters
     st.sidebar.header("🔍 Filters")
     
     # City filter
-    cities = ['All'] + list(df['City'].unique())
-    selected_city = st.sidebar.selectbox('Select City', cities)
+    selected_city = st.sidebar.selectbox('Select City', ['All'] + cities)
     
     # Product line filter
-    product_lines = ['All'] + list(df['Product line'].unique())
-    selected_product = st.sidebar.selectbox('Select Product Line', product_lines)
+    selected_product = st.sidebar.selectbox('Select Product Line', ['All'] + product_lines)
     
     # Date range filter
-    min_date = df['Date'].min()
-    max_date = df['Date'].max()
     date_range = st.sidebar.date_input(
         "Select Date Range",
         [min_date, max_date],
@@ -44,61 +100,138 @@ def main():
         max_value=max_date
     )
     
-    # Apply filters
-    filtered_df = apply_filters(df, selected_city, selected_product, date_range)
-    
-    # Main dashboard
-    display_dashboard(filtered_df)
-
-def apply_filters(df, city, product, date_range):
-    """Apply user filters to dataframe"""
-    filtered_df = df.copy()
+    # Apply filters: pushed down as SQL (rows stay in the database), or through the precomputed row indexes
+    if use_sql:
+        with timed('apply_filters.sql') as stage:
+            rows = backend.rows(selected_city, selected_product, date_range)
+            stage['rows'] = len(rows)
+        filtered_cube = lambda: backend.cube(selected_city, selected_product, date_range)
+        build_series = lambda: TimeSeries.from_bins(*backend.time_bins(selected_city, selected_product))
+        build_sample = lambda: StratifiedSample.from_parts(
+            *backend.stratified_sample(SAMPLE_SIZE, SAMPLE_COLUMNS, STRATA)
+        )
+    else:
+        rows = apply_filters(index, selected_city, selected_product, date_range)
+        filtered_cube = lambda: filter_cube(cube, selected_city, selected_product, date_range)
+        build_series = lambda: TimeSeries.from_frame(index.frame(index.select(selected_city, selected_product)))
+        build_sample = lambda: StratifiedSample.from_frame(index.df)
     
-    if city != 'All':
-        filtered_df = filtered_df[filtered_df['City'] == city]
+    # Aggregates are shared across sessions, keyed on dataset version and filter state
+    result_cache = get_result_cache()
+    state_key = filter_key(selected_city, selected_product, date_range)
+    aggregates = CubeAggregates(filtered_cube, cache=result_cache, key=(version, state_key))
+    # Every numeric pair at once, computed only when the Bivariate page asks for it
+    correlations = lambda: result_cache.get_or_compute(
+        (version, state_key, 'correlations'), rows.correlation_matrices
+    )
+    # One series per City / Product line; every date range is a slice of its prefix sums
+    timeseries = lambda: result_cache.get_or_compute(
+        timeseries_key(version, selected_city, selected_product), build_series
+    )
+    # One stratified sample per dataset version; the filters only mask its rows
+    sample = lambda: result_cache.get_or_compute(sample_key(version), build_sample).view(
+        selected_city, selected_product, date_range
+    )
     
-    if product != 'All':
-        filtered_df = filtered_df[filtered_df['Product line'] == product]
+    # Main dashboard
+    sections = SectionCache(st.session_state)
+    display_dashboard(rows, aggregates, correlations, sections, timeseries, date_range, sample)
     
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[
-            (filtered_df['Date'] >= pd.to_datetime(start_date)) & 
-            (filtered_df['Date'] <= pd.to_datetime(end_date))
-        ]
+    with st.sidebar.expander("⚙️ Result Cache"):
+        stats = result_cache.stats()
+        st.write(f"• Entries: {stats['entries']:,} ({stats['bytes'] / 1024**2:.1f} / {stats['max_bytes'] / 1024**2:.0f} MB)")
+        st.write(f"• Hits: {stats['hits']:,} | Misses: {stats['misses']:,} ({stats['hit_rate']:.0%} hit rate)")
+        st.write(f"• Evictions: {stats['evictions']:,}")
     
-    return filtered_df
+    if not use_sql:
+        with st.sidebar.expander("🔄 Dataset"):
+            render_dataset_status(worker.status(), dataset)
+
+@st.cache_data(show_spinner=False)
+def dataset_version(path, signature):
+    """Identify the dataset by content hash and pipeline version; recomputed only when the source changes"""
+    return cache_key(path)
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    """One aggregate cache shared by every session"""
+    return ResultCache()
 
-def display_dashboard(df):
-    """Display the main dashboard"""
+@st.cache_resource(show_spinner=False)
+def get_precompute_worker():
+    """
+    One background worker per server process
+    It prepares each new version of the data file and warms the result cache
+    before swapping it in, so sessions never wait on a refresh
+    """
+    return PrecomputeWorker(DATA_SOURCE, result_cache=get_result_cache()).start()
+
+@st.cache_resource(show_spinner=False)
+def load_sql_backend(path, version):
+    """Open the DuckDB database for this dataset version, building it on first use"""
+    try:
+        return open_backend(path, key=version)
+    except Exception as e:
+        st.error(f"❌ Could not open the SQL backend: {e}")
+        return None
+
+@timed('apply_filters', rows=len)
+def apply_filters(index, city, product, date_range):
+    """Apply user filters through the precomputed row indexes; rows are copied only when a section reads them"""
+    return index.view(city, product, date_range)
+
+def display_dashboard(rows, aggregates, correlations=None, sections=None, timeseries=None, date_range=None, sample=None):
+    """
+    Display the main dashboard
+    rows is the FilteredRows (or SQLRows) of the current filters; only the
+    row-level EDA sections (univariate, bivariate and the correlation matrices)
+    read them, and SQLRows answers those with SQL aggregates.
+    correlations, timeseries and sample are callables returning the cached
+    correlation matrices, the TimeSeries of the current City / Product line
+    selection and the stratified sample restricted to the filters.
+    Each section is computed only when shown and reused from sections while its
+    inputs (dataset version, filters and its own selections) are unchanged.
+    """
+    sections = sections if sections is not None else SectionCache()
+    inputs = aggregates.key or None
+    section_inputs = lambda *selection: inputs + selection if inputs is not None else None
     
     # KPI Cards
     st.subheader("📈 Key Performance Indicators")
+    with timed('aggregate.kpis'):
+        kpis = sections.get('kpis', inputs, lambda: aggregates['kpis'])
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_revenue = df['Total'].sum()
-        st.metric("Total Revenue", f"${total_revenue:,.2f}")
+        st.metric("Total Revenue", f"${kpis['total_revenue']:,.2f}")
     
     with col2:
-        avg_transaction = df['Total'].mean()
-        st.metric("Avg Transaction", f"${avg_transaction:.2f}")
+        st.metric("Avg Transaction", f"${kpis['avg_transaction']:.2f}")
     
     with col3:
-        total_customers = df['Customer_type'].count()
-        st.metric("Total Transactions", f"{total_customers:,}")
+        st.metric("Total Transactions", f"{kpis['transactions']:,}")
     
     with col4:
-        avg_rating = df['Rating'].mean()
-        st.metric("Avg Rating", f"{avg_rating:.2f}/10")
+        st.metric("Avg Rating", f"{kpis['avg_rating']:.2f}/10")
     
     # Visualizations
-    create_visualizations(df)
+    create_visualizations(rows, aggregates, sections)
+    
+    if timeseries is not None and st.toggle("⏱️ Time-Series Trends", value=False, key="show_time_series"):
+        with st.expander("⏱️ Time-Series Trends", expanded=True):
+            resolution = st.radio("Resolution", RESOLUTIONS, index=1, horizontal=True, format_func=str.capitalize)
+            with timed('chart.time_series') as stage:
+                charts = sections.get(
+                    'chart.time_series', section_inputs(resolution),
+                    lambda: time_series_charts(timeseries(), date_range, resolution)
+                )
+                stage['rows'] = charts['rows'] if charts else 0
+            render_time_series(charts)
     
     # EDA Section
     st.subheader("🔍 Exploratory Data Analysis")
-    eda = EDAAnalysis(df)
+    eda = rows.analysis(aggregates)
     
     # Variate Analysis Selection
     analysis_type = st.selectbox(
@@ -107,19 +240,49 @@ def display_dashboard(df):
     )
     
     if analysis_type == "Univariate":
-        column = st.selectbox("Select Variable", df.select_dtypes(include=[np.number]).columns)
-        eda.univariate_analysis(column)
+        column = st.selectbox("Select Variable", rows.numeric_columns())
+        with timed('eda.univariate_analysis', rows=len(rows)):
+            result = sections.get('eda.univariate', section_inputs(column), lambda: eda.univariate_analysis(column))
+        render_univariate(result)
     
     elif analysis_type == "Bivariate":
+        use_matrix = correlations is not None and st.toggle("🧮 Full correlation matrix", value=True)
+        if use_matrix:
+            with timed('eda.correlation_matrices', rows=len(rows)):
+                eda = rows.analysis(aggregates, correlations())
         col1, col2 = st.columns(2)
         with col1:
-            var1 = st.selectbox("Variable 1", df.select_dtypes(include=[np.number]).columns)
+            var1 = st.selectbox("Variable 1", rows.numeric_columns())
         with col2:
-            var2 = st.selectbox("Variable 2", df.select_dtypes(include=[np.number]).columns)
-        eda.bivariate_analysis(var1, var2)
+            var2 = st.selectbox("Variable 2", rows.numeric_columns())
+        with timed('eda.bivariate_analysis', rows=len(rows)):
+            result = sections.get(
+                'eda.bivariate', section_inputs(var1, var2, use_matrix), lambda: eda.bivariate_analysis(var1, var2)
+            )
+        render_bivariate(result)
+        if use_matrix:
+            method = st.radio("Heatmap", ["pearson", "spearman"], horizontal=True, format_func=str.capitalize)
+            render_correlation_heatmap(eda.correlations, method)
     
     else:
-        eda.multivariate_analysis()
+        approximate = sample is not None and st.toggle(
+            "⚡ Approximate (stratified sample)",
+            value=len(rows) >= APPROXIMATE_MIN_ROWS,
+            key='approximate_multivariate',
+            help="Estimate the tables from a fixed-size sample per City × Product line, with confidence intervals"
+        )
+        if approximate:
+            st.button(
+                "🎯 Upgrade to exact answer",
+                on_click=lambda: st.session_state.update(approximate_multivariate=False)
+            )
+            eda = rows.analysis(aggregates, sample=sample())
+        stage = 'eda.multivariate_approximate' if approximate else 'eda.multivariate_analysis'
+        with timed(stage, rows=len(rows)):
+            result = sections.get(
+                'eda.multivariate', section_inputs(approximate), lambda: eda.multivariate_analysis(approximate)
+            )
+        render_multivariate(result)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Measure cold-import time of the headless analytics core
+
+Each module is imported in a fresh interpreter, so nothing is already cached
+in sys.modules. The run fails if the core pulls in a rendering dependency.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CORE_MODULES = [
+    'src.data_loader',
+    'src.preprocessing',
+    'src.eda_analysis',
+    'src.cube',
+    'src.filter_index',
+    'src.result_cache',
+    'src.cache',
+    'src.incremental',
+    'src.chart_reduction',
+    'src.streaming_stats',
+    'src.correlation',
+    'src.sql_backend',
+    'src.sections',
+    'src.precompute',
+    'src.timeseries',
+    'src.dataset',
+    'src.sampling',
+    'src.reports',
+    'src.parallel'
+]
+FORBIDDEN_MODULES = ['streamlit', 'plotly', 'scipy', 'matplotlib']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed_s': elapsed, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output)
+        timings.append(result['elapsed_s'])
+        loaded = result['loaded']
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'forbidden_loaded': loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.repeat) for module in CORE_MODULES}
+    results['all_core'] = measure(', '.join(CORE_MODULES), args.repeat)
+    print(json.dumps(results, indent=2))
+    if any(result['forbidden_loaded'] for result in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
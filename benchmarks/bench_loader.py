@@ -0,0 +1,48 @@
+"""
+Compare the bare pd.read_csv load path with the typed, chunked loader
+
+Usage:
+    python -m benchmarks.bench_loader [path] [--view dashboard] [--chunksize 250000]
+"""
+import argparse
+import json
+
+import pandas as pd
+
+from src.data_loader import DATA_PATH, CHUNK_SIZE, detect_header_row, load_data_chunked
+from utils.helpers import track_performance
+
+
+def bare_read_csv(path):
+    """The previous load path: untyped, all columns, one read"""
+    with track_performance() as stats:
+        df = pd.read_csv(path, skiprows=detect_header_row(path))
+    stats['rows'] = len(df)
+    stats['rows_per_sec'] = len(df) / stats['elapsed_s']
+    stats['frame_mb'] = df.memory_usage(deep=True).sum() / 1024**2
+    return stats
+
+
+def chunked(path, view, chunksize):
+    """The typed, column-pruned streaming load path"""
+    df, stats = load_data_chunked(path, columns=view, chunksize=chunksize, trace_memory=True)
+    stats['frame_mb'] = df.memory_usage(deep=True).sum() / 1024**2
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', nargs='?', default=DATA_PATH)
+    parser.add_argument('--view', default='full')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    results = {
+        'bare_read_csv': bare_read_csv(args.path),
+        'chunked': chunked(args.path, args.view, args.chunksize)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare memory of the standard and compact preprocessed schemas
+
+Each schema is built in a fresh process so peak and resident memory are not
+shared between the two runs.
+
+Usage:
+    python -m benchmarks.bench_memory [--rows 1000000 10000000]
+"""
+import argparse
+import json
+import multiprocessing
+
+from benchmarks.bench_preprocessing import make_frame
+from src.preprocessing import engineer_features, memory_report
+from utils.helpers import current_rss_mb, peak_rss_mb, track_performance
+
+
+def _child(rows, compact, conn):
+    raw = make_frame(rows)
+    rss_before = current_rss_mb()
+    with track_performance() as stats:
+        df = engineer_features(raw, compact=compact)
+    del raw
+    conn.send({
+        'frame_mb': df.memory_usage(deep=True).sum() / 1024**2,
+        'elapsed_s': stats['elapsed_s'],
+        'peak_traced_mb': stats['peak_memory_mb'],
+        'rss_before_mb': rss_before,
+        'rss_after_mb': current_rss_mb(),
+        'peak_rss_mb': peak_rss_mb()
+    })
+    conn.close()
+
+
+def measure(rows, compact):
+    """Build one schema in a spawned process and return its memory figures"""
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(rows, compact, child_conn))
+    process.start()
+    child_conn.close()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+
+def run(rows):
+    sample = make_frame(min(rows, 100_000))
+    columns = memory_report(engineer_features(sample), engineer_features(sample, compact=True))['columns']
+    return {
+        'rows': rows,
+        'standard': measure(rows, compact=False),
+        'compact': measure(rows, compact=True),
+        'column_mb_per_100k_rows': columns.round(3).to_dict(orient='index')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+    print(json.dumps([run(rows) for rows in args.rows], indent=2, default=float))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Scaling benchmark for the process-pool preprocessing and aggregation
+
+Rows partitioning splits the data into one row range per worker; Branch and
+Month partitioning are limited by the number of branches and months, which
+--branches and --days raise in the synthetic data.
+
+Usage:
+    python -m benchmarks.bench_parallel [--rows 2000000] [--workers 1 2 4 8 16] [--by Rows]
+                                        [--branches 3] [--days 365]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_preprocessing import make_frame
+from src.parallel import parallel_cube, parallel_multivariate, parallel_preprocess
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(rows, worker_counts, by, branches=3, days=365):
+    raw = make_frame(rows, n_branches=branches, days=days)
+    results = []
+    for workers in worker_counts:
+        df, preprocess_s = time_call(parallel_preprocess, raw, workers=workers, by=by)
+        _, cube_s = time_call(parallel_cube, df, workers=workers, by=by)
+        _, multivariate_s = time_call(parallel_multivariate, df, workers=workers, by=by)
+        results.append({
+            'workers': workers,
+            'preprocess_s': preprocess_s,
+            'cube_s': cube_s,
+            'multivariate_s': multivariate_s
+        })
+
+    baseline = results[0]
+    for result in results:
+        for stage in ('preprocess', 'cube', 'multivariate'):
+            result[f'{stage}_speedup'] = baseline[f'{stage}_s'] / result[f'{stage}_s']
+    return {'rows': rows, 'partition_by': by, 'branches': branches, 'days': days, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--by', choices=['Rows', 'Branch', 'Month'], default='Rows')
+    parser.add_argument('--branches', type=int, default=3)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.workers, args.by, args.branches, args.days), indent=2))
+
+
+if __name__ == '__main__':
+    main()
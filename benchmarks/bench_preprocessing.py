@@ -0,0 +1,100 @@
+"""
+Compare the vectorized feature engineering with the previous string-based version
+
+Timings are taken without tracing; a separate traced run of each side records
+its peak memory.
+
+Usage:
+    python -m benchmarks.bench_preprocessing [--rows 1000000 10000000]
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DTYPE_SCHEMA
+from src.preprocessing import engineer_features
+from utils.helpers import track_performance
+from utils.synthetic_data import generate_sales_data
+
+
+def legacy_features(df):
+    """The string-concatenating feature engineering preprocess_data used before"""
+    df_clean = df.copy()
+    df_clean['Date'] = pd.to_datetime(df_clean['Date'], format='%m/%d/%Y', errors='coerce')
+    df_clean['Time'] = pd.to_datetime(df_clean['Time'], format='%H:%M', errors='coerce').dt.time
+    df_clean['DateTime'] = pd.to_datetime(
+        df_clean['Date'].astype(str) + ' ' + df_clean['Time'].astype(str),
+        errors='coerce'
+    )
+    df_clean['Month'] = df_clean['Date'].dt.month_name()
+    df_clean['MonthNumber'] = df_clean['Date'].dt.month
+    df_clean['DayOfWeek'] = df_clean['Date'].dt.day_name()
+    df_clean['DayNumber'] = df_clean['Date'].dt.dayofweek
+    df_clean['Hour'] = pd.to_datetime(df_clean['Time'].astype(str), format='%H:%M:%S', errors='coerce').dt.hour
+    df_clean['TimeOfDay'] = pd.cut(
+        df_clean['Hour'],
+        bins=[0, 12, 17, 24],
+        labels=['Morning', 'Afternoon', 'Evening'],
+        include_lowest=True
+    )
+    df_clean['Revenue_Segment'] = pd.cut(
+        df_clean['Total'],
+        bins=[0, 100, 300, 500, float('inf')],
+        labels=['Small ($0-100)', 'Medium ($100-300)', 'Large ($300-500)', 'Very Large ($500+)']
+    )
+    df_clean['Transaction_Size'] = df_clean['Unit price'] * df_clean['Quantity']
+    customer_spending = df_clean.groupby('Customer_type', observed=True)['Total'].mean().to_dict()
+    df_clean['Avg_CustomerType_Spending'] = df_clean['Customer_type'].map(customer_spending).astype(float)
+    return df_clean
+
+
+def make_frame(rows, seed=0, **kwargs):
+    """Synthetic raw frame with the dtypes the loader would give it; kwargs go to generate_sales_data"""
+    return generate_sales_data(rows, seed=seed, **kwargs).astype(DTYPE_SCHEMA)
+
+
+def check_equivalent(legacy, vectorized):
+    """Raise if the two implementations disagree on any derived column"""
+    for col in ['DateTime', 'Month', 'MonthNumber', 'DayOfWeek', 'DayNumber', 'Hour',
+                'TimeOfDay', 'Revenue_Segment', 'Transaction_Size']:
+        left = legacy[col].astype(object) if legacy[col].dtype.kind not in 'Mifc' else legacy[col]
+        right = vectorized[col].astype(object) if vectorized[col].dtype.kind not in 'Mifc' else vectorized[col]
+        if not np.array_equal(np.asarray(left), np.asarray(right)):
+            raise AssertionError(f"Column {col} differs between implementations")
+    np.testing.assert_allclose(legacy['Avg_CustomerType_Spending'], vectorized['Avg_CustomerType_Spending'], rtol=1e-6)
+
+
+def measure(features, df):
+    """Wall time of an untraced run, then peak traced memory from a second, traced run"""
+    with track_performance(False) as stats:
+        result = features(df)
+    with track_performance() as traced:
+        features(df)
+    stats['peak_memory_mb'] = traced['peak_memory_mb']
+    return result, stats
+
+
+def run(rows):
+    df = make_frame(rows)
+    legacy, legacy_stats = measure(legacy_features, df)
+    vectorized, vectorized_stats = measure(engineer_features, df)
+    check_equivalent(legacy, vectorized)
+    return {
+        'rows': rows,
+        'legacy': legacy_stats,
+        'vectorized': vectorized_stats,
+        'speedup': legacy_stats['elapsed_s'] / vectorized_stats['elapsed_s']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+    print(json.dumps([run(rows) for rows in args.rows], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Performance benchmark suite on synthetic supermarket data
+
+Every (scale, benchmark) pair runs in a fresh process so peak RSS is
+attributable to that benchmark. Timings are taken without tracing; one extra
+traced run records the peak memory allocated by the benchmarked call.
+Results are written as JSON and can be compared against an earlier run.
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 1e4 1e5 1e6 --output results.json
+    python -m benchmarks.run_benchmarks --rows 1e5 --compare baseline.json [--threshold 1.2]
+    python -m benchmarks.run_benchmarks --list
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import correlation_matrices
+from src.cube import AGGREGATIONS, CubeAggregates, build_cube
+from src.data_loader import iter_data_chunks, load_data
+from src.eda_analysis import EDAAnalysis
+from src.filter_index import FilterIndex
+from src.preprocessing import get_data_summary, preprocess_data
+from src.reports import scan
+from src.sampling import StratifiedSample
+from src.timeseries import TimeSeries
+from utils.helpers import current_rss_mb, peak_rss_mb, track_performance
+from utils.synthetic_data import write_sales_csv
+
+DATA_DIR = 'benchmarks/data'
+
+
+def _raw(path):
+    return load_data(path)
+
+
+def _preprocessed(path):
+    return preprocess_data(load_data(path))
+
+
+def _indexed(path):
+    return FilterIndex(_preprocessed(path))
+
+
+def _filter_combinations(index):
+    """Every City x Product line pair plus the full and a one-month date range"""
+    df = index.df
+    start = df['Date'].min()
+    month = (start, start + pd.Timedelta(days=30))
+    combos = [('All', 'All', None), ('All', 'All', month)]
+    for city in df['City'].unique():
+        for product in df['Product line'].unique():
+            combos.append((city, product, None))
+            combos.append((city, product, month))
+    return combos
+
+
+def _apply_filters(index):
+    for city, product, date_range in _filter_combinations(index):
+        index.frame(index.select(city, product, date_range))
+
+
+def _time_series(df):
+    """Build the prefix arrays, then answer every one-week window and resolution from them"""
+    series = TimeSeries.from_frame(df)
+    for start in range(series.n_days):
+        window = (series.origin + np.timedelta64(start, 'D'), series.origin + np.timedelta64(start + 6, 'D'))
+        series.range_total(window)
+        series.heatmap(window)
+    for resolution in ('hourly', 'daily', 'weekly'):
+        series.resample(resolution)
+    series.rolling()
+
+
+def _sampled(path):
+    return StratifiedSample.from_frame(_preprocessed(path))
+
+
+def _visualization_aggregates(df):
+    aggregates = CubeAggregates(lambda: build_cube(df))
+    for name in AGGREGATIONS:
+        aggregates[name]
+
+
+# name -> (setup(path) -> state, run(state))
+BENCHMARKS = {
+    'load_data': (lambda path: path, load_data),
+    'preprocess_data': (_raw, preprocess_data),
+    'preprocess_data_compact': (_raw, lambda df: preprocess_data(df, compact=True)),
+    'filter_index_build': (_preprocessed, FilterIndex),
+    'apply_filters': (_indexed, _apply_filters),
+    'get_data_summary': (_preprocessed, get_data_summary),
+    'report_scan': (lambda path: path, lambda path: scan(iter_data_chunks(path))),
+    'eda_univariate': (_preprocessed, lambda df: EDAAnalysis(df).univariate_analysis('Total')),
+    'eda_bivariate': (_preprocessed, lambda df: EDAAnalysis(df).bivariate_analysis('Unit price', 'Total')),
+    'correlation_matrix': (_preprocessed, correlation_matrices),
+    'time_series': (_preprocessed, _time_series),
+    'eda_multivariate': (_preprocessed, lambda df: EDAAnalysis(df).multivariate_analysis()),
+    'eda_multivariate_approximate': (
+        _sampled, lambda sample: EDAAnalysis(None, sample=sample).multivariate_analysis(approximate=True)
+    ),
+    'visualization_aggregates': (_preprocessed, _visualization_aggregates)
+}
+
+
+def dataset_path(rows, data_dir=DATA_DIR, seed=0):
+    """Generate (once) and return the synthetic CSV for a scale"""
+    path = os.path.join(data_dir, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_sales_csv(path + '.tmp', rows, seed=seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def _child(name, path, repeat, conn):
+    try:
+        setup, run = BENCHMARKS[name]
+        state = setup(path)
+        setup_rss = peak_rss_mb()
+        rss_before = current_rss_mb()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+        with track_performance() as traced:
+            run(state)
+
+        conn.send({
+            'wall_s': statistics.median(timings),
+            'wall_min_s': min(timings),
+            'peak_traced_mb': traced['peak_memory_mb'],
+            'rss_before_mb': rss_before,
+            'setup_peak_rss_mb': setup_rss,
+            'peak_rss_mb': peak_rss_mb()
+        })
+    except Exception as e:
+        conn.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_benchmark(name, path, repeat=3):
+    """Run one benchmark in a fresh process and return its measurements"""
+    context = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(name, path, repeat, child_conn))
+    process.start()
+    child_conn.close()
+    try:
+        result = parent_conn.recv()
+    except EOFError:
+        result = {'error': 'benchmark process exited without a result'}
+    process.join()
+    if process.exitcode not in (0, None) and 'error' not in result:
+        result['error'] = f"exit code {process.exitcode}"
+    return result
+
+
+def run_suite(scales, names, repeat=3, data_dir=DATA_DIR):
+    results = []
+    for rows in scales:
+        path = dataset_path(rows, data_dir)
+        for name in names:
+            result = {'rows': rows, 'benchmark': name, **run_benchmark(name, path, repeat)}
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, threshold=1.2):
+    """Return rows of (rows, benchmark, baseline_s, current_s, ratio, regressed)"""
+    previous = {(r['rows'], r['benchmark']): r for r in baseline['results'] if 'wall_s' in r}
+    report = []
+    for result in current['results']:
+        before = previous.get((result['rows'], result['benchmark']))
+        if before is None or 'wall_s' not in result:
+            continue
+        ratio = result['wall_s'] / before['wall_s'] if before['wall_s'] else float('inf')
+        report.append({
+            'rows': result['rows'],
+            'benchmark': result['benchmark'],
+            'baseline_s': before['wall_s'],
+            'current_s': result['wall_s'],
+            'ratio': ratio,
+            'regressed': ratio > threshold
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=float, nargs='+', default=[1e4, 1e5, 1e6],
+                        help="dataset scales, e.g. 1e4 1e6 1e8")
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', help="write results JSON here instead of stdout")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2, help="slowdown ratio counted as a regression")
+    parser.add_argument('--list', action='store_true', help="list benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    results = run_suite([int(rows) for rows in args.rows], args.benchmarks, args.repeat, args.data_dir)
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            results['comparison'] = compare(results, json.load(f), args.threshold)
+        exit_code = 1 if any(row['regressed'] for row in results['comparison']) else 0
+
+    output = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
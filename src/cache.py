@@ -0,0 +1,262 @@
+"""
+On-disk columnar cache of the preprocessed sales data
+
+The cache lives under data/processed/cache/<key>/ where the key combines a
+hash of the source file with the preprocessing PIPELINE_VERSION. Each key holds
+one Arrow IPC file per (month, Branch) partition plus a manifest.json, so warm
+starts memory-map the files instead of re-parsing the CSV and re-running
+preprocessing. Rows with no Date or no Branch go to a __null__ partition.
+
+A warm read is not zero-copy: the mapped Arrow columns are converted into
+ordinary pandas blocks, so the frame is copied once into memory. Rows come
+back grouped by partition (month, then Branch), in their original order within
+each partition.
+
+Invalidation rules:
+    1. A different source hash, PIPELINE_VERSION or schema (SALES_COMPACT)
+       gives a different key, so the old entry is never read again and is
+       pruned on the next build.
+    2. An entry without a manifest (e.g. an interrupted build) is a miss.
+    3. An entry whose manifest lists a partition file that is missing is a miss.
+
+Usage:
+    python -m src.cache build [--source PATH] [--cache-dir DIR] [--force]
+    python -m src.cache status [--source PATH] [--cache-dir DIR]
+    python -m src.cache clear [--cache-dir DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from src.data_loader import DATA_SOURCE
+from src.preprocessing import COMPACT, PIPELINE_VERSION
+
+CACHE_DIR = 'data/processed/cache'
+MANIFEST_NAME = 'manifest.json'
+PARTITION_COLUMNS = ['YearMonth', 'Branch']
+# Partition value for rows whose Date or Branch is missing
+NULL_PARTITION = '__null__'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("The preprocessed-data cache requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def source_fingerprint(path=DATA_SOURCE, block_size=1 << 20):
+    """Return the SHA-256 hex digest of the source file, or of a dataset directory's file listing"""
+    if os.path.isdir(path):
+        from src.dataset import SalesDataset
+        return SalesDataset(path).fingerprint()
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path=DATA_SOURCE, fingerprint=None, compact=COMPACT):
+    """Return the cache key for a source file, the current pipeline version and schema"""
+    fingerprint = fingerprint or source_fingerprint(path)
+    return f"{fingerprint[:16]}-v{PIPELINE_VERSION}" + ('-compact' if compact else '')
+
+
+def _partition_value(value):
+    return NULL_PARTITION if pd.isna(value) else value
+
+
+def _partition_name(year_month, branch, part_name='part-0.arrow'):
+    return os.path.join(
+        f"YearMonth={_partition_value(year_month)}", f"Branch={_partition_value(branch)}", part_name
+    )
+
+
+def write_partitions(df, directory, part_name='part-0.arrow'):
+    """
+    Write the frame as one Arrow IPC file per (month, Branch) partition
+    Returns the relative paths of the files written; raises ValueError if
+    the partitions do not add up to every row of the frame
+    """
+    year_month = df['Date'].dt.strftime('%Y-%m')
+    files = []
+    written = 0
+    for (month, branch), part in df.groupby([year_month, df['Branch']], observed=True, sort=True, dropna=False):
+        relative = _partition_name(month, branch, part_name)
+        target = os.path.join(directory, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        write_frame(part, target)
+        files.append(relative)
+        written += len(part)
+    if written != len(df):
+        raise ValueError(f"Partitions hold {written:,} of {len(df):,} rows")
+    return files
+
+
+def write_frame(df, path):
+    """Write a frame to a single Arrow IPC file"""
+    pa = _require_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(path, columns=None):
+    pa = _require_pyarrow()
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def read_frame(path, columns=None):
+    """Memory-map a single Arrow IPC file written by write_frame"""
+    return _read_table(path, columns).to_pandas(split_blocks=True)
+
+
+def read_partitions(directory, files, columns=None):
+    """Memory-map the given partition files and return them as one frame (copied into pandas)"""
+    pa = _require_pyarrow()
+    tables = [_read_table(os.path.join(directory, relative), columns) for relative in files]
+    if not tables:
+        return None
+    combined = pa.concat_tables(tables, promote_options='default')
+    return combined.to_pandas(split_blocks=True)
+
+
+def read_manifest(key, cache_dir=CACHE_DIR):
+    """Return the manifest of a complete cache entry, or None if the entry is invalid"""
+    entry_dir = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(entry_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('pipeline_version') != PIPELINE_VERSION:
+        return None
+    if not all(os.path.exists(os.path.join(entry_dir, relative)) for relative in manifest.get('files', [])):
+        return None
+    return manifest
+
+
+def read_cache(path=DATA_SOURCE, cache_dir=CACHE_DIR, columns=None, key=None):
+    """Return the cached preprocessed frame for a source file, or None on a miss"""
+    key = key or cache_key(path)
+    manifest = read_manifest(key, cache_dir)
+    if manifest is None:
+        return None
+    df = read_partitions(os.path.join(cache_dir, key), manifest['files'], columns)
+    if df is not None:
+        df.attrs.update(manifest.get('attrs', {}))
+    return df
+
+
+def write_cache(df, path=DATA_SOURCE, cache_dir=CACHE_DIR, key=None):
+    """
+    Store a preprocessed frame for a source file and prune stale entries
+    The entry is built in a temporary directory and renamed into place, so
+    readers never see a partial cache.
+    """
+    key = key or cache_key(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    try:
+        files = write_partitions(df, staging)
+        manifest = {
+            'key': key,
+            'source': os.path.abspath(path),
+            'pipeline_version': PIPELINE_VERSION,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'attrs': df.attrs,
+            'partition_columns': PARTITION_COLUMNS,
+            'files': files
+        }
+        with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        target = os.path.join(cache_dir, key)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    prune_cache(cache_dir, keep=key, source=path)
+    return manifest
+
+
+def prune_cache(cache_dir=CACHE_DIR, keep=None, source=None):
+    """Remove cache entries other than `keep`, optionally only those built from `source`"""
+    if not os.path.isdir(cache_dir):
+        return []
+    removed = []
+    source = os.path.abspath(source) if source else None
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        if name == keep or not os.path.isdir(entry_dir) or name.startswith('.'):
+            continue
+        manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+        if source is not None and os.path.exists(manifest_path):
+            try:
+                with open(manifest_path) as f:
+                    if json.load(f).get('source') != source:
+                        continue
+            except (OSError, ValueError):
+                pass
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        removed.append(name)
+    return removed
+
+
+def build_cache(path=DATA_SOURCE, cache_dir=CACHE_DIR, force=False):
+    """Load, preprocess and cache a source file unless a valid entry already exists"""
+    from src.data_loader import load_data_chunked
+    from src.preprocessing import preprocess_data
+
+    key = cache_key(path)
+    manifest = read_manifest(key, cache_dir)
+    if manifest is not None and not force:
+        return manifest, False
+
+    raw_df, _ = load_data_chunked(path)
+    df = preprocess_data(raw_df, compact=COMPACT)
+    return write_cache(df, path, cache_dir, key=key), True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the preprocessed-data cache")
+    parser.add_argument('command', choices=['build', 'status', 'clear'])
+    parser.add_argument('--source', default=DATA_SOURCE)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help="rebuild even if the cache is valid")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest, built = build_cache(args.source, args.cache_dir, force=args.force)
+        state = 'built' if built else 'already up to date'
+        print(f"Cache {manifest['key']} {state}: {manifest['rows']:,} rows in {len(manifest['files'])} partitions")
+    elif args.command == 'status':
+        key = cache_key(args.source)
+        manifest = read_manifest(key, args.cache_dir)
+        if manifest is None:
+            print(f"Cache {key} missing or invalid")
+            return 1
+        print(f"Cache {key} valid: {manifest['rows']:,} rows in {len(manifest['files'])} partitions")
+    else:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        print(f"Removed {args.cache_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
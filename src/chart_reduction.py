@@ -0,0 +1,183 @@
+"""
+Server-side data reduction for Plotly charts
+
+Charts never need more points than the screen has pixels. Time series are
+downsampled with LTTB (Largest-Triangle-Three-Buckets) or, where every spike
+must survive, min/max bucketing; scatter plots with more than
+MAX_POINTS_PER_TRACE points are pre-binned into a 2D density grid and
+histograms into counts. The binning helpers are shared with the SQL backend,
+which bins in the database with the same edges. Each reduction returns a report
+with the point count and estimated JSON payload before and after.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_POINTS_PER_TRACE = 2000
+DENSITY_BINS = 60
+HISTOGRAM_BINS = 50
+PAYLOAD_SAMPLE_ROWS = 5000
+
+
+def _as_numeric(values):
+    """Numeric view of an axis; datetimes become int64 nanoseconds"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions kept by Largest-Triangle-Three-Buckets downsampling"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_numeric(x)
+    y = _as_numeric(y)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return keep
+
+
+def minmax_indices(y, n_out):
+    """Row positions of the minimum and maximum of each bucket, in order"""
+    n = len(y)
+    n_buckets = max(1, n_out // 2)
+    if n <= n_out:
+        return np.arange(n)
+    y = _as_numeric(y)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    mins = np.minimum.reduceat(y, edges[:-1])
+    maxs = np.maximum.reduceat(y, edges[:-1])
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_min = y == mins[bucket]
+    is_max = y == maxs[bucket]
+    # First occurrence of the min and max inside each bucket
+    first_min = np.unique(bucket[is_min], return_index=True)[1]
+    first_max = np.unique(bucket[is_max], return_index=True)[1]
+    return np.unique(np.concatenate([np.flatnonzero(is_min)[first_min], np.flatnonzero(is_max)[first_max]]))
+
+
+def estimate_payload_bytes(frame, columns=None):
+    """Approximate JSON size of the columns Plotly would serialize"""
+    if frame is None or len(frame) == 0:
+        return 0
+    columns = [col for col in (columns or frame.columns) if col in frame.columns]
+    sample = frame[columns]
+    if len(sample) > PAYLOAD_SAMPLE_ROWS:
+        sample = sample.iloc[np.linspace(0, len(frame) - 1, PAYLOAD_SAMPLE_ROWS).astype(np.int64)]
+    sample_bytes = len(sample.to_json(orient='split', index=False, date_format='iso'))
+    return int(sample_bytes * len(frame) / len(sample))
+
+
+def binned_report(method, points_before, reduced, columns):
+    """Report for data binned elsewhere; the unbinned payload is scaled from the binned one"""
+    bytes_after = estimate_payload_bytes(reduced, columns)
+    return {
+        'method': method,
+        'points_before': points_before,
+        'points_after': len(reduced),
+        'bytes_before': int(bytes_after * points_before / len(reduced)) if len(reduced) else 0,
+        'bytes_after': bytes_after,
+        'reduced': len(reduced) < points_before
+    }
+
+
+def _report(method, before, after, columns):
+    return {
+        'method': method,
+        'points_before': len(before),
+        'points_after': len(after),
+        'bytes_before': estimate_payload_bytes(before, columns),
+        'bytes_after': estimate_payload_bytes(after, columns),
+        'reduced': len(after) < len(before)
+    }
+
+
+def downsample_series(frame, x, y, max_points=MAX_POINTS_PER_TRACE, method='lttb'):
+    """Downsample a time series sorted by x; returns (frame, report)"""
+    if len(frame) <= max_points:
+        return frame, _report('none', frame, frame, [x, y])
+    frame = frame.sort_values(x)
+    if method == 'minmax':
+        keep = minmax_indices(frame[y].to_numpy(), max_points)
+    else:
+        keep = lttb_indices(frame[x].to_numpy(), frame[y].to_numpy(), max_points)
+    reduced = frame.iloc[keep]
+    return reduced, _report(method, frame, reduced, [x, y])
+
+
+def bin_edges(low, high, bins):
+    """Equal-width edges over [low, high], widened like np.histogram when low == high"""
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def scatter_bins(max_points=MAX_POINTS_PER_TRACE):
+    """Bins per axis of a density grid with at most max_points cells"""
+    return max(2, int(np.sqrt(max_points)))
+
+
+def histogram_frame(counts, edges):
+    """One row per bin of a 1D histogram"""
+    return pd.DataFrame({
+        'bin_start': edges[:-1],
+        'bin_end': edges[1:],
+        'bin_center': (edges[:-1] + edges[1:]) / 2,
+        'count': np.asarray(counts, dtype=np.int64)
+    })
+
+
+def density_frame(counts, x_edges, y_edges, x, y):
+    """One row per non-empty cell of a 2D histogram"""
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    xi, yi = np.nonzero(counts)
+    return pd.DataFrame({x: x_centers[xi], y: y_centers[yi], 'count': counts[xi, yi].astype(np.int64)})
+
+
+def bin_histogram(values, bins=HISTOGRAM_BINS):
+    """Pre-binned histogram counts: one row per bin"""
+    values = pd.Series(values).dropna().to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(values, bins=bins)
+    return histogram_frame(counts, edges)
+
+
+def density_2d(frame, x, y, bins=DENSITY_BINS):
+    """Pre-binned 2D density of a scatter: one row per non-empty cell"""
+    data = frame[[x, y]].dropna()
+    counts, x_edges, y_edges = np.histogram2d(_as_numeric(data[x]), _as_numeric(data[y]), bins=bins)
+    return density_frame(counts, x_edges, y_edges, x, y)
+
+
+def reduce_for_chart(frame, chart_type, x, y, max_points=MAX_POINTS_PER_TRACE, method='lttb'):
+    """
+    Reduce a frame before handing it to Plotly
+    Returns (frame, report); lines are downsampled with method ('lttb' or
+    'minmax'), and numeric scatter plots above max_points come back as a
+    density grid with a 'count' column and report['method'] == 'density'.
+    Other charts plot aggregates and are passed through unchanged.
+    """
+    if len(frame) <= max_points:
+        return frame, _report('none', frame, frame, [x, y])
+    if chart_type == 'line':
+        return downsample_series(frame, x, y, max_points, method)
+    if chart_type == 'scatter' and pd.api.types.is_numeric_dtype(frame[x]) and pd.api.types.is_numeric_dtype(frame[y]):
+        reduced = density_2d(frame, x, y, bins=scatter_bins(max_points))
+        return reduced, _report('density', frame, reduced, [x, y])
+    return frame, _report('none', frame, frame, [x, y])
@@ -0,0 +1,118 @@
+"""
+Full correlation matrices for every numeric column pair
+
+One matrix product over the centered numeric block gives the covariance and
+Pearson matrices; Spearman is the same product over column ranks. Missing
+values are deleted pairwise, as in DataFrame.corr: a mask product gives every
+pair its own row count and sums. The result is computed once per filter state
+and cached, so picking any pair on the Bivariate page is a lookup instead of
+a new pass over the data.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+def numeric_columns(df):
+    """Numeric columns that vary; constants have no defined correlation"""
+    return [col for col in df.columns if is_numeric_dtype(df[col]) and df[col].max() > df[col].min()]
+
+
+def _pearson(values):
+    """Covariance and Pearson matrices of a complete float64 block; pairs with a constant column are NaN"""
+    centered = values - values.mean(axis=0)
+    covariance = centered.T @ centered / (len(values) - 1)
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pearson = covariance / np.outer(std, std)
+    constant = std == 0
+    pearson[constant, :] = np.nan
+    pearson[:, constant] = np.nan
+    return covariance, pearson
+
+
+def _pairwise_pearson(values):
+    """
+    Covariance and Pearson matrices with pairwise deletion, plus per-pair counts
+    Each pair's sums run over the rows where both columns are present
+    """
+    present = ~np.isnan(values)
+    mask = present.astype(np.float64)
+    # Shifting by the column means keeps the raw-sum formulas well conditioned
+    filled = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+    counts = mask.T @ mask
+    sums = filled.T @ mask
+    squares = (filled * filled).T @ mask
+    with np.errstate(divide='ignore', invalid='ignore'):
+        co_moment = filled.T @ filled - sums * sums.T / counts
+        m2_x = squares - sums * sums / counts
+        covariance = np.where(counts > 1, co_moment / (counts - 1), np.nan)
+        pearson = co_moment / np.sqrt(m2_x * m2_x.T)
+    pearson[(counts < 2) | (m2_x * m2_x.T <= 0)] = np.nan
+    return covariance, pearson, counts.astype(np.int64)
+
+
+def _pairwise_spearman(values):
+    """Spearman matrix; pairs touching a column with gaps are re-ranked over their complete rows"""
+    full = np.flatnonzero(~np.isnan(values).any(axis=0))
+    spearman = np.full((values.shape[1],) * 2, np.nan)
+    if len(full):
+        ranks = np.column_stack([average_ranks(values[:, i]) for i in full])
+        spearman[np.ix_(full, full)] = _pearson(ranks)[1]
+    for i in np.setdiff1d(np.arange(values.shape[1]), full):
+        for j in range(values.shape[1]):
+            both = ~(np.isnan(values[:, i]) | np.isnan(values[:, j]))
+            if both.sum() > 1:
+                pair = np.column_stack([average_ranks(values[both, i]), average_ranks(values[both, j])])
+                spearman[i, j] = spearman[j, i] = _pearson(pair)[1][0, 1]
+    return spearman
+
+
+def average_ranks(values):
+    """Ranks with ties averaged, as used by Spearman; one sort per column"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return (ends - (counts - 1) / 2)[inverse]
+
+
+def _labelled(matrix, columns):
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def correlation_matrices(df, columns=None):
+    """
+    Covariance, Pearson and Spearman matrices of the numeric columns
+    Missing values are deleted pairwise; 'counts' holds the rows behind each pair
+    """
+    columns = list(columns) if columns is not None else numeric_columns(df)
+    if len(df) < 2 or not columns:
+        return {"error": "Not enough numeric data for a correlation matrix"}
+
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any():
+        covariance, pearson, counts = _pairwise_pearson(values)
+    else:
+        covariance, pearson = _pearson(values)
+        counts = np.full((len(columns),) * 2, len(values))
+    spearman = _pairwise_spearman(values)
+    return {
+        'columns': columns,
+        'rows': len(values),
+        'counts': _labelled(counts, columns),
+        'covariance': _labelled(covariance, columns),
+        'pearson': _labelled(np.clip(pearson, -1, 1), columns),
+        'spearman': _labelled(np.clip(spearman, -1, 1), columns)
+    }
+
+
+def pair_statistics(matrices, col1, col2):
+    """Pearson, Spearman and covariance of one pair, read from the matrices"""
+    if 'error' in matrices or col1 not in matrices['pearson'].index or col2 not in matrices['pearson'].index:
+        return None
+    return {
+        'correlation': matrices['pearson'].at[col1, col2],
+        'spearman': matrices['spearman'].at[col1, col2],
+        'covariance': matrices['covariance'].at[col1, col2]
+    }
@@ -0,0 +1,215 @@
+"""
+Pre-aggregated rollup cube for the dashboard
+
+The cube holds additive measures at day x Branch x City x Product line x
+Customer_type x Gender x Payment grain. Every KPI, chart and the multivariate
+tables are answered from it, so their cost depends on the number of distinct
+dimension combinations rather than on the number of invoices. Because all
+measures are sums and counts, cubes from different batches merge by addition.
+"""
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ['Date', 'Branch', 'City', 'Product line', 'Customer_type', 'Gender', 'Payment']
+CUBE_MEASURES = ['Total', 'Quantity', 'Count', 'Rating', 'RatingCount']
+
+
+def build_cube(df):
+    """Aggregate preprocessed rows into the rollup cube"""
+    missing_cols = [col for col in CUBE_DIMENSIONS + ['Total', 'Quantity'] if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns for the rollup cube: {missing_cols}")
+
+    rating = df['Rating'] if 'Rating' in df.columns else pd.Series(np.nan, index=df.index)
+    measures = pd.DataFrame({
+        'Total': df['Total'].astype('float64'),
+        'Quantity': df['Quantity'].astype('int64'),
+        'Count': np.ones(len(df), dtype='int64'),
+        'Rating': rating.astype('float64'),
+        'RatingCount': rating.notna().astype('int64')
+    }, index=df.index)
+    keys = [df[col] for col in CUBE_DIMENSIONS]
+    cube = measures.groupby(keys, observed=True, sort=False, dropna=False).sum()
+    return cube.reset_index()
+
+
+def merge_cubes(*cubes):
+    """Combine cubes by adding their measures cell by cell"""
+    cubes = [cube for cube in cubes if cube is not None and len(cube) > 0]
+    if not cubes:
+        return None
+    if len(cubes) == 1:
+        return cubes[0]
+    combined = pd.concat(cubes, ignore_index=True)
+    return combined.groupby(CUBE_DIMENSIONS, observed=True, sort=False, dropna=False)[CUBE_MEASURES].sum().reset_index()
+
+
+def update_cube(cube, new_rows):
+    """Refresh a cube with newly preprocessed rows without touching the history"""
+    return merge_cubes(cube, build_cube(new_rows))
+
+
+def filter_cube(cube, city='All', product='All', date_range=None):
+    """Apply the dashboard filters to the cube cells"""
+    mask = np.ones(len(cube), dtype=bool)
+    if city != 'All':
+        mask &= (cube['City'] == city).to_numpy()
+    if product != 'All':
+        mask &= (cube['Product line'] == product).to_numpy()
+    if date_range is not None and len(date_range) == 2:
+        start_date, end_date = date_range
+        dates = cube['Date']
+        mask &= ((dates >= pd.to_datetime(start_date)) & (dates <= pd.to_datetime(end_date))).to_numpy()
+    return cube[mask]
+
+
+def cube_kpis(cube):
+    """Total revenue, average transaction, transaction count and average rating"""
+    total = cube['Total'].sum()
+    count = int(cube['Count'].sum())
+    rating_count = cube['RatingCount'].sum()
+    return {
+        'total_revenue': total,
+        'avg_transaction': total / count if count else float('nan'),
+        'transactions': count,
+        'avg_rating': cube['Rating'].sum() / rating_count if rating_count else float('nan')
+    }
+
+
+def _rollup(cube, dims):
+    return cube.groupby(dims, observed=True, sort=True)[CUBE_MEASURES].sum()
+
+
+def revenue_by(cube, dim):
+    """Sum of Total per value of one dimension"""
+    return _rollup(cube, [dim])['Total'].reset_index()
+
+
+def daily_revenue(cube):
+    """Sum of Total per day"""
+    return revenue_by(cube, 'Date')
+
+
+def product_performance(cube):
+    """Revenue, quantity and mean rating per product line"""
+    rolled = _rollup(cube, ['Product line'])
+    return pd.DataFrame({
+        'Total': rolled['Total'],
+        'Quantity': rolled['Quantity'],
+        'Rating': rolled['Rating'] / rolled['RatingCount'].replace(0, np.nan)
+    }).reset_index()
+
+
+def value_counts(cube, dim):
+    """Number of transactions per value of one dimension, largest first"""
+    return _rollup(cube, [dim])['Count'].sort_values(ascending=False)
+
+
+def revenue_sum_mean(cube, dims):
+    """Sum and mean of Total per combination of dimensions"""
+    rolled = _rollup(cube, dims)
+    return pd.DataFrame({
+        'sum': rolled['Total'],
+        'mean': rolled['Total'] / rolled['Count']
+    })
+
+
+def crosstab_mean(cube, index, columns):
+    """Mean Total for every (index, columns) pair, like pd.crosstab(..., aggfunc='mean')"""
+    rolled = _rollup(cube, [index, columns])
+    return (rolled['Total'] / rolled['Count']).unstack(columns)
+
+
+def frame_stats(df):
+    """
+    The row-level facts a cube cannot hold: per-Branch min and max Total,
+    plus the frame's column count and memory footprint
+    """
+    extremes = df['Total'].groupby(df['Branch'], observed=True, dropna=False).agg(['min', 'max'])
+    return {
+        'columns': df.shape[1],
+        'memory_bytes': int(df.memory_usage(deep=True).sum()),
+        'extremes': extremes.astype('float64')
+    }
+
+
+def merge_frame_stats(*stats):
+    """Combine frame_stats of disjoint chunks"""
+    extremes = pd.concat([item['extremes'] for item in stats])
+    return {
+        'columns': max(item['columns'] for item in stats),
+        'memory_bytes': sum(item['memory_bytes'] for item in stats),
+        'extremes': extremes.groupby(level=0, observed=True, dropna=False).agg({'min': 'min', 'max': 'max'})
+    }
+
+
+def cube_summary(cube, stats):
+    """The get_data_summary dict, computed from the cube and frame_stats instead of from rows"""
+    count = int(cube['Count'].sum())
+    total = cube['Total'].sum()
+    dates = cube['Date'].dropna()
+    customer_known = cube['Customer_type'].notna()
+    products = value_counts(cube, 'Product line')
+    return {
+        'basic_info': {
+            'total_records': count,
+            'total_columns': stats['columns'],
+            'date_range': f"{dates.min().strftime('%Y-%m-%d')} to {dates.max().strftime('%Y-%m-%d')}",
+            'memory_usage_mb': stats['memory_bytes'] / 1024**2
+        },
+        'revenue_metrics': {
+            'total_revenue': total,
+            'average_transaction': total / count if count else float('nan'),
+            'max_transaction': stats['extremes']['max'].max(),
+            'min_transaction': stats['extremes']['min'].min()
+        },
+        'customer_metrics': {
+            'total_customers': int(cube.loc[customer_known, 'Count'].sum()),
+            'member_percentage': cube.loc[(cube['Customer_type'] == 'Member').to_numpy(), 'Count'].sum() / count * 100 if count else float('nan'),
+            'gender_distribution': value_counts(cube, 'Gender').to_dict()
+        },
+        'product_metrics': {
+            'unique_products': int((products > 0).sum()),
+            'top_product': products.index[0] if len(products) > 0 else "N/A",
+            'total_quantity': int(cube['Quantity'].sum())
+        }
+    }
+
+
+# Named aggregations the dashboard reads; all are small relative to the cube
+AGGREGATIONS = {
+    'kpis': cube_kpis,
+    'city_revenue': lambda cube: revenue_by(cube, 'City'),
+    'product_performance': product_performance,
+    'daily_revenue': daily_revenue,
+    'customer_distribution': lambda cube: value_counts(cube, 'Customer_type'),
+    'city_product_revenue': lambda cube: revenue_sum_mean(cube, ['City', 'Product line']),
+    'city_customer_spending': lambda cube: crosstab_mean(cube, 'City', 'Customer_type')
+}
+
+
+class CubeAggregates:
+    """
+    Named aggregates over one filtered cube, computed on first access
+    With a ResultCache and key prefix, results are shared between callers and
+    the cube itself is only built or filtered when something misses.
+    """
+    def __init__(self, cube, cache=None, key=()):
+        self._cube = cube
+        self.cache = cache
+        self.key = tuple(key)
+        self._results = {}
+
+    @property
+    def cube(self):
+        if callable(self._cube):
+            self._cube = self._cube()
+        return self._cube
+
+    def __getitem__(self, name):
+        compute = lambda: AGGREGATIONS[name](self.cube)
+        if self.cache is None:
+            if name not in self._results:
+                self._results[name] = compute()
+            return self._results[name]
+        return self.cache.get_or_compute(self.key + (name,), compute)
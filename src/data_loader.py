@@ -1,39 +1,149 @@
+import os
+
 import pandas as pd
-import streamlit as st
-
-@st.cache_data
-def load_data():
-    """Load and cache the supermarket sales data"""
-    try:
-        
-        df = pd.read_csv('data/raw/supermarket_sales.csv')
-        st.success("✅ Data loaded successfully!")
-        return df
-    except FileNotFoundError:
-        st.error("❌ File not found: data/raw/supermarket_sales.csv")
-        st.info("💡 Please make sure your CSV file is in the 'data/raw/' folder")
-        return None
-    except Exception as e:
-        st.error(f"❌ Error loading data: {str(e)}")
+from pandas.api.types import union_categoricals
+
+from utils.helpers import track_performance
+from utils.instrumentation import timed
+
+DATA_PATH = 'data/raw/supermarket_sales.csv'
+# The dashboard's source: a single export, or a directory of partitioned files (see src/dataset.py)
+DATA_SOURCE = os.environ.get('SALES_DATA_SOURCE', DATA_PATH)
+HEADER_MARKER = 'Invoice ID'
+CHUNK_SIZE = 250_000
+# Set SALES_TRACE_MEMORY=1 to record traced peak memory on every load (slow on large files)
+TRACE_MEMORY = os.environ.get('SALES_TRACE_MEMORY', '') not in ('', '0')
+
+# Explicit schema for the raw export: categoricals for low-cardinality text,
+# float32 for money and int16 for Quantity. Date and Time stay as text and are
+# parsed once in preprocessing.
+DTYPE_SCHEMA = {
+    'Invoice ID': 'str',
+    'Branch': 'category',
+    'City': 'category',
+    'Customer_type': 'category',
+    'Gender': 'category',
+    'Product line': 'category',
+    'Unit price': 'float32',
+    'Quantity': 'int16',
+    'Tax 5%': 'float32',
+    'Total': 'float32',
+    'Date': 'str',
+    'Time': 'str',
+    'Payment': 'category',
+    'cogs': 'float32',
+    'gross margin percentage': 'float32',
+    'gross income': 'float32',
+    'Rating': 'float32'
+}
+
+# Columns each view needs; None means every column
+VIEW_COLUMNS = {
+    'full': None,
+    'dashboard': ['Branch', 'City', 'Customer_type', 'Gender', 'Product line',
+                  'Unit price', 'Quantity', 'Total', 'Date', 'Time', 'Payment', 'Rating'],
+    'kpi': ['City', 'Product line', 'Customer_type', 'Total', 'Date', 'Rating']
+}
+
+def detect_header_row(path=DATA_PATH, max_lines=50):
+    """Return the number of preamble lines before the CSV header"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f):
+            if line_number >= max_lines:
+                break
+            if HEADER_MARKER in [cell.strip().strip('"') for cell in line.split(',')]:
+                return line_number
+    raise ValueError(f"Header row with '{HEADER_MARKER}' not found in first {max_lines} lines of {path}")
+
+def resolve_columns(columns=None):
+    """Translate a view name or column list into the columns to read"""
+    if isinstance(columns, str):
+        if columns not in VIEW_COLUMNS:
+            raise ValueError(f"Unknown view '{columns}', expected one of {list(VIEW_COLUMNS)}")
+        columns = VIEW_COLUMNS[columns]
+    return list(columns) if columns is not None else None
+
+def iter_data_chunks(path=DATA_PATH, columns=None, chunksize=CHUNK_SIZE):
+    """
+    Stream the raw sales export as typed chunks
+    Skips the preamble rows and reads only the requested columns.
+    A directory is read as a multi-file dataset, one chunk per file.
+    """
+    if os.path.isdir(path):
+        from src.dataset import SalesDataset
+        yield from SalesDataset(path).iter_frames(columns)
+        return
+    usecols = resolve_columns(columns)
+    dtype = DTYPE_SCHEMA if usecols is None else {
+        col: DTYPE_SCHEMA[col] for col in usecols if col in DTYPE_SCHEMA
+    }
+    reader = pd.read_csv(
+        path,
+        skiprows=detect_header_row(path),
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+def concat_chunks(chunks):
+    """Concatenate typed chunks while keeping categorical columns categorical"""
+    chunks = [chunk for chunk in chunks if len(chunk) > 0]
+    if not chunks:
         return None
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    # Chunks only know the categories they saw, so unify them before concatenating
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
+
+@timed('load_data', rows=lambda result: len(result[0]) if result[0] is not None else 0)
+def load_data_chunked(path=DATA_PATH, columns=None, chunksize=CHUNK_SIZE, trace_memory=None):
+    """
+    Load the raw export chunk by chunk
+    Returns the combined frame and a dict with rows, elapsed time, rows/sec and peak memory
+    Traced peak memory is only measured with trace_memory=True (default: TRACE_MEMORY);
+    otherwise peak_memory_mb is None and only peak RSS is reported
+    A directory is loaded as a multi-file dataset, parsing its files in parallel
+    """
+    trace_memory = TRACE_MEMORY if trace_memory is None else trace_memory
+    if os.path.isdir(path):
+        from src.dataset import SalesDataset
+        return SalesDataset(path).load(columns, trace_memory=trace_memory)
+    
+    with track_performance(trace_memory) as stats:
+        df = concat_chunks(iter_data_chunks(path, columns, chunksize))
+    
+    rows = 0 if df is None else len(df)
+    stats['rows'] = rows
+    stats['rows_per_sec'] = rows / stats['elapsed_s'] if stats['elapsed_s'] > 0 else float('inf')
+    return df, stats
+
+def load_data(path=DATA_PATH, columns=None):
+    """
+    Load the supermarket sales data
+    Raises FileNotFoundError if the export is missing and ValueError if it has no records
+    """
+    df, _ = load_data_chunked(path, columns)
+    if df is None:
+        raise ValueError(f"No records found in {path}")
+    return df
 
 def get_basic_info(df):
     """Get basic dataset information"""
     if df is None:
-        st.error("No data available")
-        return
-    
-    st.write("### 📈 Dataset Overview")
-    col1, col2, col3 = st.columns(3)
+        return {"error": "No data available"}
     
-    with col1:
-        st.metric("Total Records", len(df))
-    with col2:
-        st.metric("Columns", df.shape[1])
-    with col3:
-        
-        if 'Date' in df.columns:
-            # For now, just show the column exists - we'll format dates in preprocessing
-            st.metric("Date Column", "Available")
-        else:
-            st.metric("Date Column", "Missing")
\ No newline at end of file
+    return {
+        'total_records': len(df),
+        'total_columns': df.shape[1],
+        'has_date': 'Date' in df.columns
+    }
@@ -1,111 +1,160 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-import streamlit as st
+from pandas.api.types import is_numeric_dtype
+from src.chart_reduction import bin_histogram, reduce_for_chart
+from src.correlation import pair_statistics
+from src.sampling import approximate_crosstab
+from src.streaming_stats import column_stats, pair_stats
+
+# Columns shown with a $ prefix
+CURRENCY_COLUMNS = ['Total', 'Unit price', 'Tax 5%', 'cogs', 'gross income']
+
+def correlation_strength(correlation):
+    """Classify a correlation coefficient as Strong, Moderate or Weak"""
+    if abs(correlation) > 0.7:
+        return 'Strong'
+    elif abs(correlation) > 0.3:
+        return 'Moderate'
+    return 'Weak'
 
 class EDAAnalysis:
-    def __init__(self, df):
-        self.df = df
-    
+    def __init__(self, df, aggregates=None, correlations=None, sample=None):
+        """df may be a callable returning the frame; it is then called on first use"""
+        self._df = df
+        self.aggregates = aggregates
+        self.correlations = correlations
+        self.sample = sample
+
+    @property
+    def df(self):
+        if callable(self._df):
+            self._df = self._df()
+        return self._df
+
     def univariate_analysis(self, column):
         """Univariate analysis for a single variable"""
         if self.df is None or len(self.df) == 0:
-            st.error("No data available for analysis")
-            return
-            
+            return {"error": "No data available for analysis"}
+
         if column not in self.df.columns:
-            st.error(f"Column '{column}' not found in dataset")
-            return
-            
-        st.write(f"### 📊 Univariate Analysis: {column}")
-        
-        if self.df[column].dtype in ['float64', 'int64']:
-            # Numerical analysis
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                # FIXED: Only show $ for likely currency columns
-                if column in ['Total', 'Unit price', 'Tax 5%', 'cogs', 'gross income']:
-                    st.metric("Mean", f"${self.df[column].mean():.2f}")
-                else:
-                    st.metric("Mean", f"{self.df[column].mean():.2f}")
-            with col2:
-                if column in ['Total', 'Unit price', 'Tax 5%', 'cogs', 'gross income']:
-                    st.metric("Median", f"${self.df[column].median():.2f}")
-                else:
-                    st.metric("Median", f"{self.df[column].median():.2f}")
-            with col3:
-                st.metric("Std Dev", f"{self.df[column].std():.2f}")
-            with col4:
-                st.metric("Skewness", f"{self.df[column].skew():.2f}")
-        else:
-            # Categorical analysis
-            value_counts = self.df[column].value_counts()
-            st.write("Value Counts:", value_counts)
-    
+            return {"error": f"Column '{column}' not found in dataset"}
+
+        series = self.df[column]
+        if is_numeric_dtype(series):
+            # Numerical analysis: one streaming pass for moments and quantiles
+            return {
+                'column': column,
+                'kind': 'numerical',
+                'is_currency': column in CURRENCY_COLUMNS,
+                **column_stats(series).summary(),
+                'histogram': bin_histogram(series)
+            }
+
+        # Categorical analysis
+        return {
+            'column': column,
+            'kind': 'categorical',
+            'value_counts': series.value_counts()
+        }
+
     def bivariate_analysis(self, col1, col2):
         """Bivariate analysis between two variables"""
         if self.df is None or len(self.df) == 0:
-            st.error("No data available for analysis")
-            return
-            
+            return {"error": "No data available for analysis"}
+
         # Check if columns exist
         missing_cols = [col for col in [col1, col2] if col not in self.df.columns]
         if missing_cols:
-            st.error(f"Columns not found: {missing_cols}")
-            return
-            
-        st.write(f"### 🔗 Bivariate Analysis: {col1} vs {col2}")
-        
-        # Check if both are numerical
-        if (self.df[col1].dtype in ['float64', 'int64'] and 
-            self.df[col2].dtype in ['float64', 'int64']):
-            
-            correlation = self.df[col1].corr(self.df[col2])
-            st.metric("Correlation Coefficient", f"{correlation:.3f}")
-            
-            # Interpretation
-            if abs(correlation) > 0.7:
-                st.info("💡 **Strong correlation** between variables")
-            elif abs(correlation) > 0.3:
-                st.info("💡 **Moderate correlation** between variables")
-            else:
-                st.info("💡 **Weak correlation** between variables")
+            return {"error": f"Columns not found: {missing_cols}"}
+
+        result = {'columns': (col1, col2), 'correlation': None, 'strength': None}
+
+        # Read the pair from the precomputed correlation matrices when available
+        cached = pair_statistics(self.correlations, col1, col2) if self.correlations is not None else None
+        if cached is not None:
+            result.update(cached)
+            result['strength'] = correlation_strength(cached['correlation'])
+        elif is_numeric_dtype(self.df[col1]) and is_numeric_dtype(self.df[col2]):
+            stats = pair_stats(self.df[col1], self.df[col2])
+            result['correlation'] = stats.correlation
+            result['covariance'] = stats.covariance
+            result['strength'] = correlation_strength(stats.correlation)
+        # Scatter of the pair, pre-binned to a density grid when it has too many points to plot
+        if result['correlation'] is not None and col1 != col2:
+            result['scatter'], result['reduction'] = reduce_for_chart(
+                self.df[[col1, col2]].dropna(), 'scatter', col1, col2
+            )
+        return result
+
+    def multivariate_analysis(self, approximate=False):
+        """
+        Multivariate analysis for key business insights
+        approximate=True estimates both tables from the stratified sample, with
+        95% confidence half-widths, in time independent of the number of rows.
+        """
+        if approximate and self.sample is not None:
+            return self.approximate_multivariate_analysis()
+        # The cube answers both tables, so the rows are only read without one
+        if self.aggregates is not None:
+            if self.aggregates['kpis']['transactions'] == 0:
+                return {"error": "No data available for analysis"}
+        elif self.df is None or len(self.df) == 0:
+            return {"error": "No data available for analysis"}
         else:
-            st.info("🔍 At least one variable is categorical - try numerical columns for correlation analysis")
-    
-    def multivariate_analysis(self):
-        """Multivariate analysis for key business insights"""
-        if self.df is None or len(self.df) == 0:
-            st.error("No data available for analysis")
-            return
-            
-        st.write("### 🎯 Multivariate Business Insights")
-        
-        # Check if required columns exist
-        required_cols = ['City', 'Product line', 'Total', 'Customer_type']
-        missing_cols = [col for col in required_cols if col not in self.df.columns]
-        
-        if missing_cols:
-            st.error(f"Missing columns for multivariate analysis: {missing_cols}")
-            return
-        
+            # Check if required columns exist
+            required_cols = ['City', 'Product line', 'Total', 'Customer_type']
+            missing_cols = [col for col in required_cols if col not in self.df.columns]
+
+            if missing_cols:
+                return {"error": f"Missing columns for multivariate analysis: {missing_cols}"}
+
+        result = {'errors': []}
+
         # Insight 1: Revenue by City and Product Line
         try:
-            insight1 = self.df.groupby(['City', 'Product line'])['Total'].agg(['sum', 'mean']).round(2)
-            st.write("**Revenue by City and Product Line:**")
-            st.dataframe(insight1)
+            if self.aggregates is not None:
+                result['revenue_by_city_product'] = self.aggregates['city_product_revenue'].round(2)
+            else:
+                result['revenue_by_city_product'] = self.df.groupby(
+                    ['City', 'Product line'], observed=True
+                )['Total'].agg(['sum', 'mean']).round(2)
         except Exception as e:
-            st.error(f"Error in revenue analysis: {e}")
-        
+            result['errors'].append(f"Error in revenue analysis: {e}")
+
         # Insight 2: Customer Type behavior across cities
         try:
-            insight2 = pd.crosstab(
-                self.df['City'], 
-                self.df['Customer_type'], 
-                values=self.df['Total'], 
-                aggfunc='mean'
-            ).round(2)
-            st.write("**Average Spending by City and Customer Type:**")
-            st.dataframe(insight2)
+            if self.aggregates is not None:
+                result['spending_by_city_customer'] = self.aggregates['city_customer_spending'].round(2)
+            else:
+                result['spending_by_city_customer'] = pd.crosstab(
+                    self.df['City'],
+                    self.df['Customer_type'],
+                    values=self.df['Total'],
+                    aggfunc='mean'
+                ).round(2)
         except Exception as e:
-            st.error(f"Error in customer analysis: {e}")
\ No newline at end of file
+            result['errors'].append(f"Error in customer analysis: {e}")
+
+        return result
+
+    def approximate_multivariate_analysis(self, confidence=0.95):
+        """Estimate the multivariate tables from the stratified sample"""
+        summary = self.sample.summary()
+        if summary['sampled_rows'] == 0:
+            return {"error": "No sampled rows match the current filters"}
+
+        result = {'errors': [], 'approximate': True, 'confidence': confidence, 'sample': summary}
+        try:
+            estimates = self.sample.estimate(['City', 'Product line'], 'Total', confidence)
+            result['revenue_by_city_product'] = estimates[['sum', 'sum_margin', 'mean', 'mean_margin']].round(2)
+        except Exception as e:
+            result['errors'].append(f"Error in revenue analysis: {e}")
+
+        try:
+            means, margins = approximate_crosstab(self.sample, 'City', 'Customer_type', 'Total', confidence)
+            result['spending_by_city_customer'] = means.round(2)
+            result['spending_margin'] = margins.round(2)
+        except Exception as e:
+            result['errors'].append(f"Error in customer analysis: {e}")
+
+        return result
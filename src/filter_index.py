@@ -0,0 +1,172 @@
+"""
+Precomputed row indexes for the dashboard filters
+
+The frame is sorted by Date once, so a date range is a binary-search slice.
+For every combination of the value columns (City, Product line) the row
+positions of each value are stored in ascending order; a query looks up the
+positions for the selected values and narrows them to the date window with
+two more binary searches. Nothing is copied until a frame is requested;
+FilteredRows carries a selection around and copies it only on first use.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import correlation_matrices
+from src.eda_analysis import EDAAnalysis
+
+FILTER_COLUMNS = ('City', 'Product line')
+ALL = 'All'
+
+
+def intersect_positions(*arrays):
+    """Intersect ascending position arrays, smallest first"""
+    arrays = sorted(arrays, key=len)
+    result = arrays[0]
+    for other in arrays[1:]:
+        if len(result) == 0 or len(other) == 0:
+            return result[:0]
+        idx = np.searchsorted(other, result)
+        found = other[np.minimum(idx, len(other) - 1)] == result
+        result = result[found]
+    return result
+
+
+class FilterIndex:
+    def __init__(self, df, date_column='Date', value_columns=FILTER_COLUMNS, max_combination=2):
+        dates = df[date_column].to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(dates, kind='stable')
+        if np.all(order[1:] > order[:-1]):
+            self.df = df.reset_index(drop=True)
+        else:
+            self.df = df.take(order).reset_index(drop=True)
+            dates = dates[order]
+        self.dates = dates
+        self.date_column = date_column
+        self.value_columns = tuple(value_columns)
+        self._indexes = {}
+
+        codes = {col: pd.factorize(self.df[col], use_na_sentinel=True) for col in self.value_columns}
+        # Combined indexes make multi-column filters a single lookup; selections
+        # wider than max_combination fall back to intersecting single-column indexes
+        for size in range(1, min(max_combination, len(self.value_columns)) + 1):
+            for cols in combinations(self.value_columns, size):
+                self._indexes[cols] = self._build_index([codes[col] for col in cols])
+
+    @staticmethod
+    def _build_index(factorized):
+        """Map each value tuple to the ascending row positions holding it"""
+        key = np.zeros(len(factorized[0][0]), dtype=np.int64)
+        for col_codes, uniques in factorized:
+            key = key * (len(uniques) + 1) + (col_codes + 1)
+        order = np.argsort(key, kind='stable')
+        if len(order) < np.iinfo(np.int32).max:
+            order = order.astype(np.int32)
+        sorted_key = key[order]
+        starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+        ends = np.r_[starts[1:], len(sorted_key)]
+
+        index = {}
+        for start, end in zip(starts, ends):
+            remainder = sorted_key[start]
+            values = []
+            for col_codes, uniques in reversed(factorized):
+                remainder, code = divmod(remainder, len(uniques) + 1)
+                values.append(uniques[code - 1] if code > 0 else None)
+            index[tuple(reversed(values))] = order[start:end]
+        return index
+
+    def __len__(self):
+        return len(self.df)
+
+    def dimension_values(self, column):
+        """Distinct values of a filter column, sorted; read from its index keys"""
+        return sorted((key[0] for key in self._indexes[(column,)] if key[0] is not None), key=str)
+
+    def date_window(self, date_range=None):
+        """Row bounds [lo, hi) of an inclusive date range"""
+        if date_range is None or len(date_range) != 2:
+            return 0, len(self.dates)
+        start_date, end_date = date_range
+        lo = np.searchsorted(self.dates, np.datetime64(pd.to_datetime(start_date), 'ns'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.to_datetime(end_date), 'ns'), side='right')
+        return int(lo), int(hi)
+
+    def value_positions(self, selection):
+        """Ascending positions matching every {column: value} pair"""
+        cols = tuple(col for col in self.value_columns if col in selection)
+        if cols in self._indexes:
+            key = tuple(selection[col] for col in cols)
+            return self._indexes[cols].get(key, np.empty(0, dtype=np.intp))
+        return intersect_positions(*[
+            self._indexes[(col,)].get((selection[col],), np.empty(0, dtype=np.intp))
+            for col in cols
+        ])
+
+    def select(self, city=ALL, product=ALL, date_range=None):
+        """
+        Return the matching rows as a slice (no value filter) or a position array
+        Both are views; no frame data is copied
+        """
+        lo, hi = self.date_window(date_range)
+        selection = {}
+        if city != ALL:
+            selection['City'] = city
+        if product != ALL:
+            selection['Product line'] = product
+        if not selection:
+            return slice(lo, hi)
+
+        positions = self.value_positions(selection)
+        start, end = np.searchsorted(positions, [lo, hi], side='left')
+        return positions[start:end]
+
+    def view(self, city=ALL, product=ALL, date_range=None):
+        """The matching rows as a FilteredRows; nothing is copied"""
+        return FilteredRows(self, self.select(city, product, date_range))
+
+    def frame(self, rows):
+        """Materialize the result of select() as a frame"""
+        if isinstance(rows, slice):
+            return self.df.iloc[rows]
+        return self.df.take(rows)
+
+    def count(self, rows):
+        if isinstance(rows, slice):
+            return rows.stop - rows.start
+        return len(rows)
+
+
+class FilteredRows:
+    """
+    The rows of one filter state, copied into a frame only when a section needs them
+    The row count and the columns come from the index, so sections answered
+    from the cube never pay for the copy.
+    """
+    def __init__(self, index, rows):
+        self.index = index
+        self.rows = rows
+        self._frame = None
+
+    def __len__(self):
+        return self.index.count(self.rows)
+
+    @property
+    def columns(self):
+        return self.index.df.columns
+
+    def numeric_columns(self):
+        return self.index.df.select_dtypes(include=[np.number]).columns
+
+    def frame(self):
+        if self._frame is None:
+            self._frame = self.index.frame(self.rows)
+        return self._frame
+
+    def correlation_matrices(self):
+        return correlation_matrices(self.frame())
+
+    def analysis(self, aggregates=None, correlations=None, sample=None):
+        """EDAAnalysis over these rows; the frame is copied on its first row-level query"""
+        return EDAAnalysis(self.frame, aggregates, correlations, sample)
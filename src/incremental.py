@@ -0,0 +1,233 @@
+"""
+Append-only preprocessing for daily invoice batches
+
+Each batch is preprocessed on its own (row-local features only) and appended
+as new Arrow partition files under data/processed/incremental/. Running
+per-Customer_type sum/count totals are kept in state.json, so the customer
+averages update in O(new rows) and are broadcast when the dataset is read
+instead of being stored on every historical row. The dashboard rollup cube
+is refreshed from each batch alone and saved next to the partitions.
+
+A dataset directory (see src/dataset.py) gets its own store under
+data/processed/sources/, and sync() appends only the files it has not seen,
+so the dashboard's refresh after a new daily file parses and preprocesses
+just that file. If an ingested file is changed or removed the store is rebuilt,
+since appended rows cannot be taken back.
+
+Usage:
+    python -m src.incremental append BATCH.csv [BATCH.csv ...] [--store DIR]
+    python -m src.incremental sync DATASET_DIR [--store DIR]
+    python -m src.incremental status [--store DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from src.cache import read_frame, read_partitions, source_fingerprint, write_frame, write_partitions
+from src.cube import update_cube
+from src.data_loader import load_data_chunked
+from src.dataset import SalesDataset
+from src.preprocessing import (
+    PIPELINE_VERSION, REQUIRED_COLUMNS, add_customer_features, customer_type_totals,
+    engineer_row_features, merge_customer_totals
+)
+
+STORE_DIR = 'data/processed/incremental'
+SOURCE_STORE_DIR = 'data/processed/sources'
+STATE_NAME = 'state.json'
+
+
+def source_store_dir(source, store_dir=SOURCE_STORE_DIR):
+    """Store directory of one dataset directory, keyed on its absolute path"""
+    return os.path.join(store_dir, hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:16])
+
+
+class IncrementalStore:
+    def __init__(self, root=STORE_DIR, reset_stale=False):
+        """reset_stale=True empties a store built by another pipeline version instead of raising"""
+        self.root = root
+        self.data_dir = os.path.join(root, 'data')
+        self.reset_stale = reset_stale
+        self.state = self._read_state()
+
+    def _empty_state(self):
+        return {
+            'pipeline_version': PIPELINE_VERSION,
+            'rows': 0,
+            'next_part': 0,
+            'customer_type_totals': {},
+            'cube': None,
+            'batches': {},
+            'files': []
+        }
+
+    def _read_state(self):
+        try:
+            with open(os.path.join(self.root, STATE_NAME)) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return self._empty_state()
+
+        if state.get('pipeline_version') != PIPELINE_VERSION:
+            if self.reset_stale:
+                shutil.rmtree(self.root, ignore_errors=True)
+                return self._empty_state()
+            raise ValueError(
+                f"Incremental store {self.root} was built with pipeline version "
+                f"{state.get('pipeline_version')}, current is {PIPELINE_VERSION}; "
+                "call reset() and re-append the history"
+            )
+        return state
+
+    def _write_state(self):
+        # Write then rename, so a crash never leaves a half-written state file.
+        # Partition files written before the crash are simply not referenced.
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.state-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.root, STATE_NAME))
+
+    @property
+    def rows(self):
+        return self.state['rows']
+
+    def customer_totals(self):
+        """Running per-Customer_type (sum, count) of Total"""
+        return {key: tuple(value) for key, value in self.state['customer_type_totals'].items()}
+
+    def customer_averages(self):
+        """Average Total per Customer_type over every appended row"""
+        return {key: total / count for key, (total, count) in self.customer_totals().items() if count}
+
+    def has_batch(self, batch_id):
+        return batch_id in self.state['batches']
+
+    def append(self, raw_df, batch_id):
+        """
+        Preprocess a raw batch and append it to the store
+        Returns the number of rows appended (0 if the batch was already ingested)
+        """
+        if self.has_batch(batch_id):
+            return 0
+
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in raw_df.columns]
+        if missing_columns:
+            raise ValueError(f"Batch {batch_id} is missing required columns: {missing_columns}")
+        if len(raw_df) == 0:
+            self.state['batches'][batch_id] = {'rows': 0, 'files': []}
+            self._write_state()
+            return 0
+
+        processed = engineer_row_features(raw_df)
+        batch_totals = customer_type_totals(processed)
+        part = self.state['next_part']
+        files = write_partitions(processed, self.data_dir, part_name=f"part-{part}.arrow")
+
+        # Each refresh writes a new cube file that only becomes current with the state
+        previous_cube = self.state.get('cube')
+        cube_name = f"cube-{part}.arrow"
+        write_frame(update_cube(self.cube(), processed), os.path.join(self.root, cube_name))
+
+        totals = merge_customer_totals(self.customer_totals(), batch_totals)
+        self.state['customer_type_totals'] = {key: list(value) for key, value in totals.items()}
+        self.state['batches'][batch_id] = {'rows': len(processed), 'files': files}
+        self.state['files'].extend(files)
+        self.state['rows'] += len(processed)
+        self.state['cube'] = cube_name
+        self.state['next_part'] += 1
+        self._write_state()
+        if previous_cube:
+            os.remove(os.path.join(self.root, previous_cube))
+        return len(processed)
+
+    def append_file(self, path):
+        """Append a raw export file, skipping it if the same content was already ingested"""
+        batch_id = source_fingerprint(path)
+        if self.has_batch(batch_id):
+            return 0
+        raw_df, _ = load_data_chunked(path)
+        if raw_df is None:
+            return 0
+        return self.append(raw_df, batch_id)
+
+    def sync(self, dataset):
+        """
+        Append every file of a SalesDataset that is not in the store yet
+        Returns the number of rows appended
+        """
+        files = {data_file.signature(): data_file for data_file in dataset.files()}
+        if any(batch_id not in files for batch_id in self.state['batches']):
+            self.reset()
+        new_files = [data_file for batch_id, data_file in files.items() if not self.has_batch(batch_id)]
+        invalid = dataset.validate(new_files)
+        if invalid:
+            details = '; '.join(f"{path}: {missing}" for path, missing in invalid.items())
+            raise ValueError(f"Files missing required columns: {details}")
+
+        appended = 0
+        for data_file in new_files:
+            raw_df = data_file.read().to_pandas(split_blocks=True, self_destruct=True)
+            appended += self.append(raw_df, data_file.signature())
+        return appended
+
+    def cube(self):
+        """The rollup cube over every appended row, or None if nothing was appended"""
+        if not self.state.get('cube'):
+            return None
+        return read_frame(os.path.join(self.root, self.state['cube']))
+
+    def load(self, columns=None):
+        """Read every appended row and broadcast the current Customer_type averages"""
+        if not self.state['files']:
+            return None
+        if columns is not None and 'Avg_CustomerType_Spending' in columns:
+            columns = [col for col in columns if col != 'Avg_CustomerType_Spending']
+            needs_average = True
+        else:
+            needs_average = columns is None
+
+        read_columns = columns
+        if needs_average and columns is not None:
+            read_columns = list(dict.fromkeys(columns + ['Customer_type']))
+        df = read_partitions(self.data_dir, self.state['files'], read_columns)
+        if needs_average:
+            add_customer_features(df, self.customer_totals())
+        return df
+
+    def reset(self):
+        """Forget every batch; partition files are removed with the store directory"""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.state = self._empty_state()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append daily invoice batches to the preprocessed store")
+    parser.add_argument('command', choices=['append', 'sync', 'status'])
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--store', help=f"store directory (default: {STORE_DIR}, or the dataset's own store for sync)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'sync':
+        if len(args.paths) != 1:
+            parser.error("sync takes one dataset directory")
+        store = IncrementalStore(args.store or source_store_dir(args.paths[0]))
+        appended = store.sync(SalesDataset(args.paths[0]))
+        print(f"{args.paths[0]}: {appended:,} rows appended")
+    else:
+        store = IncrementalStore(args.store or STORE_DIR)
+    if args.command == 'append':
+        for path in args.paths:
+            appended = store.append_file(path)
+            print(f"{path}: {appended:,} rows appended" if appended else f"{path}: already ingested")
+    print(f"Store {store.root}: {store.rows:,} rows in {len(store.state['batches'])} batches")
+    for key, average in sorted(store.customer_averages().items()):
+        print(f"  {key}: average spending {average:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""
+Process-pool execution of preprocessing and groupby aggregations
+
+The dataset is partitioned by Branch, by month or into contiguous row ranges
+(one per worker, so the split does not depend on how many branches or months
+the data has) and each partition is handled by a worker process. Row-local
+features are computed independently; anything
+that spans partitions (the Customer_type averages, group means, the
+City x Customer_type crosstab) is merged from partial sums and counts, so the
+result matches the single-process path exactly.
+
+preprocess_data(df, workers=N) and the precompute pipeline use this module
+when N > 1; SALES_WORKERS sets the dashboard's default.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.cube import build_cube, merge_cubes
+from src.preprocessing import (
+    add_customer_features, categorize_text, customer_type_totals, engineer_row_features,
+    merge_customer_totals, parse_dates
+)
+from src.streaming_stats import column_stats
+
+PARTITION_KEYS = ('Branch', 'Month', 'Rows')
+# Worker processes used by the dashboard pipeline; 1 keeps everything in-process
+WORKERS = int(os.environ.get('SALES_WORKERS', '1'))
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def partition_frame(df, by='Branch', parts=None):
+    """
+    Split a raw or preprocessed frame into partitions by Branch, by month,
+    or into `parts` contiguous row ranges (default: one per CPU)
+    """
+    if by not in PARTITION_KEYS:
+        raise ValueError(f"Unknown partition key '{by}', expected one of {PARTITION_KEYS}")
+    if by == 'Rows':
+        bounds = np.linspace(0, len(df), min(parts or default_workers(), max(len(df), 1)) + 1).astype(np.int64)
+        return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    if by == 'Branch':
+        keys = df['Branch']
+    else:
+        keys = parse_dates(df['Date']).astype('datetime64[M]')
+    return [part for _, part in df.groupby(keys, observed=True, sort=True, dropna=False)]
+
+
+def _map(func, parts, workers):
+    """Run func over the partitions, in-process when a single worker is requested"""
+    if workers <= 1 or len(parts) <= 1:
+        return [func(part) for part in parts]
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+        return list(pool.map(func, parts))
+
+
+def _preprocess_partition(part, compact=False):
+    processed = engineer_row_features(part, compact)
+    return processed, customer_type_totals(processed)
+
+
+def parallel_preprocess(raw_df, workers=None, by='Branch', compact=False):
+    """
+    Run the vectorized preprocessing on each partition in a process pool
+    Returns the same frame as engineer_features(raw_df, compact=compact), in the original row order
+    """
+    workers = workers or default_workers()
+    positioned = raw_df.set_axis(pd.RangeIndex(len(raw_df)))
+    results = _map(partial(_preprocess_partition, compact=compact), partition_frame(positioned, by, workers), workers)
+    df_clean = pd.concat([processed for processed, _ in results]).sort_index().set_axis(raw_df.index)
+    if compact:
+        # Partitions may disagree on which text columns are low-cardinality
+        categorize_text(df_clean)
+    add_customer_features(df_clean, merge_customer_totals(*[totals for _, totals in results]), compact)
+    return df_clean
+
+
+def parallel_cube(df, workers=None, by='Branch'):
+    """Build the rollup cube per partition and merge the additive measures"""
+    workers = workers or default_workers()
+    return merge_cubes(*_map(build_cube, partition_frame(df, by, workers), workers))
+
+
+def _partial_sums(part, dims):
+    grouped = part.groupby(dims, observed=True)['Total']
+    return pd.DataFrame({'sum': grouped.sum().astype('float64'), 'count': grouped.count()})
+
+
+def merge_partial_sums(partials):
+    """Add partial (sum, count) frames that may cover different groups"""
+    merged = partials[0]
+    for part_sums in partials[1:]:
+        merged = merged.add(part_sums, fill_value=0)
+    return merged.sort_index()
+
+
+def _sum_mean(merged):
+    return pd.DataFrame({'sum': merged['sum'], 'mean': merged['sum'] / merged['count'].replace(0, np.nan)})
+
+
+MULTIVARIATE_GROUPS = (['City', 'Product line'], ['City', 'Customer_type'])
+
+
+def _partial_multivariate(part):
+    return [_partial_sums(part, dims) for dims in MULTIVARIATE_GROUPS]
+
+
+def parallel_multivariate(df, workers=None, by='Branch'):
+    """
+    The two EDAAnalysis.multivariate_analysis tables, computed in one parallel pass
+    Returns (revenue by City and Product line, mean spending by City and Customer_type)
+    """
+    workers = workers or default_workers()
+    partials = _map(_partial_multivariate, partition_frame(df, by, workers), workers)
+    insight1, insight2 = [
+        _sum_mean(merge_partial_sums([part_sums[i] for part_sums in partials]))
+        for i in range(len(MULTIVARIATE_GROUPS))
+    ]
+    return insight1, insight2['mean'].unstack('Customer_type')
+
+
+def _partial_column_stats(part, columns):
+    return {column: column_stats(part[column]) for column in columns}
+
+
+def parallel_column_stats(df, columns, workers=None, by='Branch'):
+    """Streaming ColumnStats per partition, merged into one per column"""
+    workers = workers or default_workers()
+    partials = _map(partial(_partial_column_stats, columns=list(columns)), partition_frame(df, by, workers), workers)
+    merged = partials[0]
+    for stats in partials[1:]:
+        for column in merged:
+            merged[column].merge(stats[column])
+    return merged
@@ -0,0 +1,309 @@
+"""
+Background precomputation after a data refresh
+
+PrecomputeWorker watches the raw-data directory. When a file there changes
+(and has stopped changing between two polls) it prepares the new dataset off
+the request path: load and preprocess (or read the on-disk cache), build the
+filter index and rollup cube, then warm the shared ResultCache for every
+City x Product line combination over the full date range. Only then is the
+new PreparedDataset swapped in with a single reference assignment, so
+sessions keep reading the previous version until the new one is complete.
+A dataset directory is read through its incremental store (src/incremental.py),
+so a new daily file costs a parse and preprocess of that file only; the filter
+index and the warmed aggregates are still rebuilt over the full history.
+
+Run as a CLI it warms the on-disk caches (and optionally the DuckDB file), so
+the dashboard's first load is a memory-map rather than a CSV parse.
+
+Usage:
+    python -m src.precompute [--source PATH] [--sql] [--workers N] [--watch [--interval SECONDS]]
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+
+from src.cache import cache_key, read_cache, write_cache
+from src.correlation import correlation_matrices
+from src.cube import AGGREGATIONS, CubeAggregates, build_cube, filter_cube
+from src.data_loader import DATA_SOURCE, TRACE_MEMORY, load_data_chunked
+from src.dataset import SalesDataset
+from src.filter_index import ALL, FilterIndex
+from src.incremental import IncrementalStore, source_store_dir
+from src.parallel import WORKERS, parallel_cube
+from src.preprocessing import COMPACT, preprocess_data, preprocessing_report
+from src.sampling import StratifiedSample
+from src.timeseries import TimeSeries
+from utils.helpers import track_performance
+
+WATCH_DIR = os.path.dirname(DATA_SOURCE)
+POLL_INTERVAL_S = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedDataset:
+    """One immutable, fully built dataset version"""
+
+    def __init__(self, version, source, index, cube, load_stats=None, report=None):
+        self.version = version
+        self.source = source
+        self.index = index
+        self.cube = cube
+        self.load_stats = load_stats
+        self.report = report
+        self.prepared_at = time.time()
+        self.warmed = 0
+
+
+def directory_signature(directory=WATCH_DIR):
+    """(relative path, mtime_ns, size) of every file under the directory, for change detection"""
+    if not os.path.isdir(directory):
+        return ()
+    entries = []
+    for root, subdirs, names in os.walk(directory):
+        subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+        for name in names:
+            if not name.startswith('.'):
+                stat = os.stat(os.path.join(root, name))
+                entries.append((os.path.relpath(os.path.join(root, name), directory), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def watch_directory(source):
+    """Directory whose changes can change the source: the dataset directory itself, or the file's parent"""
+    return source if os.path.isdir(source) else os.path.dirname(source) or '.'
+
+
+def source_signature(source):
+    """Cheap change token for a source file or dataset directory"""
+    if os.path.isdir(source):
+        return directory_signature(source)
+    stat = os.stat(source)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _build_cube(df, workers):
+    return parallel_cube(df, workers, by='Rows') if workers > 1 else build_cube(df)
+
+
+def prepare_store_dataset(path, version):
+    """
+    Index a dataset directory through its incremental store
+    Only files the store has not seen are parsed and preprocessed; their rows
+    are appended and folded into the stored cube and Customer_type totals.
+    """
+    store = IncrementalStore(source_store_dir(path), reset_stale=True)
+    with track_performance(TRACE_MEMORY) as load_stats:
+        appended = store.sync(SalesDataset(path))
+    load_stats['rows'] = appended
+    load_stats['rows_per_sec'] = appended / load_stats['elapsed_s'] if load_stats['elapsed_s'] > 0 else float('inf')
+    df = store.load()
+    if df is None:
+        raise ValueError(f"No records found in {path}")
+    index = FilterIndex(df)
+    return PreparedDataset(version, path, index, store.cube(), load_stats)
+
+
+def prepare_dataset(path=DATA_SOURCE, version=None, workers=WORKERS):
+    """
+    Load and index one dataset version
+    A single export is read from the on-disk cache when valid; a dataset
+    directory is kept up to date through its incremental store.
+    With workers > 1 a cold load is preprocessed and cubed in a process pool.
+    SALES_COMPACT=1 preprocesses (and caches) a single export in the compact schema.
+    """
+    version = version or cache_key(path)
+    if os.path.isdir(path):
+        return prepare_store_dataset(path, version)
+    load_stats = report = None
+    try:
+        df = read_cache(path, key=version)
+    except ImportError:
+        df = None
+    if df is None:
+        raw_df, load_stats = load_data_chunked(path)
+        if raw_df is None:
+            raise ValueError(f"No records found in {path}")
+        df = preprocess_data(raw_df, compact=COMPACT, workers=workers)
+        report = preprocessing_report(raw_df, df)
+        try:
+            write_cache(df, path, key=version)
+        except Exception as e:
+            logger.warning("Could not write preprocessed cache: %s", e)
+    index = FilterIndex(df)
+    return PreparedDataset(version, path, index, _build_cube(index.df, workers), load_stats, report)
+
+
+def common_filters(dataset):
+    """Each City x Product line (and their 'All' rows) over the full date range"""
+    df = dataset.index.df
+    full_range = (df['Date'].min().date(), df['Date'].max().date())
+    cities = [ALL] + list(df['City'].unique())
+    products = [ALL] + list(df['Product line'].unique())
+    return [(city, product, full_range) for city in cities for product in products]
+
+
+def filter_key(city, product, date_range):
+    """Result-cache key of a filter state; must match the one the app builds"""
+    return (city, product, tuple(str(d) for d in date_range))
+
+
+def timeseries_key(version, city, product):
+    """Result-cache key of the time series for a selection; it covers every date range"""
+    return (version, filter_key(city, product, ()), 'timeseries')
+
+
+def sample_key(version):
+    """Result-cache key of the stratified sample; one per dataset version, filters only mask it"""
+    return (version, 'sample')
+
+
+def warm_result_cache(dataset, result_cache, filters=None, correlations=True):
+    """Build the stratified sample, then every named aggregation, the time series (and the correlation matrices) for each filter state"""
+    filters = filters if filters is not None else common_filters(dataset)
+    index, cube = dataset.index, dataset.cube
+    result_cache.get_or_compute(sample_key(dataset.version), lambda: StratifiedSample.from_frame(index.df))
+    for city, product, date_range in filters:
+        key = (dataset.version, filter_key(city, product, date_range))
+        aggregates = CubeAggregates(
+            lambda: filter_cube(cube, city, product, date_range), cache=result_cache, key=key
+        )
+        for name in AGGREGATIONS:
+            aggregates[name]
+        result_cache.get_or_compute(
+            timeseries_key(dataset.version, city, product),
+            lambda: TimeSeries.from_frame(index.frame(index.select(city, product)))
+        )
+        if correlations:
+            result_cache.get_or_compute(
+                key + ('correlations',),
+                lambda: correlation_matrices(index.frame(index.select(city, product, date_range)))
+            )
+    return len(filters)
+
+
+class PrecomputeWorker:
+    """
+    Daemon thread that keeps an up-to-date PreparedDataset
+    active() never blocks; wait() blocks only until the first dataset is ready.
+    """
+
+    def __init__(self, source=DATA_SOURCE, result_cache=None, watch_dir=None, interval=POLL_INTERVAL_S,
+                 workers=WORKERS):
+        self.source = source
+        self.workers = workers
+        self.result_cache = result_cache
+        self.watch_dir = watch_dir or watch_directory(source)
+        self.interval = interval
+        self.error = None
+        self.refreshes = 0
+        self._active = None
+        self._signature = None
+        self._pending = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def active(self):
+        """The current dataset, or None before the first one is ready"""
+        return self._active
+
+    def wait(self, timeout=None):
+        self._ready.wait(timeout)
+        return self._active
+
+    def refresh(self, force=False):
+        """Prepare and warm the source if its content changed; returns True when a new version was swapped in"""
+        version = cache_key(self.source)
+        current = self._active
+        if current is not None and current.version == version and not force:
+            return False
+        dataset = prepare_dataset(self.source, version, self.workers)
+        if self.result_cache is not None:
+            dataset.warmed = warm_result_cache(dataset, self.result_cache)
+        # Single reference assignment: readers see either the old or the new dataset
+        self._active = dataset
+        self.refreshes += 1
+        return True
+
+    def _poll(self):
+        signature = directory_signature(self.watch_dir)
+        # Refresh on start, then only once a change has settled for one interval
+        if self._active is not None and signature == self._signature:
+            return
+        if self._active is not None and self._pending != signature:
+            self._pending = signature
+            return
+        try:
+            self.refresh()
+            self.error = None
+        except Exception as e:
+            logger.exception("Dataset refresh failed")
+            self.error = f"{type(e).__name__}: {e}"
+        self._signature = signature
+        self._ready.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            self._poll()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='precompute-worker', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self):
+        dataset = self._active
+        return {
+            'version': dataset.version if dataset else None,
+            'rows': len(dataset.index.df) if dataset else 0,
+            'prepared_at': dataset.prepared_at if dataset else None,
+            'warmed_filters': dataset.warmed if dataset else 0,
+            'refreshes': self.refreshes,
+            'error': self.error
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare and warm caches for the current dataset")
+    parser.add_argument('--source', default=DATA_SOURCE, help="a CSV export or a directory of partitioned files")
+    parser.add_argument('--sql', action='store_true', help="also build the DuckDB backend file")
+    parser.add_argument('--watch', action='store_true', help="keep running and refresh when the data changes")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL_S)
+    parser.add_argument('--workers', type=int, default=WORKERS, help="processes used to preprocess a cold load")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    last_version = None
+    signature = None
+    while True:
+        current = directory_signature(watch_directory(args.source))
+        if current != signature:
+            signature = current
+            version = cache_key(args.source)
+            if version != last_version:
+                started = time.perf_counter()
+                dataset = prepare_dataset(args.source, version, args.workers)
+                if args.sql:
+                    from src.sql_backend import open_backend
+                    open_backend(args.source, key=version).close()
+                last_version = version
+                logger.info("Prepared %s: %s rows in %.2fs", version, f"{len(dataset.index.df):,}",
+                            time.perf_counter() - started)
+        if not args.watch:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
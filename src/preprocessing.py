@@ -1,132 +1,265 @@
+import os
+
 import pandas as pd
 import numpy as np
-import streamlit as st
-from datetime import datetime
+from utils.instrumentation import timed
+
+# Bump whenever preprocess_data changes its output, so cached results are rebuilt
+PIPELINE_VERSION = '2'
+
+REQUIRED_COLUMNS = ['Date', 'Time', 'Total', 'City', 'Product line', 'Customer_type', 'Gender', 'Unit price', 'Quantity']
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Same bins as the original pd.cut calls: [0, 12], (12, 17], (17, 24] for hours
+# and (0, 100], (100, 300], (300, 500], (500, inf) for revenue
+TIME_OF_DAY_EDGES = np.array([12, 17])
+TIME_OF_DAY_LABELS = ['Morning', 'Afternoon', 'Evening']
+REVENUE_SEGMENT_EDGES = np.array([100, 300, 500])
+REVENUE_SEGMENT_LABELS = ['Small ($0-100)', 'Medium ($100-300)', 'Large ($300-500)', 'Very Large ($500+)']
+
+NS_PER_MINUTE = 60 * 10**9
+
+# Load the dashboard's dataset in the compact schema (see preprocess_data)
+COMPACT = os.environ.get('SALES_COMPACT', '') not in ('', '0')
+# Compact schema: Avg_CustomerType_Spending lives here in df.attrs as {Customer_type: average}
+CUSTOMER_SPENDING_ATTR = 'customer_type_spending'
+# Text columns left as strings in the compact schema (unique per row)
+HIGH_CARDINALITY_COLUMNS = ['Invoice ID']
+
+def _factorize(series):
+    """Return integer codes and the unique values, reusing categorical codes when available"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series, use_na_sentinel=True)
+
+def parse_dates(series, date_format='%m/%d/%Y'):
+    """
+    Parse a Date column into a datetime64[ns] array
+    Each distinct string is parsed once and broadcast back through its integer code
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype='datetime64[ns]')
+    codes, uniques = _factorize(series)
+    parsed = pd.to_datetime(pd.Index(uniques), format=date_format, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    # Append NaT so the missing-value code (-1) picks it up
+    return np.append(parsed, np.datetime64('NaT', 'ns'))[codes]
+
+def parse_times(series, time_format='%H:%M'):
+    """
+    Parse a Time column into minutes since midnight (-1 where missing)
+    Returns the minutes array and the datetime.time objects for the column
+    """
+    codes, uniques = _factorize(series)
+    unique_strings = pd.Index(uniques).astype(str)
+    parsed = pd.to_datetime(unique_strings, format=time_format, errors='coerce')
+    # Values that already carry seconds (e.g. datetime.time objects) use the long format
+    if parsed.isna().any():
+        parsed = parsed.where(~parsed.isna(), pd.to_datetime(unique_strings, format='%H:%M:%S', errors='coerce'))
+    unique_minutes = np.where(parsed.isna(), -1, parsed.hour * 60 + parsed.minute).astype(np.int16)
+    unique_times = np.append(np.asarray(parsed.time, dtype=object), None)
+    minutes = np.append(unique_minutes, np.int16(-1))[codes]
+    return minutes, unique_times[codes]
+
+def _compact_int(values, missing):
+    """Small integer array, masked as a nullable integer only if something is missing"""
+    return pd.arrays.IntegerArray(values, missing) if missing.any() else values
+
+def _with_missing(values, missing, compact=False):
+    """
+    Return an integer array, switching to float NaN only if something is missing
+    The compact schema uses int8 instead, or nullable Int8 when something is missing
+    """
+    if compact:
+        return _compact_int(values.astype(np.int8), missing)
+    if missing.any():
+        return np.where(missing, np.nan, values)
+    return values.astype(np.int32)
+
+def parse_date_time(df_clean, compact=False):
+    """
+    Convert Date and Time in place and derive DateTime without string concatenation
+    The compact schema stores Time as int16 minutes since midnight instead of datetime.time objects
+    """
+    dates = parse_dates(df_clean['Date'])
+    minutes, times = parse_times(df_clean['Time'])
+    
+    df_clean['Date'] = dates
+    if compact:
+        df_clean['Time'] = _compact_int(minutes, minutes < 0)
+    else:
+        df_clean['Time'] = times
+    df_clean['DateTime'] = np.where(
+        minutes >= 0,
+        dates + minutes.astype(np.int64) * np.timedelta64(NS_PER_MINUTE, 'ns'),
+        np.datetime64('NaT', 'ns')
+    )
+    return minutes
+
+def add_time_features(df_clean, minutes, compact=False):
+    """Add Month, DayOfWeek, Hour and TimeOfDay from the parsed date and minute arrays"""
+    days = df_clean['Date'].to_numpy(dtype='datetime64[D]')
+    missing_date = np.isnat(days)
+    month_index = days.astype('datetime64[M]').astype(np.int64) % 12
+    # 1970-01-01 was a Thursday, so shift by 3 to get Monday=0
+    day_index = (days.astype(np.int64) + 3) % 7
+    
+    month_codes = np.where(missing_date, -1, month_index)
+    day_codes = np.where(missing_date, -1, day_index)
+    df_clean['Month'] = pd.Categorical.from_codes(month_codes, categories=MONTH_NAMES)
+    df_clean['MonthNumber'] = _with_missing(month_index + 1, missing_date, compact)
+    df_clean['DayOfWeek'] = pd.Categorical.from_codes(day_codes, categories=DAY_NAMES)
+    df_clean['DayNumber'] = _with_missing(day_index, missing_date, compact)
+    
+    missing_time = minutes < 0
+    hours = minutes // 60
+    df_clean['Hour'] = _with_missing(hours, missing_time, compact)
+    time_of_day = np.searchsorted(TIME_OF_DAY_EDGES, hours, side='left')
+    df_clean['TimeOfDay'] = pd.Categorical.from_codes(
+        np.where(missing_time, -1, time_of_day),
+        categories=TIME_OF_DAY_LABELS
+    )
+
+def add_revenue_features(df_clean):
+    """Add Revenue_Segment and Transaction_Size"""
+    total = df_clean['Total'].to_numpy(dtype=np.float64, na_value=np.nan)
+    segment = np.searchsorted(REVENUE_SEGMENT_EDGES, total, side='left')
+    invalid = np.isnan(total) | (total <= 0)
+    df_clean['Revenue_Segment'] = pd.Categorical.from_codes(
+        np.where(invalid, -1, segment),
+        categories=REVENUE_SEGMENT_LABELS
+    )
+    df_clean['Transaction_Size'] = df_clean['Unit price'] * df_clean['Quantity']
+
+def customer_type_totals(df):
+    """Return per-Customer_type (sum, count) of Total as a dict of tuples"""
+    codes, uniques = _factorize(df['Customer_type'])
+    total = df['Total'].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(total)
+    sums = np.bincount(codes[valid], weights=total[valid], minlength=len(uniques))
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    return {
+        key: (float(sums[i]), int(counts[i]))
+        for i, key in enumerate(uniques) if counts[i] > 0
+    }
+
+def merge_customer_totals(*totals):
+    """Combine per-Customer_type (sum, count) dicts from several batches"""
+    merged = {}
+    for part in totals:
+        for key, (total, count) in part.items():
+            prev_total, prev_count = merged.get(key, (0.0, 0))
+            merged[key] = (prev_total + total, prev_count + count)
+    return merged
+
+def customer_type_averages(totals):
+    """Average Total per Customer_type from (sum, count) totals"""
+    return {key: total / count for key, (total, count) in totals.items() if count > 0}
 
-def preprocess_data(df):
+def add_customer_features(df_clean, totals=None, compact=False):
+    """
+    Broadcast the average Total per Customer_type onto every row
+    The compact schema keeps the small lookup table in df.attrs instead
+    """
+    totals = totals if totals is not None else customer_type_totals(df_clean)
+    if compact:
+        df_clean.attrs[CUSTOMER_SPENDING_ATTR] = customer_type_averages(totals)
+        return
+    codes, uniques = _factorize(df_clean['Customer_type'])
+    averages = np.array(
+        [totals[key][0] / totals[key][1] if key in totals else np.nan for key in uniques] + [np.nan]
+    )
+    df_clean['Avg_CustomerType_Spending'] = averages[codes]
+
+def categorize_text(df_clean):
+    """Store remaining low-cardinality text columns as categoricals, in place"""
+    for col in df_clean.columns:
+        series = df_clean[col]
+        if col not in HIGH_CARDINALITY_COLUMNS and (
+            pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series)
+        ) and not isinstance(series.dtype, pd.CategoricalDtype):
+            if series.nunique() <= len(series) // 2:
+                df_clean[col] = series.astype('category')
+
+def engineer_row_features(df, compact=False):
+    """
+    Derive every feature that depends only on its own row
+    Safe to run on any batch or partition independently
+    """
+    df_clean = df.copy()
+    minutes = parse_date_time(df_clean, compact)
+    add_time_features(df_clean, minutes, compact)
+    add_revenue_features(df_clean)
+    if compact:
+        categorize_text(df_clean)
+    return df_clean
+
+def engineer_features(df, customer_totals=None, compact=False):
+    """
+    Vectorized feature engineering without the Streamlit reporting
+    Date and Time are parsed once; every derived column comes from NumPy arithmetic.
+    Pass customer_totals to broadcast averages accumulated elsewhere.
+    """
+    df_clean = engineer_row_features(df, compact)
+    add_customer_features(df_clean, customer_totals, compact)
+    return df_clean
+
+def memory_report(before, after):
+    """Per-column and total memory (MB) of two versions of a frame"""
+    mb = lambda df: df.memory_usage(deep=True, index=False) / 1024**2
+    columns = pd.DataFrame({'before_mb': mb(before), 'after_mb': mb(after)}).fillna(0)
+    columns['saved_mb'] = columns['before_mb'] - columns['after_mb']
+    return {
+        'before_mb': columns['before_mb'].sum(),
+        'after_mb': columns['after_mb'].sum(),
+        'ratio': columns['after_mb'].sum() / columns['before_mb'].sum(),
+        'columns': columns
+    }
+
+@timed('preprocess_data')
+def preprocess_data(df, compact=False, workers=1):
     """
     Clean and transform the raw supermarket data
-    Returns a cleaned dataframe ready for analysis
+    Returns a cleaned dataframe ready for analysis; raises ValueError on unusable input.
+    With compact=True, Time is int16 minutes of day, MonthNumber/DayNumber/Hour are
+    int8, remaining text is categorical and Avg_CustomerType_Spending is a lookup
+    table in df.attrs. SALES_COMPACT=1 loads the dashboard's dataset this way
+    With workers > 1, row ranges are preprocessed in a process pool (see src/parallel.py)
     """
     # Validate input
     if df is None or len(df) == 0:
-        st.error("❌ No data provided for preprocessing")
-        return None
-    
-    # Create a copy to avoid modifying the original data
-    df_clean = df.copy()
-    
-    st.info("🔄 Starting data preprocessing...")
+        raise ValueError("No data provided for preprocessing")
     
     # Check required columns
-    required_columns = ['Date', 'Time', 'Total', 'City', 'Product line', 'Customer_type', 'Gender', 'Unit price', 'Quantity']
-    missing_columns = [col for col in required_columns if col not in df_clean.columns]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     
     if missing_columns:
-        st.error(f"❌ Missing required columns: {missing_columns}")
-        return None
-    
-    # 1. FIX DATE AND TIME COLUMNS
-    with st.expander("📅 Date/Time Processing"):
-        try:
-            # Convert Date column (format: MM/DD/YYYY)
-            df_clean['Date'] = pd.to_datetime(df_clean['Date'], format='%m/%d/%Y', errors='coerce')
-            
-            # Convert Time column (format: HH:MM)
-            df_clean['Time'] = pd.to_datetime(df_clean['Time'], format='%H:%M', errors='coerce').dt.time
-            
-            # Create datetime combination for time series analysis
-            df_clean['DateTime'] = pd.to_datetime(
-                df_clean['Date'].astype(str) + ' ' + df_clean['Time'].astype(str),
-                errors='coerce'
-            )
-            
-            # Check for failed conversions
-            date_nulls = df_clean['Date'].isnull().sum()
-            time_nulls = df_clean['Time'].isnull().sum()
-            
-            if date_nulls > 0 or time_nulls > 0:
-                st.warning(f"⚠️ Could not convert {date_nulls} dates and {time_nulls} times")
-            else:
-                st.write("✅ Date/Time columns converted successfully")
-            
-        except Exception as e:
-            st.error(f"❌ Error processing date/time: {e}")
-            return None
-    
-    # 2. EXTRACT TIME-BASED FEATURES
-    with st.expander("⏰ Feature Engineering"):
-        try:
-            # Time features
-            df_clean['Month'] = df_clean['Date'].dt.month_name()
-            df_clean['MonthNumber'] = df_clean['Date'].dt.month
-            df_clean['DayOfWeek'] = df_clean['Date'].dt.day_name()
-            df_clean['DayNumber'] = df_clean['Date'].dt.dayofweek
-            
-            # FIXED: Use consistent time format (without seconds)
-            df_clean['Hour'] = pd.to_datetime(df_clean['Time'].astype(str), format='%H:%M:%S', errors='coerce').dt.hour
-            
-            # Time of day categories
-            df_clean['TimeOfDay'] = pd.cut(
-                df_clean['Hour'],
-                bins=[0, 12, 17, 24],
-                labels=['Morning', 'Afternoon', 'Evening'],
-                include_lowest=True
-            )
-            
-            st.write("✅ Time-based features created")
-            
-        except Exception as e:
-            st.error(f"❌ Error in feature engineering: {e}")
-    
-    # 3. CREATE REVENUE SEGMENTS
-    with st.expander("💰 Revenue Segmentation"):
-        try:
-            # Create revenue segments
-            df_clean['Revenue_Segment'] = pd.cut(
-                df_clean['Total'],
-                bins=[0, 100, 300, 500, float('inf')],
-                labels=['Small ($0-100)', 'Medium ($100-300)', 'Large ($300-500)', 'Very Large ($500+)']
-            )
-            
-            # Calculate transaction size
-            df_clean['Transaction_Size'] = df_clean['Unit price'] * df_clean['Quantity']
-            
-            st.write("✅ Revenue segments created")
-            
-        except Exception as e:
-            st.error(f"❌ Error in revenue segmentation: {e}")
-    
-    # 4. ENHANCE CUSTOMER ANALYSIS
-    with st.expander("👥 Customer Analysis Features"):
-        try:
-            # Create customer segments based on spending
-            customer_spending = df_clean.groupby('Customer_type')['Total'].mean().to_dict()
-            df_clean['Avg_CustomerType_Spending'] = df_clean['Customer_type'].map(customer_spending)
-            
-            st.write("✅ Customer analysis features added")
-            
-        except Exception as e:
-            st.error(f"❌ Error in customer analysis: {e}")
-    
-    # 5. DATA VALIDATION CHECKS
-    with st.expander("🔍 Data Quality Check"):
-        try:
-            # Check for any remaining issues
-            initial_rows = len(df)
-            final_rows = len(df_clean)
-            
-            st.write(f"• Records processed: {final_rows:,} (no data loss)")
-            st.write(f"• New columns created: {len(df_clean.columns) - len(df.columns)}")
-            st.write(f"• Date range: {df_clean['Date'].min().strftime('%b %d, %Y')} to {df_clean['Date'].max().strftime('%b %d, %Y')}")
-            st.write(f"• Cities: {', '.join(df_clean['City'].unique())}")
-            st.write(f"• Product lines: {len(df_clean['Product line'].unique())} categories")
-            
-        except Exception as e:
-            st.error(f"❌ Error in data quality check: {e}")
+        raise ValueError(f"Missing required columns: {missing_columns}")
     
-    st.success("🎉 Data preprocessing completed successfully!")
-    return df_clean
+    if workers > 1:
+        from src.parallel import parallel_preprocess
+        return parallel_preprocess(df, workers, by='Rows', compact=compact)
+    return engineer_features(df, compact=compact)
+
+def preprocessing_report(raw_df, df_clean):
+    """
+    Summarize what preprocessing did: failed conversions, new columns and coverage
+    """
+    try:
+        return {
+            'date_nulls': int(df_clean['Date'].isnull().sum()),
+            'time_nulls': int(df_clean['Time'].isnull().sum()),
+            'records_processed': len(df_clean),
+            'rows_lost': len(raw_df) - len(df_clean),
+            'new_columns': len(df_clean.columns) - len(raw_df.columns),
+            'date_range': (df_clean['Date'].min(), df_clean['Date'].max()),
+            'cities': [str(city) for city in df_clean['City'].unique()],
+            'product_lines': df_clean['Product line'].nunique()
+        }
+    except Exception as e:
+        return {"error": f"Could not generate preprocessing report: {str(e)}"}
 
 def get_data_summary(df):
     """
@@ -0,0 +1,257 @@
+"""
+Batch report generation without Streamlit
+
+One fused scan reads the data chunk by chunk (a single export or a
+partitioned directory). Each chunk gets the row-local features and is folded
+into the rollup cube, plus the few row-level facts the cube cannot hold
+(per-Branch min and max Total, width, memory). Every rollup below is then
+answered from the merged cube, not from the rows:
+- the get_data_summary dict
+- each dashboard aggregate, overall and per Branch
+
+The Branch reports are written in parallel by a process pool:
+
+    reports/<run>/index.json                    run metadata and the Branch list
+    reports/<run>/All/summary.json              summary + KPIs for the whole dataset
+    reports/<run>/All/<aggregate>.parquet       one file per dashboard aggregate
+    reports/<run>/All/<chart>.png               static charts (matplotlib, optional)
+    reports/<run>/Branch=<b>/...                the same for each Branch
+
+Usage:
+    python -m src.reports [--source PATH] [--output DIR] [--run NAME] [--workers N] [--no-charts]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.cube import AGGREGATIONS, CubeAggregates, build_cube, cube_summary, frame_stats, merge_cubes, merge_frame_stats
+from src.data_loader import CHUNK_SIZE, DATA_SOURCE, iter_data_chunks
+from src.preprocessing import engineer_row_features
+from utils.helpers import track_performance
+from utils.instrumentation import timed
+
+REPORT_DIR = 'reports'
+# Broadcast by preprocess_data from a cross-row average, so absent from scanned chunks
+CUSTOMER_SPENDING_COLUMN = 'Avg_CustomerType_Spending'
+ALL_BRANCHES = 'All'
+CHART_DPI = 100
+
+
+def _require_matplotlib():
+    try:
+        from matplotlib.figure import Figure
+    except ImportError as e:
+        raise ImportError("Report charts require matplotlib: pip install matplotlib") from e
+    return Figure
+
+
+def _json_default(value):
+    """Make numpy scalars and timestamps JSON serializable"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value))
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@timed('report_scan', rows=lambda result: int(result[0]['Count'].sum()) if result[0] is not None else 0)
+def scan(chunks, preprocessed=False):
+    """
+    Fold chunks into one cube and merged frame_stats in a single pass
+    Raw chunks get the row-local features first; nothing but the cube is kept.
+    The cross-row Avg_CustomerType_Spending column is never materialized, but
+    it is counted in the column count and memory (one float64 per row), so the
+    summary describes the same frame as get_data_summary.
+    """
+    cubes, stats = [], []
+    derived_rows = 0
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        processed = chunk if preprocessed else engineer_row_features(chunk)
+        if CUSTOMER_SPENDING_COLUMN not in processed.columns:
+            derived_rows += len(processed)
+        cubes.append(build_cube(processed))
+        stats.append(frame_stats(processed))
+        # Merge as we go so memory stays bounded by the cube, not the chunk count
+        if len(cubes) > 1:
+            cubes = [merge_cubes(*cubes)]
+            stats = [merge_frame_stats(*stats)]
+    if not cubes:
+        return None, None
+    if derived_rows:
+        stats[0]['columns'] += 1
+        stats[0]['memory_bytes'] += derived_rows * np.dtype(np.float64).itemsize
+    return cubes[0], stats[0]
+
+
+def branch_stats(stats, cube, branch):
+    """frame_stats restricted to one Branch; memory is apportioned by its share of rows"""
+    share = cube.loc[cube['Branch'] == branch, 'Count'].sum() / max(int(cube['Count'].sum()), 1)
+    return {
+        'columns': stats['columns'],
+        'memory_bytes': int(stats['memory_bytes'] * share),
+        'extremes': stats['extremes'].loc[[branch]]
+    }
+
+
+def _as_table(value):
+    """Aggregates as flat frames that Parquet can store"""
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    frame = value.reset_index() if not isinstance(value.index, pd.RangeIndex) else value
+    frame.columns = [str(col) for col in frame.columns]
+    return frame
+
+
+def render_charts(aggregates, directory, title):
+    """Static PNG versions of the dashboard charts; returns the file names written"""
+    Figure = _require_matplotlib()
+    charts = {}
+
+    city_revenue = aggregates['city_revenue']
+    if len(city_revenue):
+        fig = Figure(figsize=(6, 4))
+        ax = fig.subplots()
+        ax.bar(city_revenue['City'].astype(str), city_revenue['Total'])
+        ax.set(title=f'Total Revenue by City — {title}', ylabel='Revenue ($)')
+        charts['city_revenue.png'] = fig
+
+    products = aggregates['product_performance']
+    if len(products):
+        fig = Figure(figsize=(7, 4))
+        ax = fig.subplots()
+        ax.barh(products['Product line'].astype(str), products['Total'])
+        ax.set(title=f'Revenue by Product Line — {title}', xlabel='Revenue ($)')
+        charts['product_performance.png'] = fig
+
+    daily = aggregates['daily_revenue']
+    if len(daily):
+        fig = Figure(figsize=(8, 3.5))
+        ax = fig.subplots()
+        ax.plot(daily['Date'], daily['Total'], linewidth=1)
+        ax.set(title=f'Daily Revenue — {title}', ylabel='Revenue ($)')
+        fig.autofmt_xdate()
+        charts['daily_revenue.png'] = fig
+
+    customers = aggregates['customer_distribution']
+    if len(customers):
+        fig = Figure(figsize=(4, 4))
+        ax = fig.subplots()
+        ax.pie(customers.to_numpy(), labels=[str(label) for label in customers.index], autopct='%1.0f%%')
+        ax.set(title=f'Customer Types — {title}')
+        charts['customer_distribution.png'] = fig
+
+    for name, fig in charts.items():
+        fig.tight_layout()
+        fig.savefig(os.path.join(directory, name), dpi=CHART_DPI)
+    return sorted(charts)
+
+
+def write_report(cube, stats, directory, title, charts=True):
+    """Write the summary, every aggregate and the charts for one cube slice"""
+    os.makedirs(directory, exist_ok=True)
+    aggregates = CubeAggregates(cube)
+    report = {
+        'title': title,
+        'summary': cube_summary(cube, stats),
+        'kpis': aggregates['kpis'],
+        'files': []
+    }
+    for name in AGGREGATIONS:
+        if name == 'kpis':
+            continue
+        file_name = f'{name}.parquet'
+        _as_table(aggregates[name]).to_parquet(os.path.join(directory, file_name), index=False)
+        report['files'].append(file_name)
+    if charts:
+        report['files'].extend(render_charts(aggregates, directory, title))
+    with open(os.path.join(directory, 'summary.json'), 'w') as f:
+        json.dump(report, f, indent=2, default=_json_default)
+    return report
+
+
+def _write_branch(task):
+    cube, stats, directory, title, charts = task
+    started = time.perf_counter()
+    report = write_report(cube, stats, directory, title, charts)
+    return title, len(report['files']), time.perf_counter() - started
+
+
+def generate_reports(source=DATA_SOURCE, output_dir=REPORT_DIR, run=None, workers=None, charts=True,
+                     chunksize=CHUNK_SIZE):
+    """
+    Scan the source once and write the overall and per-Branch reports
+    Returns the run index, which is also written to <output_dir>/<run>/index.json
+    """
+    if charts:
+        # Fail before the scan rather than after it
+        _require_matplotlib()
+    run = run or time.strftime('%Y-%m-%d')
+    run_dir = os.path.join(output_dir, run)
+    with track_performance() as scan_stats:
+        cube, stats = scan(iter_data_chunks(source, chunksize=chunksize))
+    if cube is None:
+        raise ValueError(f"No records found in {source}")
+
+    branches = [branch for branch in cube['Branch'].dropna().unique()]
+    tasks = [(cube, stats, os.path.join(run_dir, ALL_BRANCHES), 'All branches', charts)]
+    for branch in sorted(branches, key=str):
+        branch_cube = cube[(cube['Branch'] == branch).to_numpy()]
+        tasks.append((
+            branch_cube, branch_stats(stats, cube, branch),
+            os.path.join(run_dir, f'Branch={branch}'), f'Branch {branch}', charts
+        ))
+
+    with track_performance() as write_stats:
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            written = [_write_branch(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                written = list(pool.map(_write_branch, tasks))
+
+    index = {
+        'run': run,
+        'source': os.path.abspath(source),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': int(cube['Count'].sum()),
+        'cube_cells': len(cube),
+        'branches': [str(branch) for branch in sorted(branches, key=str)],
+        'scan_s': scan_stats['elapsed_s'],
+        'write_s': write_stats['elapsed_s'],
+        'workers': workers,
+        'reports': [{'title': title, 'files': files, 'elapsed_s': elapsed} for title, files, elapsed in written]
+    }
+    # Written last, so a run with an index.json is complete
+    with open(os.path.join(run_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2, default=_json_default)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the summary, aggregates and charts for every Branch")
+    parser.add_argument('--source', default=DATA_SOURCE, help="a CSV export or a directory of partitioned files")
+    parser.add_argument('--output', default=REPORT_DIR)
+    parser.add_argument('--run', help="run directory name (default: today's date)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--no-charts', action='store_true', help="skip the matplotlib PNGs")
+    args = parser.parse_args(argv)
+
+    index = generate_reports(args.source, args.output, args.run, args.workers, not args.no_charts, args.chunksize)
+    print(f"Scanned {index['rows']:,} rows into {index['cube_cells']:,} cube cells in {index['scan_s']:.2f}s")
+    print(f"Wrote {len(index['reports'])} reports with {index['workers']} workers in {index['write_s']:.2f}s "
+          f"to {os.path.join(args.output, index['run'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""
+Stratified samples for approximate multivariate answers
+
+StratifiedSample keeps a bottom-k sample of at most SAMPLE_SIZE rows per
+City x Product line stratum, plus the exact row count of every stratum. Each
+row gets a uniform random priority and a stratum keeps the rows with the k
+smallest priorities. That is a uniform reservoir sample, and two samples
+merge by keeping the k smallest again, so it can be built chunk by chunk or
+updated with appended rows.
+
+Sums and means for any grouping and any City / Product line / date filter are
+estimated from the sample with the standard stratified (domain) estimators,
+together with normal-approximation confidence intervals. A query touches at
+most strata x SAMPLE_SIZE rows, whatever the size of the history. Strata that
+fit entirely in the sample are exact and contribute no error.
+"""
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZE = 512
+STRATA = ['City', 'Product line']
+SAMPLE_COLUMNS = ['City', 'Product line', 'Customer_type', 'Date', 'Total']
+# Above this many filtered rows the dashboard starts in approximate mode
+APPROXIMATE_MIN_ROWS = 1_000_000
+_PRIORITY = '_priority'
+
+
+def z_score(confidence=0.95):
+    """Two-sided standard normal quantile, e.g. 1.96 for 95%"""
+    from statistics import NormalDist
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+class StratifiedSample:
+    def __init__(self, size=SAMPLE_SIZE, strata=STRATA, columns=SAMPLE_COLUMNS, seed=0):
+        self.size = size
+        self.strata = list(strata)
+        self.columns = list(dict.fromkeys(self.strata + list(columns)))
+        self.seed = seed
+        self.rows_seen = 0
+        self.rows = pd.DataFrame(columns=self.columns + [_PRIORITY])
+        self.population = pd.Series(dtype='int64')
+        self._mask = None
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        sample = cls(**kwargs)
+        sample.add(df)
+        return sample
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        sample = cls(**kwargs)
+        for chunk in chunks:
+            sample.add(chunk)
+        return sample
+
+    @classmethod
+    def from_parts(cls, rows, population, **kwargs):
+        """Rebuild from sampled rows (with their priority column) and per-stratum row counts, e.g. from SQL"""
+        sample = cls(**kwargs)
+        sample.rows = rows[sample.columns + [_PRIORITY]].reset_index(drop=True)
+        sample.population = population.astype('int64')
+        sample.rows_seen = int(population.sum())
+        return sample
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return int(self.rows.memory_usage(deep=True).sum() + self.population.memory_usage(deep=True))
+
+    def _bottom_k(self, rows):
+        ordered = rows.sort_values(_PRIORITY, kind='stable')
+        return ordered.groupby(self.strata, observed=True, sort=False).head(self.size)
+
+    def add(self, df):
+        """Fold new rows into the sample; the sample is only reduced per chunk, never rescanned"""
+        if len(df) == 0:
+            return self
+        rng = np.random.default_rng([self.seed, self.rows_seen])
+        candidates = df[self.columns].assign(**{_PRIORITY: rng.random(len(df))})
+        counts = df.groupby(self.strata, observed=True).size()
+        self.population = counts if self.population.empty else self.population.add(counts, fill_value=0).astype('int64')
+        candidates = self._bottom_k(candidates)
+        if len(self.rows):
+            candidates = self._bottom_k(pd.concat([self.rows, candidates], ignore_index=True))
+        self.rows = candidates.reset_index(drop=True)
+        self.rows_seen += len(df)
+        return self
+
+    def merge(self, other):
+        """Combine two samples of disjoint rows"""
+        merged = StratifiedSample(self.size, self.strata, self.columns, self.seed)
+        merged.rows = self._bottom_k(pd.concat([self.rows, other.rows], ignore_index=True)).reset_index(drop=True)
+        merged.population = self.population.add(other.population, fill_value=0).astype('int64')
+        merged.rows_seen = self.rows_seen + other.rows_seen
+        return merged
+
+    def view(self, city='All', product='All', date_range=None):
+        """The same sample restricted to the dashboard filters; the strata sizes are unchanged"""
+        mask = np.ones(len(self.rows), dtype=bool)
+        if city != 'All':
+            mask &= (self.rows['City'] == city).to_numpy()
+        if product != 'All':
+            mask &= (self.rows['Product line'] == product).to_numpy()
+        if date_range is not None and len(date_range) == 2:
+            start_date, end_date = date_range
+            dates = self.rows['Date']
+            mask &= ((dates >= pd.to_datetime(start_date)) & (dates <= pd.to_datetime(end_date))).to_numpy()
+        view = StratifiedSample(self.size, self.strata, self.columns, self.seed)
+        view.rows, view.population, view.rows_seen = self.rows, self.population, self.rows_seen
+        view._mask = mask if self._mask is None else self._mask & mask
+        return view
+
+    def _stratum_sizes(self):
+        """Sampled (n) and population (N) rows per stratum, indexed by stratum tuple"""
+        sampled = self.rows.groupby(self.strata, observed=True).size()
+        sizes = pd.DataFrame({'N': self.population}).join(sampled.rename('n'), how='left').fillna({'n': 0})
+        return sizes.astype('float64')
+
+    def estimate(self, by, value='Total', confidence=0.95):
+        """
+        Estimated sum, count and mean of value per group, each with a confidence half-width
+        by may cut across strata (e.g. City x Customer_type); rows outside the
+        current view count as outside every group.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        rows = self.rows if self._mask is None else self.rows[self._mask]
+        columns = ['sum', 'sum_margin', 'count', 'count_margin', 'mean', 'mean_margin', 'sampled']
+        if len(rows) == 0:
+            return pd.DataFrame(columns=columns)
+
+        sizes = self._stratum_sizes()
+        stratum = pd.MultiIndex.from_frame(rows[self.strata]).to_flat_index()
+        y = rows[value].to_numpy(dtype='float64')
+        cells = pd.DataFrame({'z': y, 'zz': y * y, 'c': 1.0}).groupby(
+            [rows[col].to_numpy() for col in by] + [stratum], sort=True
+        ).sum()
+        group_levels = list(range(len(by)))
+        cell_strata = cells.index.get_level_values(-1)
+        N = sizes['N'].reindex(cell_strata).to_numpy()
+        n = sizes['n'].reindex(cell_strata).to_numpy()
+        weight = N / n
+        # Finite-population factor; fully sampled strata carry no error
+        scale = np.divide(N * N * (1 - n / N), n * (n - 1), out=np.full_like(N, np.nan), where=n > 1)
+        scale[n >= N] = 0.0
+
+        z, zz, c = cells['z'].to_numpy(), cells['zz'].to_numpy(), cells['c'].to_numpy()
+        parts = pd.DataFrame({
+            'sum': weight * z,
+            'count': weight * c,
+            'sum_var': scale * (zz - z * z / n),
+            'count_var': scale * (c - c * c / n)
+        }, index=cells.index)
+        totals = parts.groupby(level=group_levels, sort=True).sum(min_count=1)
+        ratio = (totals['sum'] / totals['count']).reindex(parts.index.droplevel(-1)).to_numpy()
+        # Linearized variance of the ratio estimator: residuals u = z - R c
+        u_sum = z - ratio * c
+        u_sq = zz - 2 * ratio * z + ratio * ratio * c
+        parts['mean_var'] = scale * (u_sq - u_sum * u_sum / n)
+        variances = parts.groupby(level=group_levels, sort=True)[['sum_var', 'count_var', 'mean_var']].sum(min_count=1)
+
+        z_value = z_score(confidence)
+        result = pd.DataFrame({
+            'sum': totals['sum'],
+            'sum_margin': z_value * np.sqrt(variances['sum_var'].clip(lower=0)),
+            'count': totals['count'],
+            'count_margin': z_value * np.sqrt(variances['count_var'].clip(lower=0)),
+            'mean': totals['sum'] / totals['count'],
+            'mean_margin': z_value * np.sqrt(variances['mean_var'].clip(lower=0)) / totals['count'],
+            'sampled': cells['c'].groupby(level=group_levels, sort=True).sum().astype('int64')
+        })
+        result.index.names = by
+        return result
+
+    def summary(self):
+        rows = len(self.rows) if self._mask is None else int(self._mask.sum())
+        return {
+            'sampled_rows': rows,
+            'population_rows': int(self.population.sum()),
+            'strata': len(self.population),
+            'sample_size': self.size
+        }
+
+
+def approximate_crosstab(sample, index, columns, value='Total', confidence=0.95):
+    """Estimated mean of value for every (index, columns) pair, and the matching confidence half-widths"""
+    estimates = sample.estimate([index, columns], value, confidence)
+    return estimates['mean'].unstack(columns), estimates['mean_margin'].unstack(columns)
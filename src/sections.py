@@ -0,0 +1,49 @@
+"""
+Lazy, memoized dashboard sections
+
+Each section declares the inputs it depends on (dataset version, filter
+state, selected columns, ...). SectionCache computes a section only when it is
+asked for and keeps the last result per section together with the inputs it
+was computed from, so a rerun with unchanged inputs reuses it. The backing
+store is any mutable mapping; the app passes st.session_state so results live
+as long as the browser session.
+"""
+
+STORE_KEY = '_sections'
+
+
+class SectionCache:
+    def __init__(self, store=None):
+        if store is None:
+            store = {}
+        if STORE_KEY not in store:
+            store[STORE_KEY] = {}
+        self._entries = store[STORE_KEY]
+        self.computed = []
+        self.reused = []
+
+    def get(self, name, inputs, compute):
+        """
+        Return the section result for these inputs, computing it on a change
+        inputs=None means the section has no stable identity and is always computed
+        """
+        if inputs is None:
+            self.computed.append(name)
+            return compute()
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == inputs:
+            self.reused.append(name)
+            return entry[1]
+        value = compute()
+        self._entries[name] = (inputs, value)
+        self.computed.append(name)
+        return value
+
+    def invalidate(self, name=None):
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self):
+        return {'computed': list(self.computed), 'reused': list(self.reused), 'entries': len(self._entries)}
@@ -0,0 +1,539 @@
+"""
+Optional embedded SQL backend (DuckDB) for filtering and aggregation
+
+The preprocessed rows are stored in a local DuckDB database file, one per
+dataset version, under data/processed/sql/<key>.duckdb. The table is written
+sorted by Date: DuckDB keeps min/max zone maps per row group, so a date-range
+filter skips every row group outside the range. Filters and group-bys are
+pushed down as SQL and only their results come back into Python; the filtered
+rollup cube feeds the same CubeAggregates the in-memory path uses. SQLRows
+stands in for the filtered rows on the dashboard: its row count, univariate
+and bivariate statistics, histograms, scatter density grids and correlation
+matrices are SQL aggregates, so no rows are fetched on a rerun beyond a
+scatter small enough to plot point by point.
+
+The database is built chunk by chunk from the CSV, so its size is bounded by
+disk rather than RAM.
+
+Usage:
+    python -m src.sql_backend build [--source PATH] [--sql-dir DIR] [--force]
+    python -m src.sql_backend status [--source PATH] [--sql-dir DIR]
+"""
+import argparse
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.cache import cache_key
+from src.chart_reduction import (
+    HISTOGRAM_BINS, MAX_POINTS_PER_TRACE, bin_edges, bin_histogram, binned_report, density_frame, histogram_frame,
+    reduce_for_chart, scatter_bins
+)
+from src.correlation import pair_statistics
+from src.cube import CUBE_DIMENSIONS
+from src.data_loader import CHUNK_SIZE, DATA_SOURCE, iter_data_chunks
+from src.eda_analysis import CURRENCY_COLUMNS, EDAAnalysis, correlation_strength
+from src.preprocessing import PIPELINE_VERSION, engineer_row_features
+
+SQL_DIR = 'data/processed/sql'
+TABLE_NAME = 'sales'
+# Text columns returned to pandas as categoricals
+CATEGORY_COLUMNS = ['Branch', 'City', 'Customer_type', 'Gender', 'Product line', 'Payment',
+                    'Month', 'DayOfWeek', 'TimeOfDay', 'Revenue_Segment']
+NUMERIC_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                 'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'DECIMAL')
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _require_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The SQL backend requires duckdb: pip install duckdb") from e
+    return duckdb
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def database_path(key, sql_dir=SQL_DIR):
+    return os.path.join(sql_dir, f"{key}.duckdb")
+
+
+def _chunk_select(df_clean):
+    """SELECT over a registered chunk that stores categoricals as VARCHAR, so every chunk shares one schema"""
+    casts = [
+        f"{_quote(col)}::VARCHAR AS {_quote(col)}"
+        for col in df_clean.columns if isinstance(df_clean[col].dtype, pd.CategoricalDtype)
+    ]
+    return f"SELECT * REPLACE ({', '.join(casts)}) FROM chunk" if casts else "SELECT * FROM chunk"
+
+
+def build_database(path=DATA_SOURCE, sql_dir=SQL_DIR, key=None, chunksize=CHUNK_SIZE):
+    """
+    Preprocess the CSV chunk by chunk into a Date-sorted DuckDB table
+    Avg_CustomerType_Spending is added in SQL once every chunk is in. The file
+    is built under a temporary name and renamed into place.
+    """
+    duckdb = _require_duckdb()
+    key = key or cache_key(path)
+    os.makedirs(sql_dir, exist_ok=True)
+    target = database_path(key, sql_dir)
+    fd, staging = tempfile.mkstemp(prefix=f".{key}-", suffix='.duckdb', dir=sql_dir)
+    os.close(fd)
+    os.remove(staging)
+
+    rows = 0
+    try:
+        with duckdb.connect(staging) as conn:
+            for chunk in iter_data_chunks(path, chunksize=chunksize):
+                staged = engineer_row_features(chunk)
+                conn.register('chunk', staged)
+                if rows == 0:
+                    conn.execute(f"CREATE TABLE staging AS {_chunk_select(staged)}")
+                else:
+                    conn.execute(f"INSERT INTO staging {_chunk_select(staged)}")
+                conn.unregister('chunk')
+                rows += len(staged)
+            if rows == 0:
+                raise ValueError(f"No records found in {path}")
+            conn.execute(f"""
+                CREATE TABLE {TABLE_NAME} AS
+                SELECT *, avg(Total) OVER (PARTITION BY Customer_type) AS Avg_CustomerType_Spending
+                FROM staging
+                ORDER BY Date
+            """)
+            conn.execute("DROP TABLE staging")
+            conn.execute("CREATE TABLE meta AS SELECT ? AS key, ? AS pipeline_version, ? AS rows",
+                         [key, PIPELINE_VERSION, rows])
+            conn.execute("CHECKPOINT")
+        os.replace(staging, target)
+    except BaseException:
+        for leftover in (staging, staging + '.wal'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+
+    prune_databases(sql_dir, keep=key)
+    return target
+
+
+def prune_databases(sql_dir=SQL_DIR, keep=None):
+    """Remove database files of other dataset versions"""
+    removed = []
+    if not os.path.isdir(sql_dir):
+        return removed
+    for name in os.listdir(sql_dir):
+        if name.endswith('.duckdb') and not name.startswith('.') and name != f"{keep}.duckdb":
+            os.remove(os.path.join(sql_dir, name))
+            removed.append(name)
+    return removed
+
+
+def _where(city='All', product='All', date_range=None):
+    """SQL WHERE clause and parameters for the dashboard filters"""
+    clauses, params = [], []
+    if city != 'All':
+        clauses.append("City = ?")
+        params.append(city)
+    if product != 'All':
+        clauses.append('"Product line" = ?')
+        params.append(product)
+    if date_range is not None and len(date_range) == 2:
+        start_date, end_date = date_range
+        clauses.append("Date BETWEEN ? AND ?")
+        params.extend([pd.Timestamp(start_date).to_pydatetime(), pd.Timestamp(end_date).to_pydatetime()])
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _and(where, clause):
+    return f"{where} AND {clause}" if where else f" WHERE {clause}"
+
+
+def _bin_index(expression, bins):
+    """Equal-width bin of expression given ? lower edge and ? bins-per-unit; the last bin is closed, as in np.histogram"""
+    return f"least(floor(({expression} - ?) * ?)::BIGINT, {bins - 1})"
+
+
+def _average_rank(expression):
+    """Rank with ties averaged, as used by Spearman"""
+    return f"rank() OVER (ORDER BY {expression}) + (count(*) OVER (PARTITION BY {expression}) - 1) / 2.0"
+
+
+class SQLBackend:
+    """
+    Read-only queries against one database file
+    Each query runs on its own cursor, so one instance can be shared between sessions.
+    """
+    def __init__(self, db_path):
+        duckdb = _require_duckdb()
+        self.db_path = db_path
+        self._conn = duckdb.connect(db_path, read_only=True)
+        self._lock = threading.Lock()
+        self._column_types = None
+
+    def query(self, sql, params=None):
+        """Run a query and return its result as a DataFrame"""
+        with self._lock:
+            cursor = self._conn.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def meta(self):
+        return self.query("SELECT * FROM meta").iloc[0].to_dict()
+
+    def dimension_values(self, column):
+        """Distinct values of a column, sorted as FilterIndex.dimension_values sorts them"""
+        col = _quote(column)
+        return self.query(f"SELECT DISTINCT {col} FROM {TABLE_NAME} WHERE {col} IS NOT NULL ORDER BY {col}")[column].tolist()
+
+    def column_types(self):
+        """{column: DuckDB type} of the table, in table order"""
+        if self._column_types is None:
+            described = self.query(f"DESCRIBE {TABLE_NAME}")
+            self._column_types = dict(zip(described['column_name'], described['column_type']))
+        return self._column_types
+
+    def numeric_columns(self):
+        return [col for col, kind in self.column_types().items() if kind.startswith(NUMERIC_TYPES)]
+
+    def date_bounds(self):
+        bounds = self.query(f"SELECT min(Date) AS start, max(Date) AS end FROM {TABLE_NAME}").iloc[0]
+        return bounds['start'], bounds['end']
+
+    def count(self, city='All', product='All', date_range=None):
+        where, params = _where(city, product, date_range)
+        return int(self.query(f"SELECT count(*) AS n FROM {TABLE_NAME}{where}", params)['n'].iloc[0])
+
+    def rows(self, city='All', product='All', date_range=None):
+        """The filtered rows as an SQLRows; nothing is fetched"""
+        return SQLRows(self, city, product, date_range)
+
+    def frame(self, city='All', product='All', date_range=None, columns=None):
+        """Filtered rows, with text dimensions restored to categoricals; not used on the dashboard's request path"""
+        where, params = _where(city, product, date_range)
+        select = ", ".join(_quote(col) for col in columns) if columns else "*"
+        df = self.query(f"SELECT {select} FROM {TABLE_NAME}{where}", params)
+        return df.astype({col: 'category' for col in CATEGORY_COLUMNS if col in df.columns})
+
+    def cube(self, city='All', product='All', date_range=None):
+        """The filtered rollup cube, grouped in SQL; same layout as build_cube"""
+        where, params = _where(city, product, date_range)
+        dims = ", ".join(_quote(col) for col in CUBE_DIMENSIONS)
+        cube = self.query(f"""
+            SELECT {dims},
+                   sum(Total)::DOUBLE AS Total,
+                   sum(Quantity)::BIGINT AS Quantity,
+                   count(*) AS Count,
+                   coalesce(sum(Rating), 0)::DOUBLE AS Rating,
+                   count(Rating) AS RatingCount
+            FROM {TABLE_NAME}{where}
+            GROUP BY {dims}
+        """, params)
+        return cube.astype({col: 'category' for col in CUBE_DIMENSIONS if col in CATEGORY_COLUMNS})
+
+    def time_bins(self, city='All', product='All'):
+        """Daily and hourly revenue and transaction counts over the full date range, for TimeSeries.from_bins"""
+        where, params = _where(city, product)
+        daily = self.query(f"""
+            SELECT Date, sum(Total)::DOUBLE AS Total, count(*) AS Count
+            FROM {TABLE_NAME}{where}
+            GROUP BY Date
+        """, params)
+        hourly = self.query(f"""
+            SELECT date_trunc('hour', DateTime) AS Hour, sum(Total)::DOUBLE AS Total, count(*) AS Count
+            FROM {TABLE_NAME}{_and(where, "DateTime IS NOT NULL")}
+            GROUP BY 1
+        """, params)
+        return daily, hourly
+
+    def column_summary(self, column, city='All', product='All', date_range=None):
+        """Count, moments, extremes and quantiles of a numeric column, in the shape of ColumnStats.summary"""
+        where, params = _where(city, product, date_range)
+        col = f"{_quote(column)}::DOUBLE"
+        summary = self.query(f"""
+            SELECT count({col}) AS count, avg({col}) AS mean, stddev_samp({col}) AS std,
+                   skewness({col}) AS skew, min({col}) AS min, max({col}) AS max,
+                   median({col}) AS median, quantile_cont({col}, {list(QUANTILES)}) AS quantiles
+            FROM {TABLE_NAME}{where}
+        """, params).iloc[0].to_dict()
+        quantiles = summary['quantiles'] if summary['count'] else [np.nan] * len(QUANTILES)
+        summary['quantiles'] = dict(zip(QUANTILES, [float(value) for value in quantiles]))
+        summary['count'] = int(summary['count'])
+        return summary
+
+    def value_counts(self, column, city='All', product='All', date_range=None):
+        """Rows per value of a column, most frequent first, like Series.value_counts"""
+        where, params = _where(city, product, date_range)
+        col = _quote(column)
+        counts = self.query(f"""
+            SELECT {col}, count(*) AS count FROM {TABLE_NAME}{_and(where, f"{col} IS NOT NULL")}
+            GROUP BY {col} ORDER BY count DESC, {col}
+        """, params)
+        return counts.set_index(column)['count']
+
+    def histogram(self, column, city='All', product='All', date_range=None, bins=HISTOGRAM_BINS):
+        """Equal-width bin counts of a numeric column, binned in SQL, in the shape of bin_histogram"""
+        where, params = _where(city, product, date_range)
+        col = f"{_quote(column)}::DOUBLE"
+        bounds = self.query(f"SELECT min({col}) AS low, max({col}) AS high FROM {TABLE_NAME}{where}", params).iloc[0]
+        if pd.isna(bounds['low']):
+            return bin_histogram([], bins)
+        edges = bin_edges(bounds['low'], bounds['high'], bins)
+        binned = self.query(f"""
+            SELECT {_bin_index(col, bins)} AS bin, count(*) AS n
+            FROM {TABLE_NAME}{_and(where, f"{col} IS NOT NULL")} GROUP BY 1
+        """, [edges[0], bins / (edges[-1] - edges[0]), *params])
+        counts = np.zeros(bins, dtype=np.int64)
+        counts[binned['bin'].to_numpy()] = binned['n'].to_numpy()
+        return histogram_frame(counts, edges)
+
+    def scatter(self, col1, col2, city='All', product='All', date_range=None, max_points=MAX_POINTS_PER_TRACE):
+        """
+        The complete pairs of two numeric columns, or above max_points their
+        density grid binned in SQL; returns (frame, report) like reduce_for_chart
+        """
+        where, params = _where(city, product, date_range)
+        x, y = f"{_quote(col1)}::DOUBLE", f"{_quote(col2)}::DOUBLE"
+        where = _and(where, f"{x} IS NOT NULL AND {y} IS NOT NULL")
+        bounds = self.query(
+            f"SELECT count(*) AS n, min({x}) AS x_low, max({x}) AS x_high, min({y}) AS y_low, max({y}) AS y_high "
+            f"FROM {TABLE_NAME}{where}",
+            params
+        ).iloc[0]
+        if bounds['n'] <= max_points:
+            points = self.query(f"SELECT {x} AS {_quote(col1)}, {y} AS {_quote(col2)} FROM {TABLE_NAME}{where}", params)
+            return reduce_for_chart(points, 'scatter', col1, col2, max_points)
+        bins = scatter_bins(max_points)
+        x_edges = bin_edges(bounds['x_low'], bounds['x_high'], bins)
+        y_edges = bin_edges(bounds['y_low'], bounds['y_high'], bins)
+        cells = self.query(f"""
+            SELECT {_bin_index(x, bins)} AS i, {_bin_index(y, bins)} AS j, count(*) AS n
+            FROM {TABLE_NAME}{where} GROUP BY 1, 2
+        """, [x_edges[0], bins / (x_edges[-1] - x_edges[0]), y_edges[0], bins / (y_edges[-1] - y_edges[0]), *params])
+        counts = np.zeros((bins, bins), dtype=np.int64)
+        counts[cells['i'].to_numpy(), cells['j'].to_numpy()] = cells['n'].to_numpy()
+        reduced = density_frame(counts, x_edges, y_edges, col1, col2)
+        return reduced, binned_report('density', int(bounds['n']), reduced, [col1, col2])
+
+    def pair_summary(self, col1, col2, city='All', product='All', date_range=None):
+        """Pearson correlation and covariance of two numeric columns over their complete pairs"""
+        where, params = _where(city, product, date_range)
+        x, y = f"{_quote(col1)}::DOUBLE", f"{_quote(col2)}::DOUBLE"
+        return self.query(
+            f"SELECT corr({x}, {y}) AS correlation, covar_samp({x}, {y}) AS covariance FROM {TABLE_NAME}{where}",
+            params
+        ).iloc[0].to_dict()
+
+    def correlation_matrices(self, city='All', product='All', date_range=None, columns=None):
+        """
+        Covariance, Pearson and Spearman matrices of the numeric columns, in the
+        shape of src.correlation.correlation_matrices
+        Every pair is one SQL aggregate over its complete rows (pairwise deletion);
+        Spearman ranks columns without gaps once and re-ranks pairs with gaps.
+        """
+        where, params = _where(city, product, date_range)
+        columns = list(columns) if columns is not None else self.numeric_columns()
+        values = [f"{_quote(col)}::DOUBLE" for col in columns]
+        bounds = self.query(
+            "SELECT count(*) AS n, "
+            + ", ".join(f"min({v}) AS min_{i}, max({v}) AS max_{i}, count({v}) AS n_{i}" for i, v in enumerate(values))
+            + f" FROM {TABLE_NAME}{where}",
+            params
+        ).iloc[0]
+        rows = int(bounds['n'])
+        # Constants have no defined correlation
+        keep = [i for i in range(len(columns)) if bounds[f'max_{i}'] > bounds[f'min_{i}']]
+        if rows < 2 or not keep:
+            return {"error": "Not enough numeric data for a correlation matrix"}
+        columns = [columns[i] for i in keep]
+        complete = [bounds[f'n_{i}'] == rows for i in keep]
+        values = [values[i] for i in keep]
+
+        pairs = [(i, j) for i in range(len(columns)) for j in range(i, len(columns))]
+        stats = self.query(
+            "SELECT " + ", ".join(
+                f"corr({values[i]}, {values[j]}) AS r_{i}_{j}, covar_samp({values[i]}, {values[j]}) AS c_{i}_{j}, "
+                f"regr_count({values[i]}, {values[j]}) AS n_{i}_{j}"
+                for i, j in pairs
+            ) + f" FROM {TABLE_NAME}{where}",
+            params
+        ).iloc[0]
+
+        full = [i for i in range(len(columns)) if complete[i]]
+        ranked = {}
+        if full:
+            ranks = ", ".join(f"{_average_rank(values[i])} AS rank_{i}" for i in full)
+            ranked = self.query(
+                "SELECT " + ", ".join(f"corr(rank_{i}, rank_{j}) AS s_{i}_{j}" for i, j in pairs if i in full and j in full)
+                + f" FROM (SELECT {ranks} FROM {TABLE_NAME}{where})",
+                params
+            ).iloc[0].to_dict()
+        for i, j in pairs:
+            if not (complete[i] and complete[j]):
+                both = f"{values[i]} IS NOT NULL AND {values[j]} IS NOT NULL"
+                ranked[f's_{i}_{j}'] = self.query(
+                    f"SELECT corr(a, b) AS s FROM (SELECT {_average_rank(values[i])} AS a, {_average_rank(values[j])} AS b "
+                    f"FROM {TABLE_NAME}{_and(where, both)})",
+                    params
+                )['s'].iloc[0]
+
+        size = len(columns)
+        pearson, covariance, spearman = (np.full((size, size), np.nan) for _ in range(3))
+        counts = np.zeros((size, size), dtype=np.int64)
+        for i, j in pairs:
+            pearson[i, j] = pearson[j, i] = stats[f'r_{i}_{j}']
+            covariance[i, j] = covariance[j, i] = stats[f'c_{i}_{j}']
+            spearman[i, j] = spearman[j, i] = ranked[f's_{i}_{j}']
+            counts[i, j] = counts[j, i] = stats[f'n_{i}_{j}']
+        labelled = lambda matrix: pd.DataFrame(matrix, index=columns, columns=columns)
+        return {
+            'columns': columns,
+            'rows': rows,
+            'counts': labelled(counts),
+            'covariance': labelled(covariance),
+            'pearson': labelled(np.clip(pearson, -1, 1)),
+            'spearman': labelled(np.clip(spearman, -1, 1))
+        }
+
+    def stratified_sample(self, size, columns, strata, seed=0):
+        """
+        Bottom-k rows per stratum ranked by a seeded hash of the row id, plus every stratum's row count
+        Returns the parts StratifiedSample.from_parts expects
+        """
+        keys = ", ".join(_quote(col) for col in strata)
+        select = ", ".join(_quote(col) for col in columns)
+        rows = self.query(f"""
+            SELECT * EXCLUDE (rank) FROM (
+                SELECT {select}, _priority, row_number() OVER (PARTITION BY {keys} ORDER BY _priority) AS rank
+                FROM (SELECT *, hash(rowid + ?) / 18446744073709551615.0 AS _priority FROM {TABLE_NAME})
+            ) WHERE rank <= ?
+        """, [seed, size])
+        counts = self.query(f"SELECT {keys}, count(*) AS n FROM {TABLE_NAME} GROUP BY {keys}")
+        rows = rows.astype({col: 'category' for col in CATEGORY_COLUMNS if col in rows.columns})
+        return rows, counts.set_index(list(strata))['n']
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLRows:
+    """
+    The rows of one filter state in the database, standing in for FilteredRows
+    Sections get SQL aggregates over them; the rows themselves are never fetched.
+    """
+    def __init__(self, backend, city='All', product='All', date_range=None):
+        self.backend = backend
+        self.filters = (city, product, date_range)
+        self._count = None
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.backend.count(*self.filters)
+        return self._count
+
+    @property
+    def columns(self):
+        return pd.Index(list(self.backend.column_types()))
+
+    def numeric_columns(self):
+        return pd.Index(self.backend.numeric_columns())
+
+    def frame(self):
+        return self.backend.frame(*self.filters)
+
+    def correlation_matrices(self):
+        return self.backend.correlation_matrices(*self.filters)
+
+    def analysis(self, aggregates=None, correlations=None, sample=None):
+        return SQLAnalysis(self, aggregates, correlations, sample)
+
+
+class SQLAnalysis(EDAAnalysis):
+    """EDAAnalysis whose univariate and bivariate sections run as SQL aggregates"""
+
+    def __init__(self, rows, aggregates=None, correlations=None, sample=None):
+        super().__init__(rows.frame, aggregates, correlations, sample)
+        self.rows = rows
+
+    def univariate_analysis(self, column):
+        if len(self.rows) == 0:
+            return {"error": "No data available for analysis"}
+        if column not in self.rows.columns:
+            return {"error": f"Column '{column}' not found in dataset"}
+        backend, filters = self.rows.backend, self.rows.filters
+        if column in self.rows.numeric_columns():
+            return {
+                'column': column,
+                'kind': 'numerical',
+                'is_currency': column in CURRENCY_COLUMNS,
+                **backend.column_summary(column, *filters),
+                'histogram': backend.histogram(column, *filters)
+            }
+        return {'column': column, 'kind': 'categorical', 'value_counts': backend.value_counts(column, *filters)}
+
+    def bivariate_analysis(self, col1, col2):
+        if len(self.rows) == 0:
+            return {"error": "No data available for analysis"}
+        missing_cols = [col for col in [col1, col2] if col not in self.rows.columns]
+        if missing_cols:
+            return {"error": f"Columns not found: {missing_cols}"}
+
+        result = {'columns': (col1, col2), 'correlation': None, 'strength': None}
+        cached = pair_statistics(self.correlations, col1, col2) if self.correlations is not None else None
+        if cached is not None:
+            result.update(cached)
+            result['strength'] = correlation_strength(cached['correlation'])
+        elif col1 in self.rows.numeric_columns() and col2 in self.rows.numeric_columns():
+            result.update(self.rows.backend.pair_summary(col1, col2, *self.rows.filters))
+            result['strength'] = correlation_strength(result['correlation'])
+        if result['correlation'] is not None and col1 != col2:
+            result['scatter'], result['reduction'] = self.rows.backend.scatter(col1, col2, *self.rows.filters)
+        return result
+
+
+def open_backend(path=DATA_SOURCE, sql_dir=SQL_DIR, key=None, build=True):
+    """Open the database for the current dataset version, building it if missing"""
+    key = key or cache_key(path)
+    db_path = database_path(key, sql_dir)
+    if not os.path.exists(db_path):
+        if not build:
+            return None
+        build_database(path, sql_dir, key)
+    return SQLBackend(db_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the DuckDB query backend")
+    parser.add_argument('command', choices=['build', 'status'])
+    parser.add_argument('--source', default=DATA_SOURCE)
+    parser.add_argument('--sql-dir', default=SQL_DIR)
+    parser.add_argument('--force', action='store_true', help="rebuild even if the database exists")
+    args = parser.parse_args(argv)
+
+    key = cache_key(args.source)
+    db_path = database_path(key, args.sql_dir)
+    if args.command == 'build':
+        if args.force or not os.path.exists(db_path):
+            build_database(args.source, args.sql_dir, key)
+        backend = SQLBackend(db_path)
+        print(f"Database {db_path}: {backend.meta()['rows']:,} rows")
+        backend.close()
+    else:
+        if not os.path.exists(db_path):
+            print(f"Database {db_path} missing")
+            return 1
+        backend = SQLBackend(db_path)
+        print(f"Database {db_path} valid: {backend.meta()['rows']:,} rows")
+        backend.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
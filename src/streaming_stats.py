@@ -0,0 +1,307 @@
+"""
+Streaming, mergeable summary statistics
+
+Moments and CoMoments keep Welford-style running central moments (count, mean,
+M2, M3 and the co-moment), so mean, variance, skew, covariance and correlation
+come out of one pass over the data. QuantileSketch is a KLL sketch that answers
+median and quantile queries with bounded memory. Every accumulator can be fed
+chunk by chunk and merged with one built on another chunk or partition, so a
+column never needs to be in memory at once.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Rows handed to numpy at a time when a whole column is summarised
+STATS_CHUNK_ROWS = 1_000_000
+# KLL sketch size; inputs up to this many values keep exact quantiles
+SKETCH_SIZE = 4096
+SKETCH_DECAY = 2 / 3
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+
+def _chunks(values, chunk_rows=STATS_CHUNK_ROWS):
+    for start in range(0, len(values), chunk_rows):
+        yield values[start:start + chunk_rows]
+
+
+class Moments:
+    """Running count, mean, M2 and M3 of a single variable"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are skipped)"""
+        values = _finite(values)
+        if len(values) == 0:
+            return self
+        chunk = Moments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        deviations = values - chunk.mean
+        chunk.m2 = float(np.dot(deviations, deviations))
+        chunk.m3 = float(np.dot(deviations * deviations, deviations))
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Combine with moments of another chunk or partition (in place)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        m3 = (
+            self.m3 + other.m3
+            + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+            + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n
+        )
+        self.m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / n
+        self.m3 = m3
+        self.mean = self.mean + delta * n_b / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1), matching pandas"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count > 1 else np.nan
+
+    @property
+    def skew(self):
+        """Bias-adjusted sample skewness, matching pandas Series.skew"""
+        n = self.count
+        if n < 3:
+            return np.nan
+        if self.m2 <= 1e-14 * max(1.0, self.mean ** 2) * n:
+            return 0.0
+        g1 = (self.m3 / n) / (self.m2 / n) ** 1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+
+class CoMoments:
+    """Running moments of a pair of variables, for covariance and correlation"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x, y):
+        """Add a chunk of paired values; pairs with a NaN on either side are skipped"""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if len(x) == 0:
+            return self
+        chunk = CoMoments()
+        chunk.count = len(x)
+        chunk.mean_x = float(x.mean())
+        chunk.mean_y = float(y.mean())
+        dx = x - chunk.mean_x
+        dy = y - chunk.mean_y
+        chunk.m2_x = float(np.dot(dx, dx))
+        chunk.m2_y = float(np.dot(dy, dy))
+        chunk.c_xy = float(np.dot(dx, dy))
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Combine with co-moments of another chunk or partition (in place)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = n_a * n_b / n
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.mean_x += dx * n_b / n
+        self.mean_y += dy * n_b / n
+        self.count = n
+        return self
+
+    @property
+    def covariance(self):
+        return self.c_xy / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def correlation(self):
+        """Pearson correlation, NaN when either side is constant"""
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if self.count > 1 and denominator > 0 else np.nan
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch
+    Values live in compactors; level h items carry weight 2**h. A full compactor
+    is sorted and every other item (random offset) is promoted a level up, so
+    memory stays around 3 * size items whatever the input length.
+    """
+
+    def __init__(self, size=SKETCH_SIZE, seed=0):
+        self.size = size
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.size * SKETCH_DECAY ** depth)))
+
+    def _compress(self):
+        # A new top level lowers every capacity below it, so keep compacting the
+        # lowest overfull level until every level fits
+        while True:
+            level = next((h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)), None)
+            if level is None:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind so the promoted weight is exact
+            keep = items[:len(items) % 2]
+            promoted = items[len(keep) + int(self._rng.integers(2))::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are skipped)"""
+        values = _finite(values)
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Combine with a sketch of another chunk or partition (in place)"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, probabilities):
+        """Approximate quantiles, exact while the sketch has never compacted"""
+        probabilities = np.atleast_1d(np.asarray(probabilities, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(probabilities), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], probabilities)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0 ** level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        targets = probabilities * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def quantile(self, probability):
+        return float(self.quantiles([probability])[0])
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+
+class ColumnStats:
+    """Moments plus a quantile sketch for one numeric column"""
+
+    def __init__(self, sketch_size=SKETCH_SIZE):
+        self.moments = Moments()
+        self.sketch = QuantileSketch(sketch_size)
+
+    def update(self, values):
+        values = _finite(values)
+        self.moments.update(values)
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self, probabilities=(0.25, 0.5, 0.75)):
+        moments = self.moments
+        quantiles = self.sketch.quantiles(probabilities)
+        return {
+            'count': moments.count,
+            'mean': moments.mean if moments.count else np.nan,
+            'std': moments.std,
+            'skew': moments.skew,
+            'min': moments.min if moments.count else np.nan,
+            'max': moments.max if moments.count else np.nan,
+            'median': self.sketch.median,
+            'quantiles': dict(zip(probabilities, quantiles.tolist()))
+        }
+
+
+def column_stats(values, chunk_rows=STATS_CHUNK_ROWS):
+    """ColumnStats of a Series or array, fed chunk_rows values at a time"""
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    stats = ColumnStats()
+    for chunk in _chunks(values, chunk_rows):
+        stats.update(chunk)
+    return stats
+
+
+def pair_stats(x, y, chunk_rows=STATS_CHUNK_ROWS):
+    """CoMoments of two aligned Series or arrays, fed chunk_rows pairs at a time"""
+    x = pd.Series(x).to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.Series(y).to_numpy(dtype=np.float64, na_value=np.nan)
+    stats = CoMoments()
+    for x_chunk, y_chunk in zip(_chunks(x, chunk_rows), _chunks(y, chunk_rows)):
+        stats.update(x_chunk, y_chunk)
+    return stats
+
+
+def stats_from_chunks(chunks, columns, pairs=()):
+    """
+    One pass over an iterable of DataFrame chunks (e.g. iter_data_chunks)
+    Returns ({column: ColumnStats}, {(col1, col2): CoMoments})
+    """
+    columns_stats = {column: ColumnStats() for column in columns}
+    pairs_stats = {pair: CoMoments() for pair in pairs}
+    for chunk in chunks:
+        for column, stats in columns_stats.items():
+            stats.update(chunk[column].to_numpy(dtype=np.float64, na_value=np.nan))
+        for (col1, col2), stats in pairs_stats.items():
+            stats.update(
+                chunk[col1].to_numpy(dtype=np.float64, na_value=np.nan),
+                chunk[col2].to_numpy(dtype=np.float64, na_value=np.nan)
+            )
+    return columns_stats, pairs_stats
@@ -0,0 +1,194 @@
+"""
+Prefix-sum time-series engine for revenue trends
+
+Revenue and transaction counts are binned once onto a dense hourly grid that
+starts at midnight of the first day, in O(n). Cumulative sums over the hourly,
+daily and hour-of-day x day-of-week layouts then answer any date sub-range as
+a difference of two prefix entries, so moving the sidebar date range never
+rescans rows. Resampling and rolling windows cost O(output), not O(rows).
+
+One TimeSeries covers one City / Product line selection over the full date
+range; the dashboard caches it per selection and slices it per date range.
+"""
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import DAY_NAMES
+
+RESOLUTIONS = ('hourly', 'daily', 'weekly')
+ROLLING_WINDOWS = (7, 28)
+
+_DAY = np.timedelta64(1, 'D')
+_HOUR = np.timedelta64(1, 'h')
+
+
+def _prefix(values, axis=0):
+    """Cumulative sums with a leading zero row, so sum(values[lo:hi]) == p[hi] - p[lo]"""
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (1, 0)
+    return np.pad(np.cumsum(values, axis=axis), pad)
+
+
+def _strided_prefix(values, stride):
+    """
+    Prefix sums over rows stride apart, with stride leading zero rows:
+    p[i] == sum(values[j] for j < i if j % stride == i % stride)
+    """
+    strided = np.zeros((len(values) + stride,) + values.shape[1:])
+    strided[stride:] = values
+    for start in range(stride):
+        strided[start::stride] = np.cumsum(strided[start::stride], axis=0)
+    return strided
+
+
+def _to_datetime64(values):
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype='datetime64[ns]')
+
+
+class TimeSeries:
+    """
+    Dense hourly bins plus prefix arrays for one filter selection
+    Rows without a time of day count towards daily totals only.
+    """
+
+    def __init__(self, days, day_totals, day_counts, hours, hour_totals, hour_counts):
+        """
+        days / hours are bin timestamps (day- and hour-truncated) with their
+        summed Total and transaction counts; rows may repeat or be unsorted
+        """
+        days = _to_datetime64(days)
+        hours = _to_datetime64(hours)
+        valid_days = ~np.isnat(days)
+        valid_hours = ~np.isnat(hours)
+        days = days[valid_days]
+        if len(days) == 0:
+            self.origin = np.datetime64('NaT', 'ns')
+            self.n_days = 0
+        else:
+            last = days.max()
+            if valid_hours.any():
+                last = max(last, hours[valid_hours].max().astype('datetime64[D]').astype('datetime64[ns]'))
+            self.origin = days.min().astype('datetime64[D]').astype('datetime64[ns]')
+            self.n_days = int((last - self.origin) // _DAY) + 1
+
+        day_index = ((days - self.origin) // _DAY).astype(np.int64) if self.n_days else np.empty(0, np.int64)
+        self.day_totals = np.bincount(day_index, weights=np.asarray(day_totals, dtype='float64')[valid_days], minlength=self.n_days)
+        self.day_counts = np.bincount(day_index, weights=np.asarray(day_counts, dtype='float64')[valid_days], minlength=self.n_days)
+
+        hour_index = ((hours[valid_hours] - self.origin) // _HOUR).astype(np.int64) if self.n_days else np.empty(0, np.int64)
+        n_hours = self.n_days * 24
+        hour_totals = np.asarray(hour_totals, dtype='float64')[valid_hours]
+        hour_counts = np.asarray(hour_counts, dtype='float64')[valid_hours]
+        self.hour_totals = np.bincount(hour_index, weights=hour_totals, minlength=n_hours).reshape(self.n_days, 24)
+        self.hour_counts = np.bincount(hour_index, weights=hour_counts, minlength=n_hours).reshape(self.n_days, 24)
+
+        self.day_prefix = _prefix(self.day_totals)
+        self.count_prefix = _prefix(self.day_counts)
+        # Hour-of-day prefixes over the earlier days of the same weekday, (n_days + 7, 24):
+        # linear in days, and any range's weekday x hour grid is still a difference of 7 rows
+        self.weekdays = (self._day_offset() + np.arange(self.n_days)) % 7
+        self.weekday_prefix = _strided_prefix(self.hour_totals, 7)
+        self.weekday_count_prefix = _strided_prefix(self.hour_counts, 7)
+
+    def _day_offset(self):
+        return pd.Timestamp(self.origin).dayofweek if self.n_days else 0
+
+    def _weekday_rows(self, position):
+        """Rows of the weekday prefixes that sum, for Monday..Sunday, the days before position"""
+        return position + (np.arange(7) - self._day_offset() - position) % 7
+
+    @classmethod
+    def from_frame(cls, df, date_column='Date', datetime_column='DateTime', value_column='Total'):
+        """Bin preprocessed rows (any order) in one pass"""
+        totals = df[value_column].to_numpy(dtype='float64')
+        ones = np.ones(len(df))
+        datetimes = df[datetime_column].to_numpy(dtype='datetime64[ns]') if datetime_column in df.columns \
+            else np.full(len(df), np.datetime64('NaT', 'ns'))
+        hours = datetimes.astype('datetime64[h]').astype('datetime64[ns]')
+        return cls(df[date_column].to_numpy(dtype='datetime64[ns]'), totals, ones, hours, totals, ones)
+
+    @classmethod
+    def from_bins(cls, daily, hourly):
+        """Build from pre-aggregated frames: daily (Date, Total, Count) and hourly (Hour, Total, Count)"""
+        return cls(daily['Date'], daily['Total'], daily['Count'], hourly['Hour'], hourly['Total'], hourly['Count'])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in (
+            'day_totals', 'day_counts', 'hour_totals', 'hour_counts', 'day_prefix', 'count_prefix', 'weekdays',
+            'weekday_prefix', 'weekday_count_prefix'
+        ))
+
+    def window(self, date_range=None):
+        """Day bounds [lo, hi) of an inclusive date range, clipped to the data"""
+        if date_range is None or len(date_range) != 2 or not self.n_days:
+            return 0, self.n_days
+        start, end = (np.datetime64(pd.Timestamp(d), 'ns') for d in date_range)
+        lo = int(np.ceil((start - self.origin) / _DAY))
+        hi = int((end - self.origin) // _DAY) + 1
+        return min(max(lo, 0), self.n_days), min(max(hi, lo, 0), self.n_days)
+
+    def range_total(self, date_range=None):
+        """Revenue and transactions in a date range, in O(1)"""
+        lo, hi = self.window(date_range)
+        total = self.day_prefix[hi] - self.day_prefix[lo]
+        count = int(self.count_prefix[hi] - self.count_prefix[lo])
+        return {
+            'total_revenue': total,
+            'transactions': count,
+            'avg_transaction': total / count if count else float('nan'),
+            'days': hi - lo
+        }
+
+    def resample(self, resolution='daily', date_range=None):
+        """Revenue and transactions per hour, day or (Monday-starting) week of a date range"""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {RESOLUTIONS}")
+        lo, hi = self.window(date_range)
+        if resolution == 'hourly':
+            totals = self.hour_totals[lo:hi].ravel()
+            counts = self.hour_counts[lo:hi].ravel()
+            periods = self.origin + (lo * 24 + np.arange(len(totals))) * _HOUR
+        elif resolution == 'daily':
+            totals = self.day_totals[lo:hi]
+            counts = self.day_counts[lo:hi]
+            periods = self.origin + np.arange(lo, hi) * _DAY
+        else:
+            starts = np.r_[lo, np.arange(lo + 1, hi)[self.weekdays[lo + 1:hi] == 0]] if hi > lo else np.empty(0, int)
+            bounds = np.r_[starts, hi]
+            totals = np.diff(self.day_prefix[bounds])
+            counts = np.diff(self.count_prefix[bounds])
+            periods = self.origin + (starts - self.weekdays[starts]) * _DAY
+        return pd.DataFrame({'Period': periods, 'Total': totals, 'Count': counts.astype('int64')})
+
+    def rolling(self, windows=ROLLING_WINDOWS, date_range=None):
+        """
+        Daily revenue with moving sums and means over each window in days
+        Windows reach back before the range start, so the first days of a
+        sub-range still average over a full window where history exists.
+        """
+        lo, hi = self.window(date_range)
+        positions = np.arange(lo, hi)
+        result = {'Date': self.origin + positions * _DAY, 'Total': self.day_totals[lo:hi]}
+        for window in windows:
+            start = np.maximum(positions + 1 - window, 0)
+            sums = self.day_prefix[positions + 1] - self.day_prefix[start]
+            result[f'sum_{window}d'] = sums
+            result[f'mean_{window}d'] = sums / (positions + 1 - start)
+        return pd.DataFrame(result)
+
+    def heatmap(self, date_range=None, value='total'):
+        """Hour-of-day x day-of-week revenue ('total'), transactions ('count') or average ticket ('mean')"""
+        lo, hi = self.window(date_range)
+        upper, lower = self._weekday_rows(hi), self._weekday_rows(lo)
+        totals = self.weekday_prefix[upper] - self.weekday_prefix[lower]
+        counts = self.weekday_count_prefix[upper] - self.weekday_count_prefix[lower]
+        if value == 'total':
+            grid = totals
+        elif value == 'count':
+            grid = counts
+        elif value == 'mean':
+            grid = np.divide(totals, counts, out=np.full_like(totals, np.nan), where=counts > 0)
+        else:
+            raise ValueError(f"Unknown heatmap value '{value}', expected 'total', 'count' or 'mean'")
+        return pd.DataFrame(grid, index=pd.Index(DAY_NAMES, name='DayOfWeek'), columns=pd.Index(range(24), name='Hour'))
@@ -1,9 +1,110 @@
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from src.chart_reduction import reduce_for_chart
+from src.cube import CubeAggregates, build_cube
+from src.sections import SectionCache
+from src.timeseries import ROLLING_WINDOWS
+from utils.instrumentation import timed
 
-def create_visualizations(df):
-    """Create interactive visualizations with error handling"""
+def render_reduction(report):
+    """Note under a chart how much its payload was reduced server-side"""
+    if report and report['reduced']:
+        st.caption(
+            f"📉 Reduced {report['points_before']:,} → {report['points_after']:,} points "
+            f"({report['method']}, ~{report['bytes_before'] / 1024:,.0f} KB → {report['bytes_after'] / 1024:,.0f} KB)"
+        )
+
+def city_revenue_chart(df, aggregates):
+    city_revenue = aggregates['city_revenue']
+    if len(city_revenue) == 0:
+        return None
+    fig = px.bar(
+        city_revenue,
+        x='City',
+        y='Total',
+        title='Total Revenue by City',
+        color='City',
+        labels={'Total': 'Revenue ($)', 'City': 'City'}
+    )
+    return {'figure': fig, 'rows': len(city_revenue)}
+
+def product_performance_chart(df, aggregates):
+    product_sales = aggregates['product_performance']
+    
+    # Remove Rating if not available
+    if 'Rating' not in df.columns:
+        product_sales = product_sales.assign(Rating=1)  # Default size
+    
+    if len(product_sales) == 0:
+        return None
+    fig = px.scatter(
+        product_sales,
+        x='Quantity',
+        y='Total',
+        size='Rating',
+        color='Product line',
+        title='Product Line Performance: Quantity vs Revenue',
+        hover_data=['Product line'],
+        labels={'Total': 'Total Revenue ($)', 'Quantity': 'Quantity Sold'}
+    )
+    return {'figure': fig, 'rows': len(product_sales)}
+
+def daily_revenue_chart(df, aggregates):
+    # Daily revenue trend
+    daily_totals, reduction = reduce_for_chart(aggregates['daily_revenue'], 'line', 'Date', 'Total')
+    if len(daily_totals) == 0:
+        return None
+    fig = px.line(
+        daily_totals,
+        x='Date',
+        y='Total',
+        title='Daily Revenue Trend',
+        labels={'Total': 'Revenue ($)', 'Date': 'Date'}
+    )
+    return {'figure': fig, 'rows': len(daily_totals), 'reduction': reduction}
+
+def customer_distribution_chart(df, aggregates):
+    # Customer type distribution
+    customer_dist = aggregates['customer_distribution'].reset_index()
+    customer_dist.columns = ['Customer Type', 'Count']
+    fig = px.pie(
+        customer_dist,
+        values='Count',
+        names='Customer Type',
+        title='Customer Type Distribution'
+    )
+    return {'figure': fig, 'rows': len(customer_dist)}
+
+# Chart sections in display order. Collapsed sections are only computed once
+# the user switches them on; every section depends on the filtered aggregates.
+CHART_SECTIONS = {
+    'city_revenue': {
+        'title': "🏙️ Revenue by City", 'expanded': True, 'requires': [],
+        'build': city_revenue_chart, 'label': 'city revenue'
+    },
+    'product_performance': {
+        'title': "📦 Product Line Performance", 'expanded': True, 'requires': [],
+        'build': product_performance_chart, 'label': 'product performance'
+    },
+    'daily_revenue': {
+        'title': "📅 Temporal Analysis", 'expanded': True, 'requires': [],
+        'build': daily_revenue_chart, 'label': 'daily revenue'
+    },
+    'customer_distribution': {
+        'title': "👥 Customer Demographics", 'expanded': False, 'requires': ['Gender', 'Customer_type'],
+        'build': customer_distribution_chart, 'label': 'customer demographics'
+    }
+}
+
+def create_visualizations(df, aggregates=None, sections=None):
+    """
+    Create interactive visualizations with error handling
+    Aggregates come from the rollup cube; it is built from df if not supplied.
+    With a SectionCache, charts are reused across reruns while the aggregates'
+    key (dataset version and filters) is unchanged.
+    """
     
     # Validate input data
     if df is None or len(df) == 0:
@@ -21,109 +122,309 @@ def create_visualizations(df):
         return
     
     try:
-        # Revenue by City
-        with st.expander("🏙️ Revenue by City", expanded=True):
-            try:
-                city_revenue = df.groupby('City')['Total'].sum().reset_index()
-                if len(city_revenue) > 0:
-                    fig1 = px.bar(
-                        city_revenue,
-                        x='City',
-                        y='Total',
-                        title='Total Revenue by City',
-                        color='City',
-                        labels={'Total': 'Revenue ($)', 'City': 'City'}
-                    )
-                    st.plotly_chart(fig1, use_container_width=True)
-                else:
-                    st.info("No city revenue data to display")
-            except Exception as e:
-                st.error(f"❌ Error creating city revenue chart: {e}")
+        if aggregates is None:
+            aggregates = CubeAggregates(lambda: build_cube(df))
+        sections = sections if sections is not None else SectionCache()
+        inputs = aggregates.key or None
         
-        # Product Line Performance
-        with st.expander("📦 Product Line Performance", expanded=True):
-            try:
-                product_sales = df.groupby('Product line').agg({
-                    'Total': 'sum',
-                    'Quantity': 'sum',
-                    'Rating': 'mean' if 'Rating' in df.columns else None
-                }).reset_index()
-                
-                # Remove Rating if not available
-                if 'Rating' not in df.columns:
-                    product_sales['Rating'] = 1  # Default size
-                
-                if len(product_sales) > 0:
-                    fig2 = px.scatter(
-                        product_sales,
-                        x='Quantity',
-                        y='Total',
-                        size='Rating',
-                        color='Product line',
-                        title='Product Line Performance: Quantity vs Revenue',
-                        hover_data=['Product line'],
-                        labels={'Total': 'Total Revenue ($)', 'Quantity': 'Quantity Sold'}
-                    )
-                    st.plotly_chart(fig2, use_container_width=True)
-                else:
-                    st.info("No product line data to display")
-            except Exception as e:
-                st.error(f"❌ Error creating product performance chart: {e}")
-        
-        # Time-based analysis
-        with st.expander("📅 Temporal Analysis", expanded=True):
-            try:
-                # Daily revenue trend
-                daily_revenue = df.groupby('Date')['Total'].sum().reset_index()
-                if len(daily_revenue) > 0:
-                    fig3 = px.line(
-                        daily_revenue,
-                        x='Date',
-                        y='Total',
-                        title='Daily Revenue Trend',
-                        labels={'Total': 'Revenue ($)', 'Date': 'Date'}
-                    )
-                    st.plotly_chart(fig3, use_container_width=True)
-                else:
-                    st.info("No daily revenue data to display")
-            except Exception as e:
-                st.error(f"❌ Error creating daily revenue chart: {e}")
-        
-        # Additional visualizations if we have the data
-        if 'Gender' in df.columns and 'Customer_type' in df.columns:
-            with st.expander("👥 Customer Demographics", expanded=False):
+        for name, section in CHART_SECTIONS.items():
+            # Additional visualizations if we have the data
+            if any(col not in df.columns for col in section['requires']):
+                continue
+            if not section['expanded'] and not st.toggle(section['title'], value=False, key=f"show_{name}"):
+                continue
+            
+            with st.expander(section['title'], expanded=True), timed(f'chart.{name}') as stage:
                 try:
-                    # Customer type distribution
-                    customer_dist = df['Customer_type'].value_counts().reset_index()
-                    customer_dist.columns = ['Customer Type', 'Count']
-                    
-                    fig4 = px.pie(
-                        customer_dist,
-                        values='Count',
-                        names='Customer Type',
-                        title='Customer Type Distribution'
-                    )
-                    st.plotly_chart(fig4, use_container_width=True)
+                    chart = sections.get(f'chart.{name}', inputs, lambda: section['build'](df, aggregates))
+                    if chart is None:
+                        st.info(f"No {section['label']} data to display")
+                        continue
+                    stage['rows'] = chart['rows']
+                    st.plotly_chart(chart['figure'], use_container_width=True)
+                    render_reduction(chart.get('reduction'))
                 except Exception as e:
-                    st.error(f"❌ Error creating customer demographics chart: {e}")
+                    st.error(f"❌ Error creating {section['label']} chart: {e}")
     
     except Exception as e:
         st.error(f"❌ Unexpected error in visualization module: {e}")
 
+def time_series_charts(series, date_range=None, resolution='daily'):
+    """Resampled revenue, moving averages and the hour x weekday heatmap, all sliced from the prefix sums"""
+    # Min/max bucketing keeps every hourly spike; coarser resolutions keep their shape with LTTB
+    method = 'minmax' if resolution == 'hourly' else 'lttb'
+    resampled, reduction = reduce_for_chart(
+        series.resample(resolution, date_range), 'line', 'Period', 'Total', method=method
+    )
+    if len(resampled) == 0:
+        return None
+    trend = px.line(
+        resampled,
+        x='Period',
+        y='Total',
+        title=f'{resolution.capitalize()} Revenue',
+        labels={'Total': 'Revenue ($)', 'Period': 'Period'}
+    )
+    rolling = series.rolling(ROLLING_WINDOWS, date_range).rename(
+        columns={f'mean_{window}d': f'{window}-day average' for window in ROLLING_WINDOWS}
+    )
+    moving = px.line(
+        rolling,
+        x='Date',
+        y=['Total'] + [f'{window}-day average' for window in ROLLING_WINDOWS],
+        title='Daily Revenue with Moving Averages',
+        labels={'value': 'Revenue ($)', 'variable': 'Series'}
+    )
+    heatmap = px.imshow(
+        series.heatmap(date_range),
+        aspect='auto',
+        color_continuous_scale='Blues',
+        title='Revenue by Hour of Day and Day of Week',
+        labels={'color': 'Revenue ($)', 'x': 'Hour', 'y': 'Day of Week'}
+    )
+    return {
+        'figures': [trend, moving, heatmap],
+        'rows': len(resampled),
+        'reduction': reduction,
+        'totals': series.range_total(date_range)
+    }
+
+def render_time_series(charts):
+    """Show the time-series charts with the range totals answered in O(1)"""
+    if charts is None:
+        st.info("No time-series data to display")
+        return
+    totals = charts['totals']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Revenue in Range", f"${totals['total_revenue']:,.2f}")
+    col2.metric("Transactions in Range", f"{totals['transactions']:,}")
+    col3.metric("Days", f"{totals['days']:,}")
+    trend, moving, heatmap = charts['figures']
+    st.plotly_chart(trend, use_container_width=True)
+    render_reduction(charts.get('reduction'))
+    st.plotly_chart(moving, use_container_width=True)
+    st.plotly_chart(heatmap, use_container_width=True)
+
 def create_simple_visualization(df, chart_type, x_col, y_col, title):
-    """Create a simple visualization with error handling"""
+    """
+    Create a simple visualization with error handling
+    Large inputs are reduced first: lines with LTTB, scatters to a density grid
+    """
     try:
+        if chart_type not in ('bar', 'line', 'scatter'):
+            st.error(f"Unsupported chart type: {chart_type}")
+            return None
+        
+        data, reduction = reduce_for_chart(df, chart_type, x_col, y_col)
         if chart_type == 'bar':
-            fig = px.bar(df, x=x_col, y=y_col, title=title)
+            fig = px.bar(data, x=x_col, y=y_col, title=title)
         elif chart_type == 'line':
-            fig = px.line(df, x=x_col, y=y_col, title=title)
-        elif chart_type == 'scatter':
-            fig = px.scatter(df, x=x_col, y=y_col, title=title)
+            fig = px.line(data, x=x_col, y=y_col, title=title)
+        elif reduction['method'] == 'density':
+            fig = px.scatter(data, x=x_col, y=y_col, size='count', color='count', title=title)
         else:
-            st.error(f"Unsupported chart type: {chart_type}")
-            return None
+            fig = px.scatter(data, x=x_col, y=y_col, title=title)
         
+        render_reduction(reduction)
         return fig
     except Exception as e:
         st.error(f"Error creating {chart_type} chart: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def render_load_stats(stats):
+    """Show the row count, throughput and peak memory of a data load"""
+    st.success("✅ Data loaded successfully!")
+    if stats['peak_memory_mb'] is not None:
+        memory = f"peak memory {stats['peak_memory_mb']:.1f} MB"
+    else:
+        memory = f"peak RSS {stats['peak_rss_mb']:.0f} MB" if stats['peak_rss_mb'] is not None else "memory not traced"
+    st.caption(
+        f"⏱️ {stats['rows']:,} rows in {stats['elapsed_s']:.2f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec), {memory}"
+    )
+
+def render_dataset_status(status, dataset):
+    """Version and refresh state of the dataset prepared by the precompute worker"""
+    prepared = pd.Timestamp(status['prepared_at'], unit='s').strftime('%Y-%m-%d %H:%M:%S') if status['prepared_at'] else '—'
+    st.write(f"• Version: `{status['version']}`")
+    st.write(f"• Rows: {status['rows']:,} (prepared {prepared} UTC)")
+    st.write(f"• Warmed filter combinations: {status['warmed_filters']:,} | Refreshes: {status['refreshes']:,}")
+    if status['error']:
+        st.error(f"❌ {status['error']}")
+    if dataset is not None and dataset.load_stats is not None:
+        render_load_stats(dataset.load_stats)
+    if dataset is not None and dataset.report is not None:
+        render_preprocessing_report(dataset.report)
+
+def render_basic_info(info):
+    """Render the dataset overview returned by get_basic_info"""
+    if 'error' in info:
+        st.error(info['error'])
+        return
+    
+    st.write("### 📈 Dataset Overview")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Total Records", info['total_records'])
+    with col2:
+        st.metric("Columns", info['total_columns'])
+    with col3:
+        st.metric("Date Column", "Available" if info['has_date'] else "Missing")
+
+def render_preprocessing_report(report):
+    """Render the summary returned by preprocessing_report"""
+    if 'error' in report:
+        st.error(f"❌ {report['error']}")
+        return
+    
+    with st.expander("🔍 Data Quality Check"):
+        if report['date_nulls'] > 0 or report['time_nulls'] > 0:
+            st.warning(f"⚠️ Could not convert {report['date_nulls']} dates and {report['time_nulls']} times")
+        else:
+            st.write("✅ Date/Time columns converted successfully")
+        
+        start_date, end_date = report['date_range']
+        loss = f"{report['rows_lost']:,} rows lost" if report['rows_lost'] else "no data loss"
+        st.write(f"• Records processed: {report['records_processed']:,} ({loss})")
+        st.write(f"• New columns created: {report['new_columns']}")
+        st.write(f"• Date range: {start_date.strftime('%b %d, %Y')} to {end_date.strftime('%b %d, %Y')}")
+        st.write(f"• Cities: {', '.join(report['cities'])}")
+        st.write(f"• Product lines: {report['product_lines']} categories")
+    
+    st.success("🎉 Data preprocessing completed successfully!")
+
+def render_univariate(result):
+    """Render the result of EDAAnalysis.univariate_analysis"""
+    if 'error' in result:
+        st.error(result['error'])
+        return
+    
+    st.write(f"### 📊 Univariate Analysis: {result['column']}")
+    
+    if result['kind'] == 'numerical':
+        prefix = '$' if result['is_currency'] else ''
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Mean", f"{prefix}{result['mean']:.2f}")
+        with col2:
+            st.metric("Median", f"{prefix}{result['median']:.2f}")
+        with col3:
+            st.metric("Std Dev", f"{result['std']:.2f}")
+        with col4:
+            st.metric("Skewness", f"{result['skew']:.2f}")
+        histogram = result.get('histogram')
+        if histogram is not None and histogram['count'].sum() > 0:
+            fig = px.bar(
+                histogram, x='bin_center', y='count', title=f"Distribution of {result['column']}",
+                labels={'bin_center': result['column'], 'count': 'Count'}
+            )
+            fig.update_layout(bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"📉 Pre-binned {histogram['count'].sum():,} values into {len(histogram)} bins")
+    else:
+        st.write("Value Counts:", result['value_counts'])
+
+def render_bivariate(result):
+    """Render the result of EDAAnalysis.bivariate_analysis"""
+    if 'error' in result:
+        st.error(result['error'])
+        return
+    
+    col1, col2 = result['columns']
+    st.write(f"### 🔗 Bivariate Analysis: {col1} vs {col2}")
+    
+    if result['correlation'] is None:
+        st.info("🔍 At least one variable is categorical - try numerical columns for correlation analysis")
+        return
+    
+    if 'spearman' in result:
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.metric("Correlation Coefficient", f"{result['correlation']:.3f}")
+        with col_b:
+            st.metric("Spearman Rank", f"{result['spearman']:.3f}")
+        with col_c:
+            st.metric("Covariance", f"{result['covariance']:,.2f}")
+    else:
+        st.metric("Correlation Coefficient", f"{result['correlation']:.3f}")
+    st.info(f"💡 **{result['strength']} correlation** between variables")
+    
+    scatter = result.get('scatter')
+    if scatter is not None and len(scatter) > 0:
+        if result['reduction']['method'] == 'density':
+            fig = px.scatter(scatter, x=col1, y=col2, size='count', color='count', title=f"{col2} vs {col1}")
+        else:
+            fig = px.scatter(scatter, x=col1, y=col2, title=f"{col2} vs {col1}")
+        st.plotly_chart(fig, use_container_width=True)
+        render_reduction(result['reduction'])
+
+def render_correlation_heatmap(matrices, method='pearson'):
+    """Heatmap of a correlation matrix returned by correlation_matrices"""
+    if 'error' in matrices:
+        st.error(matrices['error'])
+        return
+    
+    fig = px.imshow(
+        matrices[method].round(2),
+        text_auto=True,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale='RdBu_r',
+        title=f"{method.capitalize()} Correlation Matrix ({matrices['rows']:,} rows)"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_multivariate(result):
+    """Render the result of EDAAnalysis.multivariate_analysis"""
+    if 'error' in result:
+        st.error(result['error'])
+        return
+    
+    st.write("### 🎯 Multivariate Business Insights")
+    
+    if result.get('approximate'):
+        sample = result['sample']
+        st.info(
+            f"≈ Estimated from {sample['sampled_rows']:,} sampled rows matching the filters "
+            f"(stratified sample of the {sample['population_rows']:,}-row history, "
+            f"{sample['strata']} City × Product line strata). "
+            f"± columns are {result['confidence']:.0%} confidence half-widths."
+        )
+    
+    if 'revenue_by_city_product' in result:
+        st.write("**Revenue by City and Product Line:**")
+        st.dataframe(result['revenue_by_city_product'].rename(columns={'sum_margin': 'sum ±', 'mean_margin': 'mean ±'}))
+    
+    if 'spending_by_city_customer' in result:
+        st.write("**Average Spending by City and Customer Type:**")
+        st.dataframe(result['spending_by_city_customer'])
+        if 'spending_margin' in result:
+            st.caption(f"± {result['confidence']:.0%} confidence half-widths")
+            st.dataframe(result['spending_margin'])
+    
+    for error in result['errors']:
+        st.error(error)
+
+def render_debug_panel(metrics, profile_report=None):
+    """Per-stage timings from the metrics registry, with exports and the last profile"""
+    snapshot = metrics.snapshot()
+    if not snapshot:
+        st.info("No stages recorded yet")
+        return
+    
+    table = pd.DataFrame.from_dict(snapshot, orient='index')
+    for col in ['mean_s', 'p50_s', 'p95_s', 'max_s', 'last_s']:
+        table[col] = table[col] * 1000
+    table = table.rename(columns=lambda col: col.replace('_s', '_ms'))
+    st.dataframe(table.round(2), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ JSON", metrics.to_json(), file_name='stage_metrics.json', mime='application/json')
+    with col2:
+        st.download_button("⬇️ Prometheus", metrics.to_prometheus(), file_name='stage_metrics.prom', mime='text/plain')
+    
+    if profile_report:
+        st.write("**Last profiled rerun:**")
+        st.code(profile_report, language='text')
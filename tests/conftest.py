@@ -0,0 +1,48 @@
+import pytest
+
+from src.data_loader import DTYPE_SCHEMA
+from src.preprocessing import preprocess_data
+from utils.synthetic_data import generate_sales_data, write_sales_csv
+
+ROWS = 2_000
+
+
+@pytest.fixture
+def raw_df():
+    """Synthetic raw frame typed like load_data's output"""
+    return generate_sales_data(ROWS, seed=1, days=90).astype(DTYPE_SCHEMA)
+
+
+@pytest.fixture
+def sales_df(raw_df):
+    """The preprocessed frame the dashboard works on"""
+    return preprocess_data(raw_df)
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    """Synthetic export with the preamble rows of the real file"""
+    return write_sales_csv(str(tmp_path / 'raw' / 'sales.csv'), ROWS, seed=1, days=90)
+
+
+def sorted_cube(cube):
+    """Cube cells in a canonical order with plain dtypes, for comparing cubes built different ways"""
+    from src.cube import CUBE_DIMENSIONS, CUBE_MEASURES
+    cube = cube.astype({col: 'object' for col in CUBE_DIMENSIONS if col != 'Date'})
+    cube = cube.astype({'Date': 'datetime64[ns]'})
+    return cube.sort_values(CUBE_DIMENSIONS).reset_index(drop=True)[CUBE_DIMENSIONS + CUBE_MEASURES]
+
+
+def write_daily_files(root, days, rows=200, seed=0):
+    """One export per Branch per day under hive-style Branch=/Date= directories"""
+    import os
+    paths = []
+    for offset, day in enumerate(days):
+        for branch_index, branch in enumerate('ABC'):
+            df = generate_sales_data(rows, seed=[seed, offset, branch_index], start_date=day, days=1)
+            df = df[df['Branch'] == branch]
+            path = os.path.join(root, f'Branch={branch}', f'Date={day}', 'sales.csv')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_csv(path, index=False)
+            paths.append(path)
+    return paths
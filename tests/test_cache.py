@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cache import (
+    MANIFEST_NAME, NULL_PARTITION, cache_key, read_cache, read_manifest, write_cache, write_partitions
+)
+
+
+def test_round_trip_keeps_rows_without_date_or_branch(sales_df, sales_csv, tmp_path):
+    df = sales_df.copy()
+    df.loc[0, 'Date'] = pd.NaT
+    df.loc[1, 'Branch'] = np.nan
+    cache_dir = str(tmp_path / 'cache')
+
+    manifest = write_cache(df, sales_csv, cache_dir)
+    assert manifest['rows'] == len(df)
+    assert any(NULL_PARTITION in relative for relative in manifest['files'])
+
+    cached = read_cache(sales_csv, cache_dir)
+    assert len(cached) == len(df)
+    assert cached['Date'].isna().sum() == 1
+    assert cached['Branch'].isna().sum() == 1
+    key = ['Invoice ID', 'Total']
+    pd.testing.assert_frame_equal(
+        cached.sort_values(key).reset_index(drop=True)[key],
+        df.sort_values(key).reset_index(drop=True)[key]
+    )
+
+
+def test_partitions_are_month_by_branch(sales_df, tmp_path):
+    files = write_partitions(sales_df, str(tmp_path))
+    months = sales_df['Date'].dt.strftime('%Y-%m').nunique()
+    assert len(files) == months * sales_df['Branch'].nunique()
+    assert all(os.path.exists(tmp_path / relative) for relative in files)
+
+
+def test_key_follows_source_content(sales_csv):
+    key = cache_key(sales_csv)
+    with open(sales_csv, 'a') as f:
+        f.write('\n')
+    assert cache_key(sales_csv) != key
+
+
+def test_incomplete_entries_are_misses(sales_df, sales_csv, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    manifest = write_cache(sales_df, sales_csv, cache_dir)
+    entry = os.path.join(cache_dir, manifest['key'])
+
+    os.remove(os.path.join(entry, manifest['files'][0]))
+    assert read_manifest(manifest['key'], cache_dir) is None
+    assert read_cache(sales_csv, cache_dir) is None
+
+    write_cache(sales_df, sales_csv, cache_dir)
+    os.remove(os.path.join(entry, MANIFEST_NAME))
+    assert read_cache(sales_csv, cache_dir) is None
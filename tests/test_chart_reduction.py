@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src.chart_reduction import (
+    bin_histogram, density_2d, downsample_series, lttb_indices, minmax_indices, reduce_for_chart
+)
+
+
+def series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'Total': np.cumsum(rng.normal(size=n))
+    })
+
+
+def test_lttb_keeps_endpoints_in_order():
+    frame = series()
+    keep = lttb_indices(frame['Date'].to_numpy(), frame['Total'].to_numpy(), 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(frame) - 1
+    assert (np.diff(keep) > 0).all()
+
+
+def test_minmax_keeps_global_extremes():
+    values = series()['Total'].to_numpy()
+    keep = minmax_indices(values, 200)
+    assert len(keep) <= 200
+    assert values.argmin() in keep and values.argmax() in keep
+
+
+def test_downsample_reports_payload_reduction():
+    reduced, report = downsample_series(series(), 'Date', 'Total', max_points=1_000)
+    assert len(reduced) == report['points_after'] == 1_000
+    assert report['reduced'] and report['bytes_after'] < report['bytes_before']
+    small = series(100)
+    same, report = downsample_series(small, 'Date', 'Total', max_points=1_000)
+    assert same is small and report['method'] == 'none'
+
+
+def test_binned_counts_cover_every_value():
+    frame = pd.DataFrame({'x': np.arange(5_000.0), 'y': np.arange(5_000.0) % 7})
+    assert bin_histogram(frame['x'], bins=20)['count'].sum() == len(frame)
+    assert density_2d(frame, 'x', 'y', bins=10)['count'].sum() == len(frame)
+
+
+def test_reduce_for_chart_caps_every_trace():
+    frame = pd.DataFrame({'x': np.arange(10_000.0), 'y': np.arange(10_000.0) ** 0.5, 'label': 'a'})
+    reduced, report = reduce_for_chart(frame, 'scatter', 'x', 'y', max_points=400)
+    assert report['method'] == 'density' and len(reduced) <= 400
+    assert reduced['count'].sum() == len(frame)
+    reduced, report = reduce_for_chart(frame, 'bar', 'label', 'y', max_points=400)
+    assert report['method'] == 'none' and reduced is frame
+
+
+def test_reduce_for_chart_passes_the_line_method_through():
+    frame = series()
+    reduced, report = reduce_for_chart(frame, 'line', 'Date', 'Total', max_points=200, method='minmax')
+    assert report['method'] == 'minmax' and len(reduced) <= 200
+    assert frame['Total'].max() in reduced['Total'].to_numpy()
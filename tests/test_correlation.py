@@ -0,0 +1,57 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.correlation import correlation_matrices, numeric_columns, pair_statistics
+
+COLUMNS = ['Total', 'Rating', 'Quantity', 'Hour']
+
+
+def test_complete_matrices_match_pandas(sales_df):
+    matrices = correlation_matrices(sales_df, COLUMNS)
+    frame = sales_df[COLUMNS].astype('float64')
+    pd.testing.assert_frame_equal(matrices['pearson'], frame.corr(), check_exact=False)
+    pd.testing.assert_frame_equal(matrices['spearman'], frame.corr('spearman'), check_exact=False)
+    pd.testing.assert_frame_equal(matrices['covariance'], frame.cov(), check_exact=False)
+    assert (matrices['counts'].to_numpy() == len(sales_df)).all()
+
+
+def test_missing_values_are_deleted_pairwise(sales_df):
+    frame = sales_df[COLUMNS].astype('float64')
+    frame.loc[frame.index[::3], 'Hour'] = np.nan
+    frame.loc[frame.index[1::7], 'Rating'] = np.nan
+    matrices = correlation_matrices(frame)
+    pd.testing.assert_frame_equal(matrices['pearson'], frame.corr(), check_exact=False)
+    pd.testing.assert_frame_equal(matrices['spearman'], frame.corr('spearman'), check_exact=False)
+    pd.testing.assert_frame_equal(matrices['covariance'], frame.cov(), check_exact=False)
+    assert matrices['counts'].at['Total', 'Hour'] == frame['Hour'].count()
+    assert matrices['rows'] == len(frame)
+
+    # Gaps in Hour leave the Total / Quantity pair untouched
+    complete = correlation_matrices(sales_df, COLUMNS)
+    assert matrices['pearson'].at['Total', 'Quantity'] == pytest.approx(complete['pearson'].at['Total', 'Quantity'])
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_constant_columns_correlate_as_nan_without_warnings(sales_df, gaps):
+    frame = sales_df[COLUMNS].astype('float64').assign(Constant=1.0)
+    if gaps:
+        frame.loc[frame.index[::3], 'Hour'] = np.nan
+        # Constant only over the rows where Hour is present
+        frame.loc[frame.index[::3], 'Constant'] = 2.0
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        matrices = correlation_matrices(frame, COLUMNS + ['Constant'])
+    for method in ('pearson', 'spearman'):
+        pd.testing.assert_frame_equal(matrices[method], frame.corr(method), check_exact=False)
+    assert np.isnan(matrices['pearson'].at['Hour', 'Constant'])
+
+
+def test_pair_statistics_reads_the_matrices(sales_df):
+    matrices = correlation_matrices(sales_df)
+    stats = pair_statistics(matrices, 'Total', 'Rating')
+    assert stats['correlation'] == pytest.approx(sales_df['Total'].corr(sales_df['Rating']))
+    assert pair_statistics(matrices, 'Total', 'Invoice ID') is None
+    assert 'Invoice ID' not in numeric_columns(sales_df)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from src.cube import (
+    CubeAggregates, build_cube, cube_summary, filter_cube, frame_stats, merge_cubes
+)
+from src.preprocessing import get_data_summary
+from tests.conftest import sorted_cube
+
+
+def test_aggregates_equal_direct_groupbys(sales_df):
+    aggregates = CubeAggregates(build_cube(sales_df))
+    df = sales_df
+
+    kpis = aggregates['kpis']
+    assert np.isclose(kpis['total_revenue'], df['Total'].astype('float64').sum())
+    assert kpis['transactions'] == len(df)
+    assert np.isclose(kpis['avg_rating'], df['Rating'].mean())
+
+    city = df.groupby('City', observed=True)['Total'].sum().astype('float64')
+    np.testing.assert_allclose(aggregates['city_revenue'].set_index('City')['Total'].loc[city.index], city)
+
+    daily = df.groupby('Date')['Total'].sum().astype('float64')
+    np.testing.assert_allclose(aggregates['daily_revenue'].set_index('Date')['Total'], daily)
+
+    spending = pd.crosstab(df['City'], df['Customer_type'], values=df['Total'].astype('float64'), aggfunc='mean')
+    np.testing.assert_allclose(aggregates['city_customer_spending'].loc[spending.index, spending.columns], spending)
+
+    grouped = df.groupby(['City', 'Product line'], observed=True)['Total'].agg(['sum', 'mean'])
+    np.testing.assert_allclose(aggregates['city_product_revenue'].loc[grouped.index], grouped, rtol=1e-6)
+
+
+def test_cubes_of_disjoint_batches_merge_by_addition(sales_df):
+    halves = build_cube(sales_df.iloc[:700]), build_cube(sales_df.iloc[700:])
+    pd.testing.assert_frame_equal(sorted_cube(merge_cubes(*halves)), sorted_cube(build_cube(sales_df)))
+
+
+def test_filtered_cube_equals_cube_of_filtered_rows(sales_df):
+    start, end = sales_df['Date'].min() + pd.Timedelta(days=10), sales_df['Date'].min() + pd.Timedelta(days=40)
+    filtered = filter_cube(build_cube(sales_df), 'Yangon', 'Health and beauty', (start.date(), end.date()))
+    rows = sales_df[
+        (sales_df['City'] == 'Yangon') & (sales_df['Product line'] == 'Health and beauty')
+        & sales_df['Date'].between(start, end)
+    ]
+    pd.testing.assert_frame_equal(sorted_cube(filtered), sorted_cube(build_cube(rows)))
+
+
+def test_summary_from_cube_matches_get_data_summary(sales_df):
+    expected = get_data_summary(sales_df)
+    summary = cube_summary(build_cube(sales_df), frame_stats(sales_df))
+    for section, values in expected.items():
+        for name, value in values.items():
+            if name == 'gender_distribution':
+                assert {str(k): v for k, v in summary[section][name].items()} == {str(k): v for k, v in value.items()}
+            elif isinstance(value, str):
+                assert summary[section][name] == value
+            else:
+                assert np.isclose(summary[section][name], value, rtol=1e-2 if name == 'memory_usage_mb' else 1e-6), (section, name)
@@ -0,0 +1,41 @@
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from src.data_loader import concat_chunks, detect_header_row, iter_data_chunks, load_data, load_data_chunked
+from tests.conftest import ROWS
+
+
+def test_preamble_is_skipped_and_schema_applied(sales_csv):
+    assert detect_header_row(sales_csv) == 3
+    df = load_data(sales_csv)
+    assert len(df) == ROWS
+    assert isinstance(df['City'].dtype, pd.CategoricalDtype)
+    assert df['Total'].dtype == 'float32'
+    assert df['Quantity'].dtype == 'int16'
+
+
+def test_chunks_concatenate_to_the_full_frame(sales_csv):
+    chunks = list(iter_data_chunks(sales_csv, columns='kpi', chunksize=300))
+    assert len(chunks) == -(-ROWS // 300)
+    assert set(chunks[0].columns) == {'City', 'Product line', 'Customer_type', 'Total', 'Date', 'Rating'}
+
+    df = concat_chunks(chunks)
+    pd.testing.assert_frame_equal(df, load_data(sales_csv, columns='kpi'))
+    assert isinstance(df['City'].dtype, pd.CategoricalDtype)
+
+
+def test_unknown_view_is_rejected(sales_csv):
+    with pytest.raises(ValueError, match="Unknown view"):
+        load_data(sales_csv, columns='nope')
+
+
+def test_memory_tracing_is_opt_in(sales_csv):
+    _, stats = load_data_chunked(sales_csv)
+    assert stats['rows'] == ROWS
+    assert stats['peak_memory_mb'] is None
+    assert not tracemalloc.is_tracing()
+
+    _, traced = load_data_chunked(sales_csv, trace_memory=True)
+    assert traced['peak_memory_mb'] > 0
@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_loader import load_data
+from src.dataset import SalesDataset, parse_partitions
+from tests.conftest import write_daily_files
+from utils.synthetic_data import generate_sales_data
+
+DAYS = ['2021-01-04', '2021-01-05', '2021-01-06']
+
+
+def test_partition_values_come_from_directory_names():
+    path = os.path.join('YearMonth=2021-01', 'Branch=B', 'part-0.parquet')
+    assert parse_partitions(path) == {'YearMonth': '2021-01', 'Branch': 'B'}
+
+
+def test_filters_prune_files_by_partition(tmp_path):
+    write_daily_files(str(tmp_path), DAYS)
+    dataset = SalesDataset(str(tmp_path))
+    assert len(dataset) == 9
+    assert len(dataset.files(('2021-01-05', '2021-01-05'))) == 3
+    assert len(dataset.files(branches=['A'])) == 3
+    assert len(dataset.files(('2021-01-05', '2021-01-06'), ['A', 'C'])) == 4
+    assert dataset.files(('2022-01-01', '2022-01-31')) == []
+
+
+def test_pruned_load_reads_only_matching_files(tmp_path):
+    write_daily_files(str(tmp_path), DAYS)
+    dataset = SalesDataset(str(tmp_path))
+    df, stats = dataset.load(date_range=('2021-01-05', '2021-01-05'), branches=['B'])
+    assert stats['files'] == 1
+    assert set(df['Branch'].astype(str)) == {'B'}
+    assert (df['Date'] == '1/5/2021').all()
+
+    full, _ = dataset.load()
+    assert len(full) == sum(len(load_data(data_file.path)) for data_file in dataset.files())
+
+
+def test_month_partitions_and_partition_columns(tmp_path):
+    df = generate_sales_data(300, seed=4, start_date='2021-02-01', days=20)
+    df = df[df['Branch'] == 'A'].drop(columns=['Branch'])
+    path = tmp_path / 'YearMonth=2021-02' / 'Branch=A' / 'part-0.parquet'
+    path.parent.mkdir(parents=True)
+    df.to_parquet(path, index=False)
+
+    dataset = SalesDataset(str(tmp_path))
+    assert dataset.files(('2021-02-10', '2021-03-05')) and not dataset.files(('2021-03-01', '2021-03-31'))
+    loaded, _ = dataset.load()
+    assert len(loaded) == len(df) and set(loaded['Branch'].astype(str)) == {'A'}
+
+
+def test_invalid_files_are_reported_together(tmp_path):
+    write_daily_files(str(tmp_path), DAYS[:1])
+    broken = tmp_path / 'Branch=D' / 'Date=2021-01-04' / 'sales.csv'
+    broken.parent.mkdir(parents=True)
+    pd.DataFrame({'Invoice ID': ['1'], 'Total': [1.0]}).to_csv(broken, index=False)
+    dataset = SalesDataset(str(tmp_path))
+    assert list(dataset.validate()) == [os.path.join('Branch=D', 'Date=2021-01-04', 'sales.csv')]
+    with pytest.raises(ValueError, match='Branch=D'):
+        dataset.load()
+    assert dataset.load(branches=['A'])[0] is not None
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filter_index import FilterIndex
+
+
+def mask_filter(df, city, product, date_range):
+    """The boolean-mask filtering the index replaces"""
+    mask = np.ones(len(df), dtype=bool)
+    if city != 'All':
+        mask &= df['City'] == city
+    if product != 'All':
+        mask &= df['Product line'] == product
+    if date_range is not None:
+        mask &= df['Date'].between(pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))
+    return df[mask]
+
+
+@pytest.mark.parametrize('city, product', [('All', 'All'), ('Mandalay', 'All'), ('All', 'Sports and travel'), ('Yangon', 'Food and beverages')])
+@pytest.mark.parametrize('date_range', [None, ('2021-01-10', '2021-02-05')])
+def test_selection_matches_boolean_masks(sales_df, city, product, date_range):
+    index = FilterIndex(sales_df)
+    selected = index.frame(index.select(city, product, date_range))
+    expected = mask_filter(sales_df, city, product, date_range)
+    assert sorted(selected['Invoice ID']) == sorted(expected['Invoice ID'])
+    assert selected['Date'].is_monotonic_increasing
+
+
+def test_view_copies_rows_only_on_first_use(sales_df):
+    index = FilterIndex(sales_df)
+    rows = index.view('Yangon', 'All', ('2021-01-10', '2021-02-05'))
+    assert len(rows) == len(mask_filter(sales_df, 'Yangon', 'All', ('2021-01-10', '2021-02-05')))
+    assert 'Total' in rows.numeric_columns() and 'City' in rows.columns
+    assert rows._frame is None
+
+    analysis = rows.analysis()
+    assert rows._frame is None
+    assert analysis.univariate_analysis('Total')['count'] == len(rows)
+    assert rows.frame() is rows.frame()
+
+
+def test_unknown_value_selects_nothing(sales_df):
+    index = FilterIndex(sales_df)
+    assert len(index.view('Atlantis')) == 0
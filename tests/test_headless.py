@@ -0,0 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_import import CORE_MODULES, FORBIDDEN_MODULES
+from src.preprocessing import preprocessing_report
+
+
+def test_core_imports_without_rendering_dependencies():
+    probe = (
+        f"import sys, json; import {', '.join(CORE_MODULES)}; "
+        f"print(json.dumps([m for m in {FORBIDDEN_MODULES!r} if m in sys.modules]))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', probe], cwd=root, check=True, capture_output=True, text=True).stdout
+    assert json.loads(output) == []
+
+
+def test_preprocessing_report_counts_lost_rows(raw_df, sales_df):
+    report = preprocessing_report(raw_df, sales_df.iloc[10:])
+    assert report['rows_lost'] == 10
+    assert report['records_processed'] == len(sales_df) - 10
+    assert report['new_columns'] == sales_df.shape[1] - raw_df.shape[1]
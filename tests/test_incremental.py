@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cube import build_cube
+from src.dataset import SalesDataset
+from src.incremental import IncrementalStore
+from src.precompute import prepare_dataset
+from src.preprocessing import customer_type_averages, customer_type_totals, preprocess_data
+from tests.conftest import sorted_cube, write_daily_files
+
+
+def test_batches_append_to_the_same_result_as_a_full_rebuild(raw_df, tmp_path):
+    store = IncrementalStore(str(tmp_path / 'store'))
+    first, second = raw_df.iloc[:1200], raw_df.iloc[1200:]
+    assert store.append(first, 'day-1') == len(first)
+    assert store.append(second, 'day-2') == len(second)
+    assert store.append(second, 'day-2') == 0
+
+    full = preprocess_data(raw_df)
+    reopened = IncrementalStore(str(tmp_path / 'store'))
+    assert reopened.rows == len(raw_df)
+    expected_averages = customer_type_averages(customer_type_totals(full))
+    for key, average in reopened.customer_averages().items():
+        assert np.isclose(average, expected_averages[key])
+
+    loaded = reopened.load()
+    assert len(loaded) == len(raw_df)
+    merged = loaded.merge(full[['Invoice ID', 'Avg_CustomerType_Spending']], on='Invoice ID', suffixes=('', '_full'))
+    np.testing.assert_allclose(merged['Avg_CustomerType_Spending'], merged['Avg_CustomerType_Spending_full'])
+    pd.testing.assert_frame_equal(sorted_cube(reopened.cube()), sorted_cube(build_cube(full)))
+
+
+def test_sync_appends_only_new_files(tmp_path):
+    root = str(tmp_path / 'raw')
+    write_daily_files(root, ['2021-01-01', '2021-01-02'])
+    store = IncrementalStore(str(tmp_path / 'store'))
+    first = store.sync(SalesDataset(root))
+    assert first == store.rows > 0
+    assert store.sync(SalesDataset(root)) == 0
+
+    write_daily_files(root, ['2021-01-03'], seed=1)
+    new_rows = len(SalesDataset(root).load(date_range=('2021-01-03', '2021-01-03'))[0])
+    assert store.sync(SalesDataset(root)) == new_rows
+    assert store.rows == first + new_rows
+
+def test_prepared_directory_matches_a_full_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = str(tmp_path / 'raw')
+    write_daily_files(root, ['2021-01-01', '2021-01-02'])
+    dataset = prepare_dataset(root)
+    write_daily_files(root, ['2021-01-03'], seed=1)
+    refreshed = prepare_dataset(root)
+    assert refreshed.load_stats['rows'] == len(refreshed.index) - len(dataset.index)
+
+    full = preprocess_data(SalesDataset(root).load()[0])
+    assert len(refreshed.index) == len(full)
+    pd.testing.assert_frame_equal(sorted_cube(refreshed.cube), sorted_cube(build_cube(full)))
+
+
+def test_changed_file_rebuilds_the_store(tmp_path):
+    root = str(tmp_path / 'raw')
+    paths = write_daily_files(root, ['2021-01-01', '2021-01-02'])
+    store = IncrementalStore(str(tmp_path / 'store'))
+    store.sync(SalesDataset(root))
+    os.remove(paths[0])
+    store.sync(SalesDataset(root))
+    assert store.rows == len(SalesDataset(root).load()[0])
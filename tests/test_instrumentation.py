@@ -0,0 +1,84 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from utils.instrumentation import MetricsRegistry, available_profilers, profile_run, timed
+
+
+def test_timed_records_stages_and_rows():
+    registry = MetricsRegistry()
+
+    @timed('load', registry=registry)
+    def load():
+        return pd.DataFrame({'a': range(5)})
+
+    @timed('filter', rows=len, registry=registry)
+    def select():
+        return [1, 2, 3]
+
+    load()
+    load()
+    select()
+    with timed('render', registry=registry) as stage:
+        stage['rows'] = 7
+
+    snapshot = registry.snapshot()
+    assert snapshot['load']['count'] == 2 and snapshot['load']['rows'] == 5
+    assert snapshot['filter']['rows'] == 3
+    assert snapshot['render']['rows'] == 7
+    assert snapshot['load']['p50_s'] <= snapshot['load']['max_s']
+
+
+def test_stage_is_recorded_when_it_raises():
+    registry = MetricsRegistry()
+    with pytest.raises(KeyError):
+        with timed('lookup', registry=registry):
+            raise KeyError('missing')
+    assert registry.snapshot()['lookup']['count'] == 1
+
+
+def test_exports_cover_every_stage():
+    registry = MetricsRegistry()
+    for elapsed in (0.002, 0.03, 20.0):
+        registry.record('apply_filters', elapsed, rows=10)
+    registry.record('chart "daily"', 0.2)
+
+    stages = json.loads(registry.to_json())['stages']
+    assert set(stages) == {'apply_filters', 'chart "daily"'}
+
+    text = registry.to_prometheus()
+    assert 'dashboard_stage_seconds_bucket{stage="apply_filters",le="0.005"} 1' in text
+    assert 'dashboard_stage_seconds_bucket{stage="apply_filters",le="+Inf"} 3' in text
+    assert 'dashboard_stage_seconds_count{stage="apply_filters"} 3' in text
+    assert 'dashboard_stage_rows{stage="apply_filters"} 10' in text
+    assert 'stage="chart \\"daily\\""' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    registry.enabled = False
+    with timed('load', registry=registry):
+        pass
+    assert registry.snapshot() == {}
+
+
+def test_profile_run_reports_the_block():
+    with profile_run('cprofile') as capture:
+        sorted(range(10_000), key=lambda value: -value)
+    assert 'function calls' in capture['report']
+    with profile_run(None) as capture:
+        pass
+    assert capture['report'] is None
+    with pytest.raises(ValueError):
+        with profile_run('perf'):
+            pass
+
+
+def test_missing_profilers_are_not_offered(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyinstrument', None)
+    assert available_profilers() == ['cprofile']
+    with pytest.raises(ImportError):
+        with profile_run('pyinstrument'):
+            pass
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.parallel import (
+    parallel_column_stats, parallel_cube, parallel_multivariate, parallel_preprocess, partition_frame
+)
+from src.cube import build_cube
+from src.preprocessing import engineer_features, preprocess_data
+from src.streaming_stats import column_stats
+from tests.conftest import sorted_cube
+
+
+def test_row_partitions_follow_the_worker_count(raw_df):
+    parts = partition_frame(raw_df, 'Rows', parts=16)
+    assert len(parts) == 16
+    assert sum(len(part) for part in parts) == len(raw_df)
+    assert len(partition_frame(raw_df, 'Branch')) == raw_df['Branch'].nunique()
+
+
+@pytest.mark.parametrize('by', ['Rows', 'Branch', 'Month'])
+def test_parallel_preprocess_matches_single_process(raw_df, by):
+    pd.testing.assert_frame_equal(parallel_preprocess(raw_df, workers=2, by=by), engineer_features(raw_df))
+
+
+def test_workers_option_of_preprocess_data(raw_df):
+    pd.testing.assert_frame_equal(preprocess_data(raw_df, workers=2), preprocess_data(raw_df))
+    compact = preprocess_data(raw_df, compact=True, workers=2)
+    pd.testing.assert_frame_equal(compact, preprocess_data(raw_df, compact=True))
+    assert compact.attrs == preprocess_data(raw_df, compact=True).attrs
+
+
+def test_partial_aggregates_merge_to_the_exact_answer(sales_df):
+    pd.testing.assert_frame_equal(
+        sorted_cube(parallel_cube(sales_df, workers=1, by='Rows')), sorted_cube(build_cube(sales_df))
+    )
+
+    revenue, spending = parallel_multivariate(sales_df, workers=1, by='Month')
+    total = sales_df['Total'].astype('float64')
+    expected = total.groupby([sales_df['City'], sales_df['Product line']], observed=True).agg(['sum', 'mean'])
+    np.testing.assert_allclose(revenue.loc[expected.index], expected)
+    crosstab = pd.crosstab(sales_df['City'], sales_df['Customer_type'], values=total, aggfunc='mean')
+    np.testing.assert_allclose(spending.loc[crosstab.index, crosstab.columns], crosstab)
+
+    merged = parallel_column_stats(sales_df, ['Total'], workers=1, by='Branch')['Total'].summary()
+    direct = column_stats(sales_df['Total']).summary()
+    for name in ('count', 'mean', 'std', 'skew', 'min', 'max', 'median'):
+        assert np.isclose(merged[name], direct[name]), name
@@ -0,0 +1,66 @@
+import pytest
+
+from src.cache import cache_key
+from src.cube import AGGREGATIONS
+from src.precompute import PrecomputeWorker, common_filters, filter_key, sample_key, timeseries_key
+from src.result_cache import ResultCache
+from utils.synthetic_data import write_sales_csv
+
+
+@pytest.fixture
+def worker(sales_csv, tmp_path, monkeypatch):
+    # The on-disk caches are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return PrecomputeWorker(sales_csv, result_cache=ResultCache(), interval=0.01)
+
+
+def test_refresh_swaps_only_new_versions(worker, sales_csv):
+    assert worker.active() is None
+    assert worker.refresh()
+    first = worker.active()
+    assert first.version == cache_key(sales_csv)
+    assert not worker.refresh()
+    assert worker.active() is first
+
+    write_sales_csv(sales_csv, 500, seed=2, days=30)
+    assert worker.refresh()
+    assert worker.active() is not first
+    assert len(worker.active().index) == 500
+    assert worker.status()['refreshes'] == 2
+
+
+def test_warmed_keys_are_the_ones_the_app_reads(worker):
+    worker.refresh()
+    dataset, cache = worker.active(), worker.result_cache
+    filters = common_filters(dataset)
+    assert dataset.warmed == len(filters)
+    assert sample_key(dataset.version) in cache
+    for city, product, date_range in filters:
+        key = (dataset.version, filter_key(city, product, date_range))
+        assert all(key + (name,) in cache for name in AGGREGATIONS)
+        assert key + ('correlations',) in cache
+        assert timeseries_key(dataset.version, city, product) in cache
+
+
+def test_failed_refresh_keeps_serving_the_previous_version(worker, sales_csv):
+    worker._poll()
+    first = worker.wait(timeout=0)
+    assert first is not None and worker.error is None
+
+    with open(sales_csv, 'w') as f:
+        f.write('not,a,sales,export\n')
+    # A change is picked up once it has settled for one poll
+    worker._poll()
+    assert worker.refreshes == 1
+    worker._poll()
+    assert worker.error is not None
+    assert worker.active() is first
+
+
+def test_thread_prepares_the_first_dataset(worker):
+    worker.start()
+    try:
+        assert worker.wait(timeout=60) is not None
+    finally:
+        worker.stop(timeout=5)
+    assert worker.status()['rows'] == len(worker.active().index)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.precompute as precompute
+from benchmarks.bench_preprocessing import check_equivalent, legacy_features
+from src.cache import cache_key, read_cache
+from src.precompute import prepare_dataset
+from src.preprocessing import CUSTOMER_SPENDING_ATTR, engineer_features, preprocess_data
+
+
+def test_vectorized_features_match_the_legacy_version(raw_df):
+    check_equivalent(legacy_features(raw_df), engineer_features(raw_df))
+
+
+def test_unparseable_date_and_time_become_missing(raw_df):
+    raw = raw_df.head(5).copy()
+    raw['Date'] = raw['Date'].astype(object)
+    raw['Time'] = raw['Time'].astype(object)
+    raw.loc[0, 'Date'] = 'not a date'
+    raw.loc[1, 'Time'] = '25:99'
+
+    df = preprocess_data(raw)
+    assert pd.isna(df.loc[0, 'Date']) and pd.isna(df.loc[0, 'Month'])
+    assert np.isnan(df.loc[0, 'MonthNumber'])
+    assert pd.isna(df.loc[1, 'Time']) and np.isnan(df.loc[1, 'Hour']) and pd.isna(df.loc[1, 'DateTime'])
+    assert df['Date'].notna().sum() == 4
+
+
+def test_missing_required_columns_are_rejected(raw_df):
+    with pytest.raises(ValueError, match="Missing required columns"):
+        preprocess_data(raw_df.drop(columns=['Total']))
+
+
+def test_compact_dataset_survives_the_cache(sales_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    standard = prepare_dataset(sales_csv, cache_key(sales_csv, compact=False))
+    monkeypatch.setattr(precompute, 'COMPACT', True)
+    compact = prepare_dataset(sales_csv, cache_key(sales_csv, compact=True))
+    cached = read_cache(sales_csv, key=cache_key(sales_csv, compact=True))
+
+    assert 'Avg_CustomerType_Spending' not in cached.columns
+    assert cached.attrs[CUSTOMER_SPENDING_ATTR] == compact.index.df.attrs[CUSTOMER_SPENDING_ATTR]
+    assert cached['Time'].dtype == np.int16 and cached['Hour'].dtype == np.int8
+    spending = standard.index.df.groupby('Customer_type', observed=True)['Avg_CustomerType_Spending'].first()
+    for customer_type, average in cached.attrs[CUSTOMER_SPENDING_ATTR].items():
+        assert average == pytest.approx(spending[customer_type])
+    assert len(compact.index.view('All', 'All', None)) == len(standard.index.df)
+    assert compact.cube['Total'].sum() == pytest.approx(standard.cube['Total'].sum(), rel=1e-6)
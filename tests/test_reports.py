@@ -0,0 +1,52 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cube import cube_summary
+from src.data_loader import iter_data_chunks, load_data
+from src.preprocessing import get_data_summary, preprocess_data
+from src.reports import generate_reports, scan
+
+CHARTS = ['city_revenue.png', 'customer_distribution.png', 'daily_revenue.png', 'product_performance.png']
+
+
+def test_scanned_summary_matches_get_data_summary(sales_csv):
+    cube, stats = scan(iter_data_chunks(sales_csv, chunksize=500))
+    summary = cube_summary(cube, stats)['basic_info']
+    expected = get_data_summary(preprocess_data(load_data(sales_csv)))['basic_info']
+    assert summary['total_records'] == expected['total_records']
+    assert summary['total_columns'] == expected['total_columns']
+    assert summary['date_range'] == expected['date_range']
+    assert np.isclose(summary['memory_usage_mb'], expected['memory_usage_mb'], rtol=0.05)
+
+
+def test_reports_cover_every_branch_and_index_is_written_last(sales_csv, tmp_path):
+    pytest.importorskip('matplotlib')
+    output = str(tmp_path / 'reports')
+    index = generate_reports(sales_csv, output, run='test', workers=1, chunksize=700)
+
+    run_dir = os.path.join(output, 'test')
+    df = load_data(sales_csv)
+    assert index['rows'] == len(df)
+    assert index['branches'] == sorted(df['Branch'].astype(str).unique())
+    directories = ['All'] + [f'Branch={branch}' for branch in index['branches']]
+    assert sorted(os.listdir(run_dir)) == sorted(directories + ['index.json'])
+
+    written = []
+    for directory in directories:
+        files = os.listdir(os.path.join(run_dir, directory))
+        assert set(CHARTS) <= set(files), directory
+        with open(os.path.join(run_dir, directory, 'summary.json')) as f:
+            report = json.load(f)
+        assert set(report['files']) <= set(files)
+        written += [os.stat(os.path.join(run_dir, directory, name)).st_mtime_ns for name in files]
+    assert os.stat(os.path.join(run_dir, 'index.json')).st_mtime_ns >= max(written)
+
+    branch_a = pd.read_parquet(os.path.join(run_dir, 'Branch=A', 'city_revenue.parquet'))
+    expected = df.loc[df['Branch'] == 'A', 'Total'].astype('float64').sum()
+    assert np.isclose(branch_a['Total'].sum(), expected)
+    with open(os.path.join(run_dir, 'index.json')) as f:
+        assert json.load(f)['rows'] == len(df)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.result_cache import ResultCache
+
+
+def test_least_recently_used_entry_is_evicted_at_the_byte_cap():
+    cache = ResultCache(max_bytes=2_000)
+    cache.put('a', np.zeros(100))
+    cache.put('b', np.zeros(100))
+    assert cache.get('a') is not None
+    cache.put('c', np.zeros(100))
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.current_bytes <= cache.max_bytes
+    assert cache.stats()['evictions'] == 1
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    cache = ResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or np.arange(3)
+    first = cache.get_or_compute(('v1', 'All', 'kpis'), compute)
+    second = cache.get_or_compute(('v1', 'All', 'kpis'), compute)
+
+    assert first is second and len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_values_over_the_cap_are_not_stored():
+    cache = ResultCache(max_bytes=100)
+    assert not cache.put('big', np.zeros(1_000))
+    assert len(cache) == 0
+
+
+def test_invalidate_drops_an_old_dataset_version():
+    cache = ResultCache()
+    cache.put(('v1', 'kpis'), np.zeros(10))
+    cache.put(('v2', 'kpis'), np.zeros(10))
+    cache.invalidate(lambda key: key[0] == 'v1')
+    assert ('v1', 'kpis') not in cache and ('v2', 'kpis') in cache
+    assert cache.current_bytes == np.zeros(10).nbytes
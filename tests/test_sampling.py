@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing import preprocess_data
+from src.sampling import StratifiedSample, approximate_crosstab
+from utils.synthetic_data import generate_sales_data
+
+
+@pytest.fixture(scope='module')
+def large_df():
+    from src.data_loader import DTYPE_SCHEMA
+    return preprocess_data(generate_sales_data(40_000, seed=7, days=120).astype(DTYPE_SCHEMA))
+
+
+def exact(df, by):
+    return df.groupby(by, observed=True)['Total'].agg(['sum', 'size', 'mean']).astype('float64')
+
+
+def test_fully_sampled_strata_are_exact(sales_df):
+    sample = StratifiedSample.from_frame(sales_df, size=10_000)
+    estimates = sample.estimate(['City', 'Customer_type'])
+    expected = exact(sales_df, ['City', 'Customer_type'])
+    np.testing.assert_allclose(estimates['sum'], expected['sum'], rtol=1e-6)
+    np.testing.assert_allclose(estimates['count'], expected['size'])
+    assert (estimates['sum_margin'] == 0).all() and (estimates['mean_margin'] == 0).all()
+
+
+def test_intervals_contain_the_exact_value(large_df):
+    expected = exact(large_df, ['City', 'Customer_type'])
+    inside = {'sum': [], 'count': [], 'mean': []}
+    # 95% intervals over 20 independent samples of 6 groups each
+    for seed in range(20):
+        estimates = StratifiedSample.from_frame(large_df, size=150, seed=seed).estimate(['City', 'Customer_type'])
+        truth = expected.reindex(estimates.index)
+        for column, exact_column in (('sum', 'sum'), ('count', 'size'), ('mean', 'mean')):
+            inside[column] += list((estimates[column] - truth[exact_column]).abs() <= estimates[f'{column}_margin'])
+    for column, hits in inside.items():
+        assert np.mean(hits) >= 0.88, column
+
+
+def test_chunks_and_merges_keep_the_bottom_k(large_df):
+    whole = StratifiedSample.from_chunks([large_df.iloc[i:i + 7_000] for i in range(0, len(large_df), 7_000)], size=100)
+    halves = [StratifiedSample.from_frame(part, size=100, seed=i) for i, part in
+              enumerate((large_df.iloc[:15_000], large_df.iloc[15_000:]))]
+    for sample in (whole, halves[0].merge(halves[1])):
+        pd.testing.assert_series_equal(
+            sample.population.sort_index(), large_df.groupby(['City', 'Product line'], observed=True).size().sort_index(),
+            check_names=False, check_index_type=False
+        )
+        sizes = sample.rows.groupby(['City', 'Product line'], observed=True).size()
+        assert (sizes == 100).all()
+        assert sample.rows_seen == len(large_df)
+
+
+def test_view_masks_rows_without_changing_strata(large_df):
+    sample = StratifiedSample.from_frame(large_df, size=200)
+    date_range = ('2021-01-15', '2021-02-15')
+    view = sample.view('Yangon', 'All', date_range)
+    assert view.summary()['population_rows'] == sample.summary()['population_rows']
+    assert 0 < view.summary()['sampled_rows'] < len(sample)
+
+    filtered = large_df[(large_df['City'] == 'Yangon') & large_df['Date'].between(*pd.to_datetime(date_range))]
+    estimate = view.estimate('City').loc['Yangon']
+    assert abs(estimate['count'] - len(filtered)) <= estimate['count_margin']
+    means, margins = approximate_crosstab(view, 'City', 'Customer_type')
+    assert list(means.index) == ['Yangon'] and margins.notna().all().all()
+    assert view.view('Mandalay').summary()['sampled_rows'] == 0
@@ -0,0 +1,38 @@
+from src.sections import SectionCache
+
+
+def counter():
+    calls = []
+    return calls, lambda: calls.append(1) or len(calls)
+
+
+def test_section_is_reused_until_its_inputs_change():
+    store = {}
+    calls, compute = counter()
+    sections = SectionCache(store)
+    assert sections.get('kpis', ('v1', 'All'), compute) == 1
+    assert sections.get('kpis', ('v1', 'All'), compute) == 1
+    assert sections.get('kpis', ('v1', 'Yangon'), compute) == 2
+    assert sections.stats()['computed'] == ['kpis', 'kpis'] and sections.stats()['reused'] == ['kpis']
+
+    # A new rerun over the same session store keeps the last result
+    assert SectionCache(store).get('kpis', ('v1', 'Yangon'), compute) == 2
+    assert len(calls) == 2
+
+
+def test_sections_without_inputs_are_always_computed():
+    calls, compute = counter()
+    sections = SectionCache()
+    sections.get('chart', None, compute)
+    sections.get('chart', None, compute)
+    assert len(calls) == 2 and sections.stats()['entries'] == 0
+
+
+def test_invalidate_drops_one_or_every_section():
+    sections = SectionCache()
+    sections.get('a', 1, lambda: 'a')
+    sections.get('b', 1, lambda: 'b')
+    sections.invalidate('a')
+    assert sections.get('a', 1, lambda: 'new') == 'new'
+    sections.invalidate()
+    assert sections.stats()['entries'] == 0
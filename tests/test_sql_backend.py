@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.chart_reduction import reduce_for_chart
+from src.correlation import correlation_matrices
+from src.data_loader import load_data
+from src.eda_analysis import EDAAnalysis
+from src.filter_index import FilterIndex
+from src.preprocessing import preprocess_data
+from src.sql_backend import TABLE_NAME, SQLBackend, _chunk_select, open_backend
+
+duckdb = pytest.importorskip('duckdb')
+
+FILTERS = [('All', 'All', None), ('Yangon', 'Food and beverages', None), ('Mandalay', 'All', ('2021-01-15', '2021-02-10'))]
+
+
+@pytest.fixture
+def backend(sales_csv, tmp_path):
+    backend = open_backend(sales_csv, sql_dir=str(tmp_path / 'sql'))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def index(sales_csv):
+    return FilterIndex(preprocess_data(load_data(sales_csv)))
+
+
+def fetch_forbidden(*args, **kwargs):
+    raise AssertionError("rows were fetched")
+
+
+def test_dimension_values_match_the_in_memory_order(backend, index):
+    for column in ('City', 'Product line'):
+        assert backend.dimension_values(column) == index.dimension_values(column)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_sql_rows_answer_like_filtered_rows(backend, index, monkeypatch, filters):
+    expected = index.view(*filters)
+    rows = backend.rows(*filters)
+    monkeypatch.setattr(SQLBackend, 'frame', fetch_forbidden)
+
+    assert len(rows) == len(expected)
+    assert list(rows.numeric_columns()) == list(expected.numeric_columns())
+
+    analysis, reference = rows.analysis(), EDAAnalysis(expected.frame())
+    numeric = analysis.univariate_analysis('Total')
+    for key, value in reference.univariate_analysis('Total').items():
+        if key == 'histogram':
+            pd.testing.assert_frame_equal(numeric[key], value)
+        elif key != 'quantiles':
+            assert numeric[key] == pytest.approx(value, rel=1e-6)
+    pd.testing.assert_series_equal(
+        analysis.univariate_analysis('Payment')['value_counts'].sort_index(),
+        reference.univariate_analysis('Payment')['value_counts'].sort_index(),
+        check_dtype=False, check_index_type=False, check_categorical=False
+    )
+    pair = analysis.bivariate_analysis('Total', 'Rating')
+    expected_pair = reference.bivariate_analysis('Total', 'Rating')
+    assert pair['correlation'] == pytest.approx(expected_pair['correlation'])
+    pd.testing.assert_frame_equal(
+        pair['scatter'].sort_values(['Total', 'Rating'], ignore_index=True),
+        expected_pair['scatter'].sort_values(['Total', 'Rating'], ignore_index=True),
+        check_dtype=False
+    )
+
+    matrices, direct = rows.correlation_matrices(), expected.correlation_matrices()
+    for key in ('pearson', 'spearman', 'covariance', 'counts'):
+        pd.testing.assert_frame_equal(matrices[key], direct[key], check_exact=False, check_dtype=False)
+
+
+def test_large_scatters_are_binned_in_sql(backend, index, monkeypatch):
+    monkeypatch.setattr(SQLBackend, 'frame', fetch_forbidden)
+    expected, report = reduce_for_chart(index.view().frame(), 'scatter', 'Total', 'Rating', max_points=100)
+    binned, sql_report = backend.scatter('Total', 'Rating', max_points=100)
+    assert sql_report['method'] == report['method'] == 'density'
+    assert sql_report['points_before'] == report['points_before']
+    pd.testing.assert_frame_equal(
+        binned.sort_values(['Total', 'Rating'], ignore_index=True),
+        expected.sort_values(['Total', 'Rating'], ignore_index=True)
+    )
+
+
+def test_correlations_delete_missing_values_pairwise(sales_df, tmp_path):
+    df = sales_df.copy()
+    df.loc[df.index[::3], 'Hour'] = np.nan
+    df.loc[df.index[1::7], 'Rating'] = np.nan
+    path = str(tmp_path / 'gaps.duckdb')
+    with duckdb.connect(path) as conn:
+        conn.register('chunk', df)
+        conn.execute(f"CREATE TABLE {TABLE_NAME} AS {_chunk_select(df)}")
+    backend = SQLBackend(path)
+    columns = ['Total', 'Rating', 'Quantity', 'Hour']
+    matrices = backend.correlation_matrices(columns=columns)
+    direct = correlation_matrices(df, columns)
+    for key in ('pearson', 'spearman', 'covariance', 'counts'):
+        pd.testing.assert_frame_equal(matrices[key], direct[key], check_exact=False, check_dtype=False)
+    backend.close()
+
+
+def test_empty_selection_reports_no_data(backend):
+    rows = backend.rows('Yangon', 'All', ('1990-01-01', '1990-01-02'))
+    assert len(rows) == 0
+    assert 'error' in rows.analysis().univariate_analysis('Total')
+    assert 'error' in rows.correlation_matrices()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.streaming_stats import ColumnStats, CoMoments, Moments, QuantileSketch, column_stats, pair_stats, stats_from_chunks
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    values = rng.gamma(2.0, 50.0, size=20_000)
+    values[::97] = np.nan
+    return pd.Series(values)
+
+
+def test_chunked_moments_match_pandas(values):
+    stats = column_stats(values, chunk_rows=777).moments
+    assert stats.count == values.count()
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std())
+    assert stats.skew == pytest.approx(values.skew())
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_merged_moments_equal_one_pass(values):
+    halves = [Moments().update(part) for part in (values[:3_000], values[3_000:])]
+    merged = halves[0].merge(halves[1])
+    whole = Moments().update(values)
+    for attr in ('count', 'mean', 'm2', 'm3'):
+        assert getattr(merged, attr) == pytest.approx(getattr(whole, attr))
+
+
+def test_comoments_match_pandas(values):
+    other = values * 0.5 + np.random.default_rng(1).normal(size=len(values)) * 20
+    other[::13] = np.nan
+    stats = pair_stats(values, other, chunk_rows=1_000)
+    merged = CoMoments().update(values[:5_000], other[:5_000]).merge(CoMoments().update(values[5_000:], other[5_000:]))
+    assert stats.correlation == pytest.approx(values.corr(other))
+    assert stats.covariance == pytest.approx(values.cov(other))
+    assert merged.correlation == pytest.approx(stats.correlation)
+
+
+def test_sketch_is_exact_below_its_size(values):
+    small = values.dropna()[:1_000]
+    sketch = QuantileSketch(size=4_096).update(small)
+    assert sketch.median == pytest.approx(small.median())
+
+
+def test_merged_sketch_quantiles_stay_within_rank_error(values):
+    finite = np.sort(values.dropna().to_numpy())
+    sketches = [QuantileSketch(size=256, seed=i).update(part) for i, part in enumerate(np.array_split(finite[::-1], 4))]
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    assert merged.count == len(finite)
+    for probability in (0.1, 0.5, 0.9):
+        rank = np.searchsorted(finite, merged.quantile(probability)) / len(finite)
+        assert abs(rank - probability) < 0.02
+
+
+@pytest.mark.parametrize('size', [8, 64])
+def test_merged_sketch_stays_within_its_capacity(size):
+    rng = np.random.default_rng(0)
+    merged = QuantileSketch(size=size)
+    for seed in range(300):
+        merged.merge(QuantileSketch(size=size, seed=seed).update(rng.normal(size=500)))
+        sizes = [len(items) for items in merged.levels]
+        capacities = [merged._capacity(level) for level in range(len(merged.levels))]
+        assert all(n <= capacity for n, capacity in zip(sizes, capacities))
+        assert sum(sizes) <= sum(capacities)
+    assert merged.count == 300 * 500
+
+
+def test_stats_from_chunks_covers_columns_and_pairs(sales_df):
+    chunks = [sales_df.iloc[start:start + 300] for start in range(0, len(sales_df), 300)]
+    columns, pairs = stats_from_chunks(chunks, ['Total', 'Rating'], pairs=[('Total', 'Rating')])
+    assert isinstance(columns['Total'], ColumnStats)
+    assert columns['Total'].summary()['mean'] == pytest.approx(sales_df['Total'].mean())
+    assert pairs['Total', 'Rating'].correlation == pytest.approx(sales_df['Total'].corr(sales_df['Rating']))
@@ -0,0 +1,39 @@
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_preprocessing import measure
+from benchmarks.run_benchmarks import compare
+from src.data_loader import load_data
+from utils.synthetic_data import COLUMNS, TAX_RATE, generate_sales_data, write_sales_csv
+
+
+def test_generated_rows_follow_the_export_schema():
+    df = generate_sales_data(5_000, seed=3, n_branches=5)
+    assert list(df.columns) == COLUMNS
+    assert df['Branch'].nunique() == 5
+    assert df['Unit price'].between(10, 100).all() and df['Quantity'].between(1, 10).all()
+    assert df['Rating'].between(4, 10).all()
+    np.testing.assert_allclose(df['Total'], df['cogs'] * (1 + TAX_RATE), rtol=1e-6)
+    assert generate_sales_data(100, seed=3).equals(generate_sales_data(100, seed=3))
+
+
+def test_chunked_csv_writes_every_row(tmp_path):
+    path = write_sales_csv(str(tmp_path / 'sales.csv'), 2_500, chunk_rows=1_000)
+    df = load_data(path)
+    assert len(df) == 2_500
+    assert df['Invoice ID'].str.match(r'^\d{3}-\d{2}-\d{4}$').all()
+
+
+def test_compare_flags_slowdowns_over_the_threshold():
+    baseline = {'results': [{'rows': 10, 'benchmark': 'a', 'wall_s': 1.0}, {'rows': 10, 'benchmark': 'b', 'wall_s': 1.0}]}
+    current = {'results': [{'rows': 10, 'benchmark': 'a', 'wall_s': 1.1}, {'rows': 10, 'benchmark': 'b', 'wall_s': 1.5}]}
+    report = {row['benchmark']: row['regressed'] for row in compare(current, baseline, threshold=1.2)}
+    assert report == {'a': False, 'b': True}
+
+
+def test_preprocessing_benchmark_times_without_tracing(raw_df):
+    tracing = []
+    _, stats = measure(lambda df: tracing.append(tracemalloc.is_tracing()) or df, raw_df)
+    assert tracing == [False, True]
+    assert stats['elapsed_s'] > 0 and stats['peak_memory_mb'] is not None
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing import DAY_NAMES
+from src.timeseries import TimeSeries
+
+RANGES = [None, ('2021-01-10', '2021-01-10'), ('2021-01-05', '2021-02-17'), ('2020-12-01', '2021-01-03')]
+
+
+@pytest.fixture
+def series(sales_df):
+    return TimeSeries.from_frame(sales_df)
+
+
+@pytest.mark.parametrize('date_range', RANGES)
+def test_range_total_equals_a_masked_sum(series, sales_df, date_range):
+    rows = sales_df
+    if date_range is not None:
+        rows = sales_df[sales_df['Date'].between(*pd.to_datetime(date_range))]
+    result = series.range_total(date_range)
+    assert result['total_revenue'] == pytest.approx(rows['Total'].astype('float64').sum())
+    assert result['transactions'] == len(rows)
+
+
+def test_resample_matches_pandas(series, sales_df):
+    by_day = sales_df.set_index('Date')['Total'].astype('float64')
+    daily = series.resample('daily')
+    expected = by_day.resample('D').sum()
+    np.testing.assert_allclose(daily['Total'], expected.to_numpy())
+    assert (daily['Period'].to_numpy() == expected.index.to_numpy()).all()
+
+    weekly = series.resample('weekly')
+    expected = by_day.resample('W-MON', label='left', closed='left').sum()
+    np.testing.assert_allclose(weekly['Total'], expected.to_numpy())
+    assert weekly['Count'].sum() == len(sales_df)
+
+    hourly = series.resample('hourly', ('2021-01-05', '2021-01-06'))
+    assert len(hourly) == 48
+    with pytest.raises(ValueError):
+        series.resample('monthly')
+
+
+def test_rolling_means_look_back_before_the_range(series, sales_df):
+    daily = sales_df.set_index('Date')['Total'].astype('float64').resample('D').sum()
+    expected = daily.rolling(7, min_periods=1).mean()
+    rolled = series.rolling(windows=(7,), date_range=('2021-02-01', '2021-02-20'))
+    window = expected['2021-02-01':'2021-02-20']
+    np.testing.assert_allclose(rolled['mean_7d'], window.to_numpy())
+
+
+def test_heatmap_matches_a_pivot_table(series, sales_df):
+    expected = sales_df.assign(Total=sales_df['Total'].astype('float64')).pivot_table(
+        index='DayOfWeek', columns='Hour', values='Total', aggfunc='sum', observed=True
+    ).reindex(index=DAY_NAMES, columns=range(24)).fillna(0)
+    pd.testing.assert_frame_equal(series.heatmap(), expected, check_names=False, check_index_type=False,
+                                  check_column_type=False)
+
+
+@pytest.mark.parametrize('date_range', [('2021-01-03', '2021-01-05'), ('2021-01-15', '2021-02-10')])
+def test_heatmap_of_a_range_matches_a_pivot_table(series, sales_df, date_range):
+    rows = sales_df[sales_df['Date'].between(*pd.to_datetime(date_range))]
+    expected = rows.pivot_table(
+        index='DayOfWeek', columns='Hour', values='Total', aggfunc='size', observed=True
+    ).reindex(index=DAY_NAMES, columns=range(24)).fillna(0).astype('float64')
+    pd.testing.assert_frame_equal(series.heatmap(date_range, 'count'), expected, check_names=False,
+                                  check_index_type=False, check_column_type=False)
+    assert series.weekday_prefix.shape == (series.n_days + 7, 24)
+
+
+def test_pre_aggregated_bins_give_the_same_series(series, sales_df):
+    daily = sales_df.groupby('Date').agg(Total=('Total', 'sum'), Count=('Total', 'size')).reset_index()
+    hourly = sales_df.assign(Hour=sales_df['DateTime'].dt.floor('h')).groupby('Hour').agg(
+        Total=('Total', 'sum'), Count=('Total', 'size')
+    ).reset_index()
+    binned = TimeSeries.from_bins(daily, hourly)
+    np.testing.assert_allclose(binned.day_prefix, series.day_prefix)
+    np.testing.assert_allclose(binned.weekday_prefix, series.weekday_prefix)
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / 1024**2
+    return peak / 1024
+
+
+def current_rss_mb():
+    """Return the current resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, ValueError, AttributeError, IndexError):
+        return peak_rss_mb()
+
+
+@contextmanager
+def track_performance(trace_memory=True):
+    """
+    Measure wall time and peak traced memory of the enclosed block
+    Yields a dict that is filled in when the block exits
+    tracemalloc slows allocation-heavy code considerably, so with
+    trace_memory=False only wall time and peak RSS are recorded and
+    peak_memory_mb is None
+    """
+    stats = {}
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats['elapsed_s'] = time.perf_counter() - start
+        stats['peak_memory_mb'] = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            stats['peak_memory_mb'] = peak / 1024**2
+        stats['peak_rss_mb'] = peak_rss_mb()
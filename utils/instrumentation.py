@@ -0,0 +1,217 @@
+"""
+Stage timing for the dashboard rerun loop
+
+`timed` wraps a stage as a context manager or decorator and records its
+latency, row count and resident-memory delta in a process-wide registry.
+The registry keeps a fixed-bucket latency histogram plus recent samples per
+stage and exports them as JSON or Prometheus text. `profile_run` captures a
+cProfile (or pyinstrument, when installed) report of one block.
+"""
+import cProfile
+import functools
+import importlib.util
+import io
+import json
+import math
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.helpers import current_rss_mb
+
+LATENCY_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+RECENT_SAMPLES = 200
+PROFILE_ENGINES = ('cprofile', 'pyinstrument')
+
+
+class StageMetrics:
+    """Latency histogram and recent samples for one stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_S)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.last = {}
+
+    def record(self, elapsed_s, rows=None, memory_delta_mb=None):
+        self.count += 1
+        self.total_s += elapsed_s
+        self.max_s = max(self.max_s, elapsed_s)
+        for i, bound in enumerate(LATENCY_BUCKETS_S):
+            if elapsed_s <= bound:
+                self.buckets[i] += 1
+                break
+        self.recent.append(elapsed_s)
+        self.last = {'elapsed_s': elapsed_s, 'rows': rows, 'memory_delta_mb': memory_delta_mb}
+
+    def summary(self):
+        recent = sorted(self.recent)
+        percentile = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))] if recent else None
+        return {
+            'count': self.count,
+            'mean_s': self.total_s / self.count if self.count else None,
+            'p50_s': percentile(0.5),
+            'p95_s': percentile(0.95),
+            'max_s': self.max_s,
+            'last_s': self.last.get('elapsed_s'),
+            'rows': self.last.get('rows'),
+            'memory_delta_mb': self.last.get('memory_delta_mb')
+        }
+
+
+class MetricsRegistry:
+    """Per-stage metrics shared by every thread in the process"""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def record(self, stage, elapsed_s, rows=None, memory_delta_mb=None):
+        with self._lock:
+            self._stages.setdefault(stage, StageMetrics()).record(elapsed_s, rows, memory_delta_mb)
+
+    def snapshot(self):
+        """{stage: summary} for every stage seen so far"""
+        with self._lock:
+            return {stage: metrics.summary() for stage, metrics in sorted(self._stages.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def to_json(self, indent=2):
+        return json.dumps({'timestamp': time.time(), 'stages': self.snapshot()}, indent=indent)
+
+    def to_prometheus(self, prefix='dashboard_stage'):
+        """Prometheus text exposition: a latency histogram plus row and memory gauges per stage"""
+        lines = [
+            f"# HELP {prefix}_seconds Wall time of a dashboard stage",
+            f"# TYPE {prefix}_seconds histogram"
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for stage, metrics in stages:
+                label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS_S, metrics.buckets):
+                    cumulative += count
+                    le = '+Inf' if math.isinf(bound) else repr(bound)
+                    lines.append(f'{prefix}_seconds_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_seconds_sum{{stage="{label}"}} {metrics.total_s}')
+                lines.append(f'{prefix}_seconds_count{{stage="{label}"}} {metrics.count}')
+            for name, field, help_text in (
+                ('rows', 'rows', 'Rows handled by the last run of a stage'),
+                ('memory_delta_mb', 'memory_delta_mb', 'Resident memory change during the last run of a stage')
+            ):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                for stage, metrics in stages:
+                    value = metrics.last.get(field)
+                    if value is not None:
+                        label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                        lines.append(f'{prefix}_{name}{{stage="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+
+def _rows_of(value):
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+class timed:
+    """
+    Record a stage in the registry, as a context manager or a decorator
+
+        with timed('apply_filters') as stage:
+            df = ...
+            stage['rows'] = len(df)
+
+        @timed('preprocess_data')
+        def preprocess_data(df): ...
+
+    As a decorator the row count comes from the result's shape, or from
+    rows(result) when a callable is given.
+    """
+
+    def __init__(self, stage, rows=None, registry=METRICS):
+        self.stage = stage
+        self.rows = rows
+        self.registry = registry
+
+    def __enter__(self):
+        self._record = {'rows': self.rows if not callable(self.rows) else None}
+        self._rss = current_rss_mb()
+        self._start = time.perf_counter()
+        return self._record
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        if self.registry.enabled:
+            rss = current_rss_mb()
+            delta = rss - self._rss if rss is not None and self._rss is not None else None
+            self.registry.record(self.stage, elapsed, self._record.get('rows'), delta)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stage = timed(self.stage, registry=self.registry)
+            with stage as record:
+                result = func(*args, **kwargs)
+                record['rows'] = self.rows(result) if callable(self.rows) else _rows_of(result)
+            return result
+        return wrapper
+
+
+def available_profilers():
+    """The profiler engines that can run here; pyinstrument only when it is installed"""
+    return [
+        engine for engine in PROFILE_ENGINES
+        if engine != 'pyinstrument' or importlib.util.find_spec('pyinstrument') is not None
+    ]
+
+
+@contextmanager
+def profile_run(engine='cprofile', limit=40):
+    """
+    Profile the enclosed block; yields a dict whose 'report' is filled in on exit
+    engine=None disables profiling, so callers can wrap unconditionally
+    """
+    capture = {'engine': engine, 'report': None}
+    if engine is None:
+        yield capture
+        return
+    if engine not in PROFILE_ENGINES:
+        raise ValueError(f"Unknown profiler '{engine}', expected one of {PROFILE_ENGINES}")
+
+    if engine == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("pyinstrument profiling requires pyinstrument: pip install pyinstrument") from e
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield capture
+        finally:
+            profiler.stop()
+            capture['report'] = profiler.output_text(unicode=True, color=False)
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        capture['report'] = output.getvalue()
@@ -0,0 +1,144 @@
+"""
+Synthetic supermarket sales data in the same 17-column schema as the real export
+
+Distributions follow the shipped sample: branches, customer types, genders,
+product lines and payment methods are close to uniform, unit prices are
+uniform on [10, 100), quantities on 1-10, ratings on 4.0-10.0 and sales happen
+between 10:00 and 20:59. Derived money columns use the same formulas as the
+export (5% tax, Total = cogs + tax).
+
+Usage:
+    python -m utils.synthetic_data OUTPUT.csv --rows 1000000 [--branches 3] [--seed 0]
+"""
+import argparse
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    'Invoice ID', 'Branch', 'City', 'Customer_type', 'Gender', 'Product line',
+    'Unit price', 'Quantity', 'Tax 5%', 'Total', 'Date', 'Time', 'Payment',
+    'cogs', 'gross margin percentage', 'gross income', 'Rating'
+]
+BRANCH_CITIES = [('A', 'Yangon'), ('B', 'Mandalay'), ('C', 'Naypyitaw')]
+EXTRA_CITIES = ['Yangon', 'Mandalay', 'Naypyitaw', 'Bago', 'Mawlamyine', 'Pathein', 'Taunggyi', 'Monywa']
+CUSTOMER_TYPES = ['Member', 'Normal']
+GENDERS = ['Female', 'Male']
+PRODUCT_LINES = [
+    'Electronic accessories', 'Fashion accessories', 'Food and beverages',
+    'Health and beauty', 'Home and lifestyle', 'Sports and travel'
+]
+PAYMENTS = ['Ewallet', 'Cash', 'Credit card']
+PREAMBLE = [',' * (len(COLUMNS) - 1), 'Sales 2021' + ',' * (len(COLUMNS) - 1), ',' * (len(COLUMNS) - 1)]
+TAX_RATE = 0.05
+OPENING_MINUTE = 10 * 60
+CLOSING_MINUTE = 21 * 60
+
+
+def branch_table(n_branches=3):
+    """Branch codes and their cities; the first three match the real export"""
+    branches = BRANCH_CITIES[:n_branches]
+    for i in range(len(branches), n_branches):
+        branches.append((f"S{i:03d}", EXTRA_CITIES[i % len(EXTRA_CITIES)]))
+    return branches
+
+
+def _format_lookup(codes, labels):
+    """Turn integer codes into strings by formatting each distinct value once"""
+    return np.asarray(labels, dtype=object)[codes]
+
+
+def generate_sales_data(n_rows, seed=0, start_date='2021-01-01', days=365, n_branches=3):
+    """Generate a raw-format frame (text Date and Time) with n_rows invoices"""
+    rng = np.random.default_rng(seed)
+    branches = branch_table(n_branches)
+
+    branch_codes = rng.integers(0, len(branches), n_rows)
+    unit_price = np.round(rng.uniform(10, 100, n_rows), 2)
+    quantity = rng.integers(1, 11, n_rows)
+    cogs = np.round(unit_price * quantity, 2)
+    tax = np.round(cogs * TAX_RATE, 4)
+    day_offsets = rng.integers(0, days, n_rows)
+    minutes = rng.integers(OPENING_MINUTE, CLOSING_MINUTE, n_rows)
+
+    dates = pd.date_range(start_date, periods=days, freq='D')
+    date_labels = [f"{d.month}/{d.day}/{d.year}" for d in dates]
+    time_labels = [f"{m // 60:02d}:{m % 60:02d}" for m in range(CLOSING_MINUTE)]
+    invoice_numbers = rng.integers(0, 10**9, n_rows)
+
+    return pd.DataFrame({
+        'Invoice ID': [f"{n // 10**6:03d}-{n // 10**4 % 100:02d}-{n % 10**4:04d}" for n in invoice_numbers],
+        'Branch': _format_lookup(branch_codes, [code for code, _ in branches]),
+        'City': _format_lookup(branch_codes, [city for _, city in branches]),
+        'Customer_type': _format_lookup(rng.integers(0, len(CUSTOMER_TYPES), n_rows), CUSTOMER_TYPES),
+        'Gender': _format_lookup(rng.integers(0, len(GENDERS), n_rows), GENDERS),
+        'Product line': _format_lookup(rng.integers(0, len(PRODUCT_LINES), n_rows), PRODUCT_LINES),
+        'Unit price': unit_price,
+        'Quantity': quantity,
+        'Tax 5%': tax,
+        'Total': np.round(cogs + tax, 4),
+        'Date': _format_lookup(day_offsets, date_labels),
+        'Time': _format_lookup(minutes, time_labels),
+        'Payment': _format_lookup(rng.integers(0, len(PAYMENTS), n_rows), PAYMENTS),
+        'cogs': cogs,
+        'gross margin percentage': np.full(n_rows, round(100 * TAX_RATE / (1 + TAX_RATE), 9)),
+        'gross income': tax,
+        'Rating': rng.integers(40, 101, n_rows) / 10
+    }, columns=COLUMNS)
+
+
+def _write_chunk(chunk, f, header):
+    """Append a chunk to an open CSV, using pyarrow's much faster writer when installed"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        chunk.to_csv(f, header=header, index=False)
+        return
+    if header:
+        f.write(','.join(chunk.columns) + '\n')
+    options = pa_csv.WriteOptions(include_header=False, quoting_style='needed')
+    sink = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), sink, options)
+    f.write(sink.getvalue().decode('utf-8'))
+
+
+def write_sales_csv(path, n_rows, seed=0, chunk_rows=1_000_000, preamble=True, **kwargs):
+    """
+    Write n_rows synthetic invoices to a CSV in the export's format
+    Rows are generated chunk by chunk, so memory stays flat for 1e8+ rows
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-n_rows // chunk_rows)))
+    with open(path, 'w', newline='') as f:
+        if preamble:
+            f.write('\n'.join(PREAMBLE) + '\n')
+        written = 0
+        for chunk_seed in seeds:
+            rows = min(chunk_rows, n_rows - written)
+            if rows <= 0:
+                break
+            chunk = generate_sales_data(rows, seed=chunk_seed, **kwargs)
+            _write_chunk(chunk, f, header=(written == 0))
+            written += rows
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic supermarket sales data")
+    parser.add_argument('output')
+    parser.add_argument('--rows', type=float, default=1e6, help="number of invoices, e.g. 1e7")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--branches', type=int, default=3)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    write_sales_csv(args.output, int(args.rows), seed=args.seed, chunk_rows=args.chunk_rows,
+                    days=args.days, n_branches=args.branches)
+    print(f"Wrote {int(args.rows):,} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()